@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+
+The task change stream (/api/todo/events/) is only served by this ASGI
+application. Each process shares one LISTEN connection among all subscribers.
 """
 
 import os
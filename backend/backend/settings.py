@@ -39,11 +39,14 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # 他のミドルウェアが変更した後のレスポンスを圧縮する
+    "todo.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -51,6 +54,9 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "todo.routers.ReplicaPinningMiddleware",
+    # レスポンスの変換まで計測するため最後に置く
+    "todo.metrics.RequestMetricsMiddleware",
 ]
 
 # フロントエンドア(Reactアプリ)設定
@@ -58,6 +64,8 @@ CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOWED_ORIGINS = [
   'http://localhost:3000',
 ]
+# 書き込み後の読み取りをプライマリに固定する Cookie をフロントエンドから送れるようにする
+CORS_ALLOW_CREDENTIALS = True
 
 ROOT_URLCONF = "backend.urls"
 
@@ -91,9 +99,153 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD"),
         "HOST": os.environ.get("DB_HOST"),  # ローカルでテストを実行する場合は、ホスト名を"DB_LOCALHOST"
         "PORT": os.environ.get("DB_PORT"),
+        # 接続を維持する秒数 (0: リクエストごとに切断、none: 無期限)
+        "CONN_MAX_AGE": (
+            None
+            if os.environ.get("DB_CONN_MAX_AGE", "0").lower() == "none"
+            else int(os.environ.get("DB_CONN_MAX_AGE", "0"))
+        ),
+        # 維持している接続をリクエストの最初のクエリ前に確認する
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "false").lower()
+        == "true",
+        # PgBouncer のトランザクションプーリングを経由する場合は true にする
+        "DISABLE_SERVER_SIDE_CURSORS": os.environ.get(
+            "DB_DISABLE_SERVER_SIDE_CURSORS", "false"
+        ).lower()
+        == "true",
     }
 }
 
+# 読み取りレプリカ (DB_REPLICA_HOST または DB_REPLICA_NAME を指定した場合に有効)
+# 省略した接続情報はプライマリ (default) と同じ値を使用する
+# todo アプリの読み取りはレプリカ、書き込みはプライマリで実行し (todo.routers.ReplicaRouter)、
+# 書き込んだクライアントは DB_REPLICA_PIN_SECONDS 秒間プライマリから読み取る
+if os.environ.get("DB_REPLICA_HOST") or os.environ.get("DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ.get("DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "USER": os.environ.get("DB_REPLICA_USER", DATABASES["default"]["USER"]),
+        "PASSWORD": os.environ.get(
+            "DB_REPLICA_PASSWORD", DATABASES["default"]["PASSWORD"]
+        ),
+        "HOST": os.environ.get("DB_REPLICA_HOST", DATABASES["default"]["HOST"]),
+        "PORT": os.environ.get("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+    }
+
+DATABASE_ROUTERS = ["todo.routers.ReplicaRouter"]
+TODO_READ_REPLICA = "replica" if "replica" in DATABASES else None
+TODO_REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", "5"))
+TODO_REPLICA_PIN_COOKIE = "todo_read_primary"
+
+# 一覧・詳細・サマリーのSELECT文をプリペアドステートメントで実行する
+# 接続ごとに準備するため DB_CONN_MAX_AGE と併用し、PgBouncer のトランザクションプーリングでは使用しない
+TODO_PREPARED_STATEMENTS = (
+    os.environ.get("DB_PREPARED_STATEMENTS", "false").lower() == "true"
+)
+TODO_PREPARED_STATEMENTS_MAX = int(os.environ.get("DB_PREPARED_STATEMENTS_MAX", "100"))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# 複数プロセスで動かす場合は共有のバックエンド (Redis、Memcachedなど) を指定する
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# 一覧・サマリーのレスポンスキャッシュの有効期間 (秒)、0で無効
+# タスクの変更はプロセス内のシグナルでキャッシュに通知するため、
+# 複数プロセスで有効にする場合は共有のキャッシュバックエンドが必要
+TODO_RESPONSE_CACHE_TIMEOUT = int(os.environ.get("TODO_RESPONSE_CACHE_TIMEOUT", "0"))
+
+
+# タスク一覧の総件数の取得方式
+# "exact": 毎回 COUNT(*) を実行 / "estimate": 閾値以上の件数では統計情報の推定値を使用
+# "cached": COUNT(*) の結果をタスクが変更されるまでキャッシュ
+TODO_COUNT_STRATEGY = os.environ.get("TODO_COUNT_STRATEGY", "exact")
+TODO_COUNT_ESTIMATE_THRESHOLD = int(
+    os.environ.get("TODO_COUNT_ESTIMATE_THRESHOLD", "100000")
+)
+TODO_COUNT_CACHE_TIMEOUT = int(os.environ.get("TODO_COUNT_CACHE_TIMEOUT", "300"))
+
+# サマリーで「期限間近」とみなす期限までの時間
+TODO_DUE_SOON_HOURS = int(os.environ.get("TODO_DUE_SOON_HOURS", "24"))
+
+# 一括登録・更新・削除APIの1回のSQLで書き込む件数と1リクエストの最大件数
+TODO_BULK_BATCH_SIZE = int(os.environ.get("TODO_BULK_BATCH_SIZE", "500"))
+TODO_BULK_MAX_ITEMS = int(os.environ.get("TODO_BULK_MAX_ITEMS", "10000"))
+
+# エクスポートでサーバーサイドカーソルから1回に取得する件数
+TODO_EXPORT_CHUNK_SIZE = int(os.environ.get("TODO_EXPORT_CHUNK_SIZE", "2000"))
+
+# 一覧の1ページあたりの件数と、?page_size= で指定できる最大件数
+# 1ページは一括で取得するため、メモリの使用量は TODO_MAX_PAGE_SIZE で制限する
+TODO_PAGE_SIZE = int(os.environ.get("TODO_PAGE_SIZE", "20"))
+TODO_MAX_PAGE_SIZE = int(os.environ.get("TODO_MAX_PAGE_SIZE", "1000"))
+
+# 取り込みで1回の COPY で書き込む件数と、レスポンスに含める不正な行の最大件数
+TODO_IMPORT_BATCH_SIZE = int(os.environ.get("TODO_IMPORT_BATCH_SIZE", "10000"))
+TODO_IMPORT_MAX_ERRORS = int(os.environ.get("TODO_IMPORT_MAX_ERRORS", "100"))
+
+# 完了から TODO_ARCHIVE_AFTER_DAYS 日が経過したタスクを archive_tasks コマンドでアーカイブする
+# 1回で移動する件数 (移動ごとにコミットする)
+TODO_ARCHIVE_AFTER_DAYS = int(os.environ.get("TODO_ARCHIVE_AFTER_DAYS", "30"))
+TODO_ARCHIVE_BATCH_SIZE = int(os.environ.get("TODO_ARCHIVE_BATCH_SIZE", "1000"))
+
+# 変更フィード (/api/todo/changes/) の1回で返すタスク・削除それぞれの最大件数
+# 読み取り位置は変更を書き込んだトランザクションのIDで管理し、コミットの遅い変更も取りこぼさない
+# 削除の記録は TODO_CHANGES_RETENTION_DAYS 日保持し、それより古いトークンは410にする
+TODO_CHANGES_LIMIT = int(os.environ.get("TODO_CHANGES_LIMIT", "500"))
+TODO_CHANGES_RETENTION_DAYS = int(os.environ.get("TODO_CHANGES_RETENTION_DAYS", "7"))
+
+# タスクの変更イベントの配信 (/api/todo/events/、ASGIのみ)
+# "postgres": LISTEN/NOTIFY で受信 / "local": プロセス内の通知 (テスト用)
+# 購読者ごとのキューの上限 (超えた場合は再同期を求める)、接続維持のコメントの間隔、再接続の間隔
+TODO_EVENTS_NOTIFIER = os.environ.get("TODO_EVENTS_NOTIFIER", "postgres")
+TODO_EVENTS_QUEUE_SIZE = int(os.environ.get("TODO_EVENTS_QUEUE_SIZE", "100"))
+TODO_EVENTS_KEEPALIVE_SECONDS = int(
+    os.environ.get("TODO_EVENTS_KEEPALIVE_SECONDS", "15")
+)
+TODO_EVENTS_RETRY_SECONDS = int(os.environ.get("TODO_EVENTS_RETRY_SECONDS", "3"))
+
+# バックグラウンドのジョブ (/api/todo/jobs/、run_todo_worker コマンドで実行)
+# ワーカーが同時に実行する数、通知がない場合に確認する間隔
+# 失敗したジョブは TODO_JOBS_RETRY_SECONDS 秒 (2回目以降は倍) 後に TODO_JOBS_MAX_ATTEMPTS 回まで実行する
+# ワーカーは TODO_JOBS_POLL_SECONDS 秒ごとに実行中のジョブの最終応答日時を更新する
+# TODO_JOBS_TIMEOUT_SECONDS 秒を超えて応答のない実行中のジョブは停止したワーカーのものとみなし、再実行する
+# (ジョブの実行時間ではなく応答の間隔で判定するため、確認の間隔より十分長くする)
+TODO_JOBS_CONCURRENCY = int(os.environ.get("TODO_JOBS_CONCURRENCY", "2"))
+TODO_JOBS_POLL_SECONDS = float(os.environ.get("TODO_JOBS_POLL_SECONDS", "5"))
+TODO_JOBS_RETRY_SECONDS = int(os.environ.get("TODO_JOBS_RETRY_SECONDS", "30"))
+TODO_JOBS_MAX_ATTEMPTS = int(os.environ.get("TODO_JOBS_MAX_ATTEMPTS", "3"))
+TODO_JOBS_TIMEOUT_SECONDS = int(os.environ.get("TODO_JOBS_TIMEOUT_SECONDS", "60"))
+
+# リクエストごとのSQLの実行回数・時間、シリアライズ時間の計測と /metrics での公開
+# 計測値はプロセスごとに保持するため、複数ワーカーではワーカーごとにスクレイプする
+TODO_METRICS = os.environ.get("TODO_METRICS", "true").lower() == "true"
+# 計測値を Server-Timing ヘッダーでクライアントに返す
+TODO_SERVER_TIMING = os.environ.get("TODO_SERVER_TIMING", "true").lower() == "true"
+
+# レスポンスの圧縮 (Accept-Encoding に応じて brotli または gzip)
+# TODO_COMPRESS_MIN_SIZE バイト未満のレスポンスは圧縮しない
+# brotli の品質は 0-11 (大きいほど圧縮率が高く遅い)、gzip の圧縮レベルは 1-9
+TODO_COMPRESS_MIN_SIZE = int(os.environ.get("TODO_COMPRESS_MIN_SIZE", "1024"))
+TODO_COMPRESS_BROTLI_QUALITY = int(os.environ.get("TODO_COMPRESS_BROTLI_QUALITY", "4"))
+TODO_COMPRESS_GZIP_LEVEL = int(os.environ.get("TODO_COMPRESS_GZIP_LEVEL", "6"))
+
+# DRF のレスポンスは orjson で変換する (出力は JSONRenderer と同じ)
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "todo.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -0,0 +1,19 @@
+"""
+テスト用の設定 (todo/tests/pytest.ini)
+"""
+
+from backend.settings import *  # noqa: F401,F403
+from backend.settings import DATABASES
+
+# 読み取りレプリカの代わりに同じサーバーの別のデータベースを使用する
+# 複製はされないため、プライマリへの書き込みはレプリカから読み取れない (todo/tests/test_routers.py)
+# それ以外のテストはトランザクション内で実行するため、読み取りもプライマリで実行される
+if "replica" not in DATABASES:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": f"{DATABASES['default']['NAME']}_replica",
+    }
+TODO_READ_REPLICA = "replica"
+
+# ページングのテストは少数のタスクで行うため、1ページあたりの件数を小さくする
+TODO_PAGE_SIZE = 3
@@ -0,0 +1,319 @@
+"""
+タスクAPIの主要な処理のベンチマーク
+
+使い捨てのデータベース (settings.DATABASES["default"] の NAME に "_bench" を付けた名前) を作成して
+マイグレーションを適用し、--tasks に指定した件数までタスクを登録して次の項目を計測する
+- 一覧 (先頭・深いページ、キーセット方式の深いページ、検索、絞り込み)、詳細、サマリーの処理時間
+- シリアライズの1秒あたりの件数
+- 登録・更新・削除の1秒あたりの件数
+- エンドポイントごとのSQL実行回数 (benchmarks/budgets.py の上限を超えた場合は終了コード1)
+
+件数は少ない順に計測し、登録済みのタスクに追加して次の件数にする
+--keepdb を指定するとデータベースを削除せず、次回は登録済みのタスクを再利用する
+--output に指定したJSONファイルは benchmarks.compare で別のコミットの結果と比較できる
+
+    python -m benchmarks.bench_api --tasks 10000,1000000 --output before.json
+
+マイグレーションとタスクの登録 (COPY) がPostgreSQL専用の機能 (トリガー、GINインデックス、
+CONCURRENTLY でのインデックス作成) を使用するため、SQLiteでは実行できない
+ローカルでは使い捨てのPostgreSQLを起動して DB_* の環境変数で指定する
+
+    docker run --rm -d -p 5433:5432 -e POSTGRES_PASSWORD=bench --name todo-bench postgres:16
+    DB_HOST=localhost DB_PORT=5433 DB_USER=postgres DB_PASSWORD=bench DB_NAME=postgres \\
+        python -m benchmarks.bench_api --tasks 10000
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import argument_parser, measure, report, setup, write_results
+
+TITLE_WORDS = ("report", "meeting", "review", "invoice", "deploy", "design", "call")
+
+
+def generate_rows(start, count):
+    """
+    登録するタスクを決まった乱数で作成
+    期限は8割のタスクに前後1年の範囲で設定する
+
+    Args:
+        start (int): 最初のタスクの通し番号
+        count (int): 件数
+
+    Yields:
+        tuple: TaskImporter.run() に渡す (行番号, 辞書)
+    """
+    rng = random.Random(start)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for number in range(start, start + count):
+        due_date = None
+        if rng.random() < 0.8:
+            due_date = (base + timedelta(hours=rng.randint(-8760, 8760))).isoformat()
+        yield number, {
+            "title": f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {number}",
+            "description": "x" * rng.randint(0, 200),
+            "status": rng.randint(0, 2),
+            "priority": rng.randint(0, 2),
+            "due_date": due_date,
+        }
+
+
+def seed(target):
+    """
+    タスクが target 件になるまで COPY で登録し、統計情報を更新する
+
+    Args:
+        target (int): タスクの件数
+    """
+    from django.db import connection
+    from todo.importer import TaskImporter
+    from todo.models import Task
+
+    current = Task.objects.count()
+    if current < target:
+        start = time.perf_counter()
+        TaskImporter(batch_size=50000).run(generate_rows(current, target - current))
+        with connection.cursor() as cursor:
+            cursor.execute(f"VACUUM ANALYZE {Task._meta.db_table}")
+        print(
+            f"{target - current}件を登録しました ({time.perf_counter() - start:.1f}秒)",
+            file=sys.stderr,
+        )
+    elif current > target:
+        raise SystemExit(
+            f"登録済みのタスク ({current}件) が {target}件より多いため、"
+            "--keepdb を外して再作成してください"
+        )
+
+
+def latency(client, path, requests, max_seconds):
+    """
+    GETリクエストの処理時間を計測
+    深いページなどの遅いリクエストは max_seconds 秒を超えた時点で打ち切る (最低5回)
+
+    Args:
+        client (APIClient): テスト用のクライアント
+        path (str): リクエストするパス
+        requests (int): リクエスト数
+        max_seconds (float): 1つのパスの計測時間の上限 (秒)
+
+    Returns:
+        dict: 処理時間の中央値・95パーセンタイル・平均 (ミリ秒)
+    """
+    client.get(path)
+    timings = []
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, (path, response.status_code)
+        if len(timings) >= 5 and time.perf_counter() > deadline:
+            break
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "requests": len(timings),
+    }
+
+
+def keyset_path(position):
+    """
+    先頭から position 件目以降を取得するキーセット方式のパスを作成
+
+    Args:
+        position (int): 何件目から取得するか
+
+    Returns:
+        str: カーソル付きのパス
+    """
+    from todo.models import Task
+    from todo.pagination import KeysetPagination
+
+    task = Task.objects.order_by("due_date", "id").values("due_date", "id")[position]
+    paginator = KeysetPagination()
+    paginator.base_url = "/api/todo/?pagination=keyset"
+    return paginator.encode_cursor(KeysetPagination._get_key(task), reverse=False)
+
+
+def bench_reads(client, size, requests, max_seconds):
+    """
+    一覧・詳細・サマリーのGETリクエストの処理時間を計測
+    深いページは最後のページ、キーセット方式は先頭から9割の位置から取得する
+    """
+    from django.conf import settings
+    from todo.models import Task
+
+    pk = Task.objects.order_by("id").values_list("id", flat=True)[size // 2]
+    last_page = max(size // settings.TODO_PAGE_SIZE, 1)
+    paths = {
+        "list_first_page": "/api/todo/",
+        "list_deep_page": f"/api/todo/?page={last_page}",
+        "list_keyset_deep": keyset_path(size * 9 // 10),
+        "list_search": "/api/todo/?search=invoice%20deploy",
+        "list_filtered": "/api/todo/?status=1&priority=2&ordering=-updated_at",
+        "detail": f"/api/todo/{pk}/",
+        "summary": "/api/todo/summary/",
+        "async_list_deep_page": f"/api/async/todo/?page={last_page}",
+    }
+    for name, path in paths.items():
+        report(
+            f"api_{name}", tasks=size, **latency(client, path, requests, max_seconds)
+        )
+
+
+def bench_serializer(size, rows, repeat):
+    """
+    TaskSerializer と TaskReadSerializer のシリアライズ (JSONへの変換を含む) の1秒あたりの件数を計測
+    """
+    from rest_framework.renderers import JSONRenderer
+    from todo.models import Task
+    from todo.serializers import TaskReadSerializer, TaskSerializer
+
+    renderer = JSONRenderer()
+    queryset = Task.objects.order_by("due_date", "id")[:rows]
+    tasks = list(queryset)
+    reader = TaskReadSerializer()
+    values = list(reader.select(queryset))
+
+    def model_serializer():
+        renderer.render(TaskSerializer(tasks, many=True).data)
+
+    def read_serializer():
+        # to_representation() は辞書を書き換えるため複製する
+        renderer.render(reader.to_representation([dict(row) for row in values]))
+
+    results = {}
+    for name, func in (("model", model_serializer), ("read", read_serializer)):
+        timing = measure(func, repeat=repeat)
+        results[f"{name}_rows_per_sec"] = round(rows / timing["median"])
+    report("serializer", tasks=size, rows=rows, **results)
+
+
+def bench_writes(client, size, writes):
+    """
+    1件ずつの登録・更新・削除と一括登録の1秒あたりの件数を計測
+    コミットまでを含めて計測し、一括登録したタスクは最後に削除する
+    """
+    from todo.models import Task
+
+    results = {}
+    start = time.perf_counter()
+    pks = []
+    for i in range(writes):
+        response = client.post("/api/todo/", {"title": f"write {i}"}, format="json")
+        assert response.status_code == 201, response.status_code
+        pks.append(response.data["id"])
+    results["create_per_sec"] = round(writes / (time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for pk in pks:
+        response = client.patch(f"/api/todo/{pk}/", {"status": 1}, format="json")
+        assert response.status_code == 200, response.status_code
+    results["update_per_sec"] = round(writes / (time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for pk in pks:
+        response = client.delete(f"/api/todo/{pk}/")
+        assert response.status_code == 204, response.status_code
+    results["delete_per_sec"] = round(writes / (time.perf_counter() - start))
+
+    data = [{"title": f"bulk {i}"} for i in range(writes)]
+    start = time.perf_counter()
+    response = client.post("/api/todo/bulk/", data, format="json")
+    assert response.status_code == 201, response.status_code
+    results["bulk_create_per_sec"] = round(writes / (time.perf_counter() - start))
+    Task.objects.filter(pk__in=[task["id"] for task in response.data]).delete()
+    report("writes", tasks=size, writes=writes, **results)
+
+
+def check_budgets(client, size):
+    """
+    エンドポイントごとのSQL実行回数を計測し、上限と比較する
+    書き込みはロールバックする
+
+    Returns:
+        bool: 全てのエンドポイントが上限以内の場合はTrue
+    """
+    from benchmarks.budgets import QUERY_BUDGETS, request_endpoint
+    from benchmarks.common import rollback
+    from todo.models import Task
+
+    ok = True
+    for name, (_, _, _, budget) in QUERY_BUDGETS.items():
+        with rollback():
+            pk = Task.objects.order_by("id").values_list("id", flat=True)[0]
+            response, queries = request_endpoint(client, name, pk)
+        assert response.status_code < 300, (name, response.status_code)
+        ok = ok and queries <= budget
+        report(
+            f"queries_{name}",
+            tasks=size,
+            queries=queries,
+            budget=budget,
+            within_budget=queries <= budget,
+        )
+    return ok
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument(
+        "--tasks",
+        default="10000,1000000",
+        help="計測するタスクの件数 (カンマ区切り)",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="読み取りのリクエスト数"
+    )
+    parser.add_argument(
+        "--max-seconds", type=float, default=10, help="1つのパスの計測時間の上限 (秒)"
+    )
+    parser.add_argument("--writes", type=int, default=200, help="書き込みの件数")
+    parser.add_argument(
+        "--serializer-rows", type=int, default=1000, help="シリアライズする件数"
+    )
+    parser.add_argument(
+        "--keepdb", action="store_true", help="計測用のデータベースを削除しない"
+    )
+    parser.add_argument("--output", help="計測結果を保存するJSONファイル")
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.tasks.split(","))
+
+    setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework.test import APIClient
+
+    # 本番と同じく DEBUG=False で計測する
+    setup_test_environment(debug=False)
+
+    old_name = connection.settings_dict["NAME"]
+    connection.settings_dict["TEST"]["NAME"] = f"{old_name}_bench"
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False, keepdb=args.keepdb
+    )
+    client = APIClient()
+    ok = True
+    try:
+        for size in sizes:
+            seed(size)
+            bench_reads(client, size, args.requests, args.max_seconds)
+            bench_serializer(size, args.serializer_rows, args.repeat)
+            bench_writes(client, size, args.writes)
+            ok = check_budgets(client, size) and ok
+        if args.output:
+            write_results(args.output, tasks=sizes)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+    if not ok:
+        sys.exit("SQLの実行回数が上限を超えたエンドポイントがあります")
+
+
+if __name__ == "__main__":
+    main()
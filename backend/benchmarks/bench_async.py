@@ -0,0 +1,165 @@
+"""
+同期ビューと非同期ビューの負荷試験
+
+同じASGIサーバー (uvicorn、ワーカー数は --workers) で同期版 /api/todo/ と非同期版 /api/async/todo/ に
+同時接続数 --concurrency で --duration 秒間リクエストを送り、1秒あたりのリクエスト数を比較する
+試験用のタスクはコミットして登録し、終了時に削除する
+
+    python -m benchmarks.bench_async --tasks 10000 --concurrency 50
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.common import argument_parser, report, setup
+
+TITLE_PREFIX = "bench-async "
+
+ENDPOINTS = {
+    "list": ("/api/todo/?page=5", "/api/async/todo/?page=5"),
+    "detail": ("/api/todo/{pk}/", "/api/async/todo/{pk}/"),
+    "summary": ("/api/todo/summary/", "/api/async/todo/summary/"),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers):
+    """
+    uvicorn でASGIアプリケーションを起動し、接続できるまで待つ
+
+    Args:
+        port (int): ポート番号
+        workers (int): ワーカープロセス数
+
+    Returns:
+        Popen: uvicorn のプロセス
+    """
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.asgi:application",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn が起動しませんでした")
+
+
+async def _client(port, path, stop_at, counts):
+    """
+    1接続でkeep-aliveのGETを繰り返し送る
+
+    Args:
+        port (int): ポート番号
+        path (str): リクエストするパス
+        stop_at (float): 終了時刻 (time.monotonic())
+        counts (dict): 成功・失敗の件数
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        "Accept: application/json\r\n\r\n"
+    ).encode()
+    try:
+        while time.monotonic() < stop_at:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            key = "ok" if status_line.split()[1] == b"200" else "errors"
+            counts[key] += 1
+    finally:
+        writer.close()
+
+
+async def load(port, path, concurrency, duration):
+    """
+    同時接続数 concurrency で duration 秒間リクエストを送る
+
+    Returns:
+        dict: 1秒あたりのリクエスト数とエラー数
+    """
+    counts = {"ok": 0, "errors": 0}
+    start = time.monotonic()
+    await asyncio.gather(
+        *[_client(port, path, start + duration, counts) for _ in range(concurrency)]
+    )
+    elapsed = time.monotonic() - start
+    return {"rps": round(counts["ok"] / elapsed, 1), "errors": counts["errors"]}
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument("--tasks", type=int, default=10000, help="登録するタスク数")
+    parser.add_argument("--concurrency", type=int, default=50, help="同時接続数")
+    parser.add_argument("--duration", type=float, default=10, help="計測秒数")
+    parser.add_argument("--workers", type=int, default=1, help="ワーカー数")
+    args = parser.parse_args()
+
+    setup()
+    from todo.models import Task
+
+    Task.objects.bulk_create(
+        [Task(title=f"{TITLE_PREFIX}{i}") for i in range(args.tasks)],
+        batch_size=1000,
+    )
+    pk = Task.objects.filter(title__startswith=TITLE_PREFIX).values("pk")[:1][0]["pk"]
+    port = free_port()
+    server = start_server(port, args.workers)
+    try:
+        for name, paths in ENDPOINTS.items():
+            results = {}
+            for mode, path in zip(("sync", "async"), paths):
+                path = path.format(pk=pk)
+                # 接続とクエリの準備を済ませてから計測する
+                asyncio.run(load(port, path, args.concurrency, 1))
+                results[mode] = asyncio.run(
+                    load(port, path, args.concurrency, args.duration)
+                )
+            report(
+                f"asgi_{name}",
+                workers=args.workers,
+                concurrency=args.concurrency,
+                **results,
+            )
+    finally:
+        server.terminate()
+        server.wait()
+        Task.objects.filter(title__startswith=TITLE_PREFIX).delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+一括登録・更新・削除APIと1件ずつのAPIの処理時間を比較する
+
+    python -m benchmarks.bench_bulk --rows 1000
+"""
+
+from benchmarks.common import argument_parser, measure, report, rollback, setup
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=1000, help="1回に書き込む件数")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    setup()
+
+    from rest_framework.test import APIClient
+    from todo.models import Task
+
+    client = APIClient()
+    payload = [{"title": f"Task {i}", "status": i % 3} for i in range(args.rows)]
+
+    def per_item_create():
+        with rollback():
+            for item in payload:
+                client.post("/api/todo/", item, format="json")
+
+    def bulk_create():
+        with rollback():
+            client.post(
+                f"/api/todo/bulk/?batch_size={args.batch_size}", payload, format="json"
+            )
+
+    def per_item_update():
+        with rollback():
+            ids = [t.pk for t in Task.objects.bulk_create(Task(**p) for p in payload)]
+            for pk in ids:
+                client.patch(f"/api/todo/{pk}/", {"status": 2}, format="json")
+
+    def bulk_update():
+        with rollback():
+            ids = [t.pk for t in Task.objects.bulk_create(Task(**p) for p in payload)]
+            client.patch(
+                f"/api/todo/bulk/?batch_size={args.batch_size}",
+                [{"id": pk, "status": 2} for pk in ids],
+                format="json",
+            )
+
+    def per_item_delete():
+        with rollback():
+            ids = [t.pk for t in Task.objects.bulk_create(Task(**p) for p in payload)]
+            for pk in ids:
+                client.delete(f"/api/todo/{pk}/")
+
+    def bulk_delete():
+        with rollback():
+            ids = [t.pk for t in Task.objects.bulk_create(Task(**p) for p in payload)]
+            client.delete("/api/todo/bulk/", {"ids": ids}, format="json")
+
+    for operation, per_item, bulk in [
+        ("create", per_item_create, bulk_create),
+        ("update", per_item_update, bulk_update),
+        ("delete", per_item_delete, bulk_delete),
+    ]:
+        per_item_stats = measure(per_item, repeat=args.repeat)
+        bulk_stats = measure(bulk, repeat=args.repeat)
+        report(
+            f"bulk_{operation}",
+            rows=args.rows,
+            per_item=per_item_stats,
+            bulk=bulk_stats,
+            rows_per_sec_per_item=args.rows / per_item_stats["median"],
+            rows_per_sec_bulk=args.rows / bulk_stats["median"],
+            speedup=per_item_stats["median"] / bulk_stats["median"],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+データベース接続の管理方式ごとの1リクエストあたりの処理時間
+
+WSGIハンドラーを直接呼び出し、リクエストの開始・終了時の接続の切断 (CONN_MAX_AGE) を含めて計測する
+試験用のタスクはコミットして登録し、終了時に削除する
+
+    python -m benchmarks.bench_connections --requests 500
+"""
+
+import time
+
+from benchmarks.common import argument_parser, report, setup
+
+TITLE_PREFIX = "bench-connections "
+
+MODES = {
+    # (CONN_MAX_AGE, CONN_HEALTH_CHECKS, TODO_PREPARED_STATEMENTS)
+    "per_request": (0, False, False),
+    "persistent": (60, False, False),
+    "persistent_health_checks": (60, True, False),
+    "persistent_prepared": (60, False, True),
+}
+
+
+def run_requests(handler, environ, count):
+    """
+    WSGIハンドラーにリクエストを送り、1リクエストあたりの平均時間を計測
+
+    Args:
+        handler (WSGIHandler): WSGIハンドラー
+        environ (dict): リクエストのWSGI environ
+        count (int): リクエスト数
+
+    Returns:
+        float: 1リクエストあたりの平均時間 (ミリ秒)
+    """
+
+    def start_response(status, headers):
+        assert status.startswith("200"), status
+
+    start = time.perf_counter()
+    for _ in range(count):
+        response = handler(dict(environ), start_response)
+        b"".join(response)
+        response.close()
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument("--requests", type=int, default=500, help="リクエスト数")
+    parser.add_argument("--tasks", type=int, default=1000, help="登録するタスク数")
+    args = parser.parse_args()
+
+    setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.test import RequestFactory, override_settings
+    from todo.models import Task
+
+    Task.objects.bulk_create(
+        [Task(title=f"{TITLE_PREFIX}{i}") for i in range(args.tasks)]
+    )
+    pk = Task.objects.filter(title__startswith=TITLE_PREFIX).values("pk")[:1][0]["pk"]
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    urls = {
+        "list": "/api/todo/?page=2",
+        "detail": f"/api/todo/{pk}/",
+        "summary": "/api/todo/summary/",
+    }
+    try:
+        for name, url in urls.items():
+            environ = factory.get(url, HTTP_HOST="localhost").environ
+            results = {}
+            for mode, (max_age, health_checks, prepared) in MODES.items():
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+                with override_settings(TODO_PREPARED_STATEMENTS=prepared):
+                    run_requests(handler, environ, 10)
+                    results[mode] = round(
+                        run_requests(handler, environ, args.requests), 3
+                    )
+            report(f"connections_{name}", unit="ms/request", **results)
+    finally:
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = 0
+        Task.objects.filter(title__startswith=TITLE_PREFIX).delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+COPYによる取り込みと一括登録APIの1秒あたりの登録件数を比較する
+
+    python -m benchmarks.bench_import --rows 200000
+"""
+
+import io
+import json
+
+from benchmarks.common import argument_parser, measure, report, rollback, setup
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=200000, help="取り込む件数")
+    args = parser.parse_args()
+    setup()
+
+    from rest_framework.test import APIClient
+    from todo.importer import TaskImporter, read_csv, read_ndjson
+
+    client = APIClient()
+    rows = [
+        {
+            "title": f"Task {i}",
+            "description": "説明" if i % 2 else None,
+            "status": i % 3,
+            "priority": i % 3,
+            "due_date": "2024-07-01T09:00:00+09:00" if i % 4 else None,
+        }
+        for i in range(args.rows)
+    ]
+    ndjson = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    csv_text = "title,description,status,priority,due_date\n" + "".join(
+        f"{row['title']},{row['description'] or ''},{row['status']},"
+        f"{row['priority']},{row['due_date'] or ''}\n"
+        for row in rows
+    )
+
+    def import_ndjson():
+        with rollback():
+            TaskImporter().run(read_ndjson(io.StringIO(ndjson)))
+
+    def import_csv():
+        with rollback():
+            TaskImporter().run(read_csv(io.StringIO(csv_text, newline="")))
+
+    # 一括登録APIは最大件数の制限があるため、件数を揃えずに1秒あたりで比較する
+    api_rows = rows[:10000]
+
+    def bulk_api():
+        with rollback():
+            client.post("/api/todo/bulk/", api_rows, format="json")
+
+    for name, func, count in [
+        ("copy_ndjson", import_ndjson, len(rows)),
+        ("copy_csv", import_csv, len(rows)),
+        ("bulk_api", bulk_api, len(api_rows)),
+    ]:
+        result = measure(func, repeat=args.repeat)
+        report(
+            f"import_{name}",
+            rows=count,
+            rows_per_second=round(count / result["median"]),
+            **result,
+        )
+
+
+if __name__ == "__main__":
+    main()
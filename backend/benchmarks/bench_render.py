@@ -0,0 +1,69 @@
+"""
+大きな page_size の一覧について、JSONへの変換時間 (JSONRenderer / ORJSONRenderer) と
+転送量・圧縮時間 (無圧縮 / gzip / brotli) を比較する
+
+    python -m benchmarks.bench_render --page-sizes 100,1000,5000
+"""
+
+from benchmarks.common import argument_parser, measure, report, rollback, setup
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument(
+        "--page-sizes", default="100,1000,5000", help="1ページの件数 (カンマ区切り)"
+    )
+    args = parser.parse_args()
+    page_sizes = sorted(int(size) for size in args.page_sizes.split(","))
+    setup()
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+    from todo.compression import compress
+    from todo.models import Task
+    from todo.renderers import ORJSONRenderer
+    from todo.serializers import TaskReadSerializer
+
+    json_renderer = JSONRenderer()
+    orjson_renderer = ORJSONRenderer()
+    with rollback():
+        now = timezone.now()
+        Task.objects.bulk_create(
+            Task(title=f"タスク {i}", description="説明 " * 40, due_date=now)
+            for i in range(page_sizes[-1])
+        )
+        for page_size in page_sizes:
+            reader = TaskReadSerializer()
+            queryset = Task.objects.order_by("due_date", "id")[:page_size]
+            rows = reader.to_representation(list(reader.select(queryset)))
+            # ページネーションのレスポンスと同じ形式
+            data = {
+                "count": page_size,
+                "next": None,
+                "previous": None,
+                "page_size": page_size,
+                "results": rows,
+            }
+            content = orjson_renderer.render(data)
+            assert content == json_renderer.render(data)
+            before = measure(lambda: json_renderer.render(data), repeat=args.repeat)
+            after = measure(lambda: orjson_renderer.render(data), repeat=args.repeat)
+            gzip = measure(lambda: compress("gzip", content), repeat=args.repeat)
+            br = measure(lambda: compress("br", content), repeat=args.repeat)
+
+            report(
+                "render",
+                page_size=page_size,
+                json_renderer=before,
+                orjson_renderer=after,
+                render_speedup=before["median"] / after["median"],
+                identity_bytes=len(content),
+                gzip_bytes=len(compress("gzip", content)),
+                br_bytes=len(compress("br", content)),
+                gzip_seconds=gzip["median"],
+                br_seconds=br["median"],
+            )
+
+
+if __name__ == "__main__":
+    main()
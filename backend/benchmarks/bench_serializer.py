@@ -0,0 +1,54 @@
+"""
+TaskSerializer と読み取り専用の高速版 TaskReadSerializer のシリアライズ時間を比較する
+
+    python -m benchmarks.bench_serializer --rows 1000
+"""
+
+from benchmarks.common import argument_parser, measure, report, rollback, setup
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=1000, help="1ページの件数")
+    args = parser.parse_args()
+    setup()
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+    from todo.models import Task
+    from todo.serializers import TaskReadSerializer, TaskSerializer
+
+    renderer = JSONRenderer()
+    with rollback():
+        now = timezone.now()
+        Task.objects.bulk_create(
+            Task(title=f"Task {i}", description="x" * 200, due_date=now)
+            for i in range(args.rows)
+        )
+        queryset = Task.objects.order_by("due_date", "id")[: args.rows]
+
+        def model_serializer():
+            return renderer.render(TaskSerializer(list(queryset), many=True).data)
+
+        def read_serializer():
+            reader = TaskReadSerializer()
+            rows = list(reader.select(queryset))
+            return renderer.render(reader.to_representation(rows))
+
+        assert model_serializer() == read_serializer()
+        before = measure(model_serializer, repeat=args.repeat)
+        after = measure(read_serializer, repeat=args.repeat)
+
+    report(
+        "serializer",
+        rows=args.rows,
+        model_serializer=before,
+        read_serializer=after,
+        rows_per_sec_model_serializer=args.rows / before["median"],
+        rows_per_sec_read_serializer=args.rows / after["median"],
+        speedup=before["median"] / after["median"],
+    )
+
+
+if __name__ == "__main__":
+    main()
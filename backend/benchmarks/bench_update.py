@@ -0,0 +1,71 @@
+"""
+タスクの状況の変更について、フロントエンドが送る全項目のPUT、通常のPATCH、
+UPDATE ... RETURNING の1文で更新するPATCHの処理時間とSQL実行回数を比較する
+
+    python -m benchmarks.bench_update --updates 500
+"""
+
+from benchmarks.common import argument_parser, measure, report, rollback, setup
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument("--updates", type=int, default=500, help="更新の回数")
+    args = parser.parse_args()
+    setup()
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, setup_test_environment
+    from rest_framework.test import APIClient
+    from todo.models import Task
+    from todo.views import DetailView
+
+    # 本番と同じく DEBUG=False で計測する
+    setup_test_environment(debug=False)
+    client = APIClient()
+    fast_update_fields = DetailView.fast_update_fields
+    results = {}
+    with rollback():
+        # 同じ行をトランザクション内で繰り返し更新すると行の版が溜まって遅くなるため、
+        # 1回の計測では更新の回数分のタスクを1回ずつ更新する
+        tasks = Task.objects.bulk_create(
+            Task(title=f"Task {i}", description="x" * 200) for i in range(args.updates)
+        )
+        urls = [f"/api/todo/{task.pk}/" for task in tasks]
+        full = client.get(urls[0]).json()
+        del full["id"]
+
+        def put():
+            for i, url in enumerate(urls):
+                response = client.put(url, {**full, "status": i % 3}, format="json")
+                assert response.status_code == 200, response.status_code
+
+        def patch():
+            for i, url in enumerate(urls):
+                response = client.patch(url, {"status": i % 3}, format="json")
+                assert response.status_code == 200, response.status_code
+
+        def count_queries(func):
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            return len(queries) / args.updates
+
+        try:
+            for name, func, fields in (
+                ("put", put, fast_update_fields),
+                ("patch", patch, ()),
+                ("fast_patch", patch, fast_update_fields),
+            ):
+                DetailView.fast_update_fields = fields
+                timing = measure(func, repeat=args.repeat)
+                results[f"{name}_per_sec"] = round(args.updates / timing["median"])
+                results[f"{name}_queries"] = count_queries(func)
+        finally:
+            DetailView.fast_update_fields = fast_update_fields
+
+    # 外側のトランザクション内で計測するため、PUT と通常のPATCHは SAVEPOINT / RELEASE SAVEPOINT を含む
+    report("update", updates=args.updates, **results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+エンドポイントごとの1リクエストあたりのSQL実行回数の上限 (クエリ予算)
+
+テスト (todo/tests/test_query_budgets.py) では少数のタスクで、
+ベンチマーク (benchmarks.bench_api) では計測する件数ごとに上限を超えていないことを確認する
+書き込みは外側のトランザクション内で実行するため、SAVEPOINT / RELEASE SAVEPOINT の2回を含む
+"""
+
+# 名前: (メソッド, パス, リクエストボディ, SQL実行回数の上限)
+# パスの {pk} は既存のタスクのid、{since} は変更フィードの現在のトークンに置き換える
+QUERY_BUDGETS = {
+    # 件数・最終更新日時 (ETag)、総件数、1ページ分のタスク
+    "list": ("get", "/api/todo/?page=2", None, 4),
+    "list_keyset": ("get", "/api/todo/?pagination=keyset", None, 4),
+    "list_search": ("get", "/api/todo/?search=report", None, 4),
+    "list_filtered": ("get", "/api/todo/?status=0,1&ordering=-priority", None, 4),
+    "detail": ("get", "/api/todo/{pk}/", None, 1),
+    "summary": ("get", "/api/todo/summary/", None, 1),
+    "async_list": ("get", "/api/async/todo/?page=2", None, 4),
+    "async_detail": ("get", "/api/async/todo/{pk}/", None, 1),
+    "async_summary": ("get", "/api/async/todo/summary/", None, 1),
+    "export": ("get", "/api/todo/export/", None, 1),
+    # 確定済みのトランザクションID、登録・更新されたタスク、削除の記録
+    "changes": ("get", "/api/todo/changes/?since={since}", None, 3),
+    "create": ("post", "/api/todo/", {"title": "budget"}, 1),
+    # SAVEPOINT、対象の取得、UPDATE / DELETE、RELEASE SAVEPOINT
+    "update": ("patch", "/api/todo/{pk}/", {"title": "budget"}, 4),
+    # 状況・優先度だけのPATCHは UPDATE ... RETURNING の1文 (トランザクションを使用しない)
+    "update_status": ("patch", "/api/todo/{pk}/", {"status": 1}, 1),
+    "delete": ("delete", "/api/todo/{pk}/", None, 4),
+    "bulk_create": ("post", "/api/todo/bulk/", [{"title": "budget"}] * 10, 3),
+}
+
+
+def request_endpoint(client, name, pk=None):
+    """
+    エンドポイントにリクエストを送り、実行したSQLの回数を数える
+    ストリーミングのレスポンスは最後まで読み込む
+
+    Args:
+        client (APIClient): テスト用のクライアント
+        name (str): QUERY_BUDGETS の名前
+        pk (int): パスの {pk} に指定するタスクのid
+
+    Returns:
+        tuple: (レスポンス, SQLの実行回数)
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from todo.changes import current_token
+
+    method, path, data, _ = QUERY_BUDGETS[name]
+    path = path.format(pk=pk, since=current_token())
+    with CaptureQueriesContext(connection) as queries:
+        if data is None:
+            response = getattr(client, method)(path)
+        else:
+            response = getattr(client, method)(path, data, format="json")
+        if response.streaming:
+            b"".join(response.streaming_content)
+    return response, len(queries)
@@ -0,0 +1,146 @@
+"""
+ベンチマーク共通処理
+
+backendディレクトリで `python -m benchmarks.<モジュール名>` として実行する
+データベースは settings.DATABASES["default"] を使用し、計測中に作成したデータはロールバックする
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    """
+    Djangoを初期化する
+    """
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    django.setup()
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rollback():
+    """
+    ブロック内のデータベース操作を最後にロールバックする
+    """
+    from django.db import transaction
+
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def measure(func, repeat=5, warmup=1):
+    """
+    関数の実行時間を計測
+
+    Args:
+        func (callable): 計測する関数
+        repeat (int): 計測回数
+        warmup (int): 計測前に実行する回数
+
+    Returns:
+        dict: 実行時間の統計 (秒)
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "repeat": repeat,
+    }
+
+
+# report() で書き出した計測結果
+RESULTS = []
+
+
+def report(name, **results):
+    """
+    計測結果を1行のJSONとして標準出力に書き出す
+
+    Args:
+        name (str): ベンチマーク名
+        **results: 計測結果
+    """
+    result = {"benchmark": name, **results}
+    RESULTS.append(result)
+    print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+def environment():
+    """
+    計測結果を比較するための実行環境の情報を取得
+    Djangoの初期化後に呼び出す
+
+    Returns:
+        dict: コミット、各バージョン、計測日時
+    """
+    import django
+    from django.db import connection
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.display_name
+        + " "
+        + ".".join(map(str, connection.get_database_version())),
+        "machine": platform.machine(),
+    }
+
+
+def write_results(path, **meta):
+    """
+    report() で書き出した計測結果を実行環境の情報とともにJSONファイルに保存する
+    benchmarks.compare で別のコミットの結果と比較できる
+
+    Args:
+        path (str): 保存先のパス
+        **meta: 追加する実行条件
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"environment": {**environment(), **meta}, "results": RESULTS},
+            file,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+
+def argument_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    return parser
@@ -0,0 +1,97 @@
+"""
+benchmarks.bench_api --output で保存した2つの計測結果を比較する
+
+同じベンチマーク名・タスク件数の結果どうしで、処理時間の中央値 p50_ms (小さいほど良い) と
+*_per_sec (大きいほど良い) の項目を比較し、--threshold を超えて悪化した項目がある場合やSQLの実行回数が増えた場合は終了コード1で終了する
+
+    python -m benchmarks.compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    """
+    計測結果のファイルを読み込む
+
+    Args:
+        path (str): write_results() で保存したJSONファイル
+
+    Returns:
+        tuple: (実行環境の情報, {(ベンチマーク名, タスク件数): 計測結果})
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    results = {
+        (result["benchmark"], result.get("tasks")): result for result in data["results"]
+    }
+    return data["environment"], results
+
+
+def compare(base, head, threshold):
+    """
+    計測結果を比較
+
+    Args:
+        base (dict): 比較元の計測結果
+        head (dict): 比較先の計測結果
+        threshold (float): 悪化とみなす変化率
+
+    Returns:
+        tuple: (比較結果の行のリスト, 悪化した項目の数)
+    """
+    rows = []
+    regressions = 0
+    for key in sorted(base.keys() & head.keys(), key=str):
+        for field, before in base[key].items():
+            after = head[key].get(field)
+            if isinstance(before, bool) or not isinstance(before, (int, float)):
+                continue
+            if not isinstance(after, (int, float)):
+                continue
+            if field == "p50_ms":
+                lower_is_better = True
+            elif field.endswith("_per_sec"):
+                lower_is_better = False
+            elif field == "queries":
+                regressed = after > before
+                regressions += regressed
+                rows.append((key, field, before, after, None, regressed))
+                continue
+            else:
+                continue
+            change = (after - before) / before if before else 0.0
+            regressed = change > threshold if lower_is_better else -change > threshold
+            regressions += regressed
+            rows.append((key, field, before, after, change, regressed))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("base", help="比較元の計測結果")
+    parser.add_argument("head", help="比較先の計測結果")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="悪化とみなす変化率"
+    )
+    args = parser.parse_args()
+
+    base_env, base = load(args.base)
+    head_env, head = load(args.head)
+    print(f"{base_env.get('commit')} -> {head_env.get('commit')}")
+    rows, regressions = compare(base, head, args.threshold)
+    for (name, tasks), field, before, after, change, regressed in rows:
+        change_text = "" if change is None else f"{change:+.1%}"
+        mark = "  <- 悪化" if regressed else ""
+        print(
+            f"{name:<28} {tasks or '':>8} {field:<20} {before:>12} {after:>12} "
+            f"{change_text:>8}{mark}"
+        )
+    if regressions:
+        sys.exit(f"{regressions}項目が悪化しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ import pytest
 sys.path.append(os.path.dirname(__file__))
 
 # Django設定モジュールを環境変数として設定
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.test_settings')
 
 # Djangoを初期化
 django.setup()
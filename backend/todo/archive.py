@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from todo.cache import invalidate_task_data
+from todo.models import ArchivedTask, Task
+from todo.summary import COMPLETED_STATUS
+
+# タスクテーブルからアーカイブへ移動する列
+ARCHIVE_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "created_at",
+    "updated_at",
+)
+
+# 完了から一定期間が経過したタスクを batch_size 件ずつ1文で移動する
+# 更新中の行は SKIP LOCKED で飛ばし、次回のアーカイブで移動する
+_columns = ", ".join(ARCHIVE_COLUMNS)
+ARCHIVE_SQL = f"""
+WITH moved AS (
+    DELETE FROM {Task._meta.db_table}
+    WHERE id IN (
+        SELECT id FROM {Task._meta.db_table}
+        WHERE status = %s AND updated_at < %s
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING {_columns}
+)
+INSERT INTO {ArchivedTask._meta.db_table} ({_columns}, archived_at)
+SELECT {_columns}, %s FROM moved
+"""
+
+
+def archive_cutoff(days=None, now=None):
+    """
+    アーカイブの対象とする最終更新日時の上限を取得
+
+    Args:
+        days (int): 完了からの日数、省略時は settings.TODO_ARCHIVE_AFTER_DAYS
+        now (datetime): 現在時刻、省略時は timezone.now()
+
+    Returns:
+        datetime: この日時より前に更新された完了タスクをアーカイブする
+    """
+    if days is None:
+        days = settings.TODO_ARCHIVE_AFTER_DAYS
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def archivable_tasks(before):
+    """
+    アーカイブの対象のタスクを取得
+
+    Args:
+        before (datetime): 最終更新日時の上限
+
+    Returns:
+        QuerySet: 完了済みで before より前に更新されたタスク
+    """
+    return Task.objects.filter(status=COMPLETED_STATUS, updated_at__lt=before)
+
+
+def archive_tasks(before, batch_size=None, using=DEFAULT_DB_ALIAS):
+    """
+    完了済みのタスクをアーカイブテーブルに移動する
+    batch_size 件ごとにコミットし、ロックを短時間に抑える
+    状況ごとのカウンターはタスクテーブルの削除のトリガーで減る
+
+    Args:
+        before (datetime): この日時より前に更新された完了タスクを移動する
+        batch_size (int): 1回で移動する件数、省略時は settings.TODO_ARCHIVE_BATCH_SIZE
+        using (str): データベースのエイリアス
+
+    Returns:
+        int: 移動した件数
+    """
+    batch_size = batch_size or settings.TODO_ARCHIVE_BATCH_SIZE
+    archived = 0
+    while True:
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    ARCHIVE_SQL, [COMPLETED_STATUS, before, batch_size, timezone.now()]
+                )
+                moved = cursor.rowcount
+            if moved:
+                invalidate_task_data(using)
+        archived += moved
+        if moved < batch_size:
+            return archived
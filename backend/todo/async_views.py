@@ -0,0 +1,232 @@
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from todo.cache import cache_by_data_version
+from todo.conditional import (
+    aget_data_state,
+    collection_etag,
+    evaluate_preconditions,
+    set_validators,
+    summary_etag,
+    task_etag,
+)
+from todo.counting import get_count_strategy
+from todo.filters import (
+    filter_tasks,
+    includes_archived,
+    is_time_dependent,
+    parse_ordering,
+    task_queryset,
+)
+from todo.models import ArchivedTask, Task, TaskWithArchived
+from todo.pagination import (
+    CustomPagination,
+    KeysetPagination,
+    get_page_size,
+    link_header,
+)
+from todo.responses import error_response, json_response
+from todo.serializers import TaskReadSerializer, TaskSerializer
+from todo.summary import astatus_summary, atask_breakdown
+from todo.views import SparseFieldsMixin
+
+UNSUPPORTED_MESSAGE = "非同期ビューでは指定できません"
+
+
+def reject_unsupported_params(params, keyset=False):
+    """
+    同期版のビューだけが対応しているパラメータ (?fields= / ?omit=、キーセット方式) を拒否する
+    無視すると同期版と異なるレスポンスを正常に返してしまうため、400にする
+
+    Args:
+        params (QueryDict): クエリパラメータ
+        keyset (bool): キーセット方式のページングのパラメータも拒否する場合はTrue
+
+    Raises:
+        ValidationError: 対応していないパラメータが指定された場合
+    """
+    names = [SparseFieldsMixin.fields_query_param, SparseFieldsMixin.omit_query_param]
+    if keyset:
+        names.append(KeysetPagination.cursor_query_param)
+    errors = {name: [UNSUPPORTED_MESSAGE] for name in names if name in params}
+    mode = KeysetPagination.mode_query_param
+    if keyset and params.get(mode) == KeysetPagination.mode_query_value:
+        errors[mode] = [UNSUPPORTED_MESSAGE]
+    if errors:
+        raise ValidationError(errors)
+
+
+async def serialize_tasks(queryset):
+    """
+    クエリセットのタスクを非同期に取得してシリアライズ
+
+    Args:
+        queryset (QuerySet): タスクのクエリセット
+
+    Returns:
+        list: シリアライズされたタスクデータのリスト
+    """
+    if TaskReadSerializer.is_supported():
+        reader = TaskReadSerializer()
+        rows = [row async for row in reader.select(queryset)]
+        return reader.to_representation(rows)
+    tasks = [task async for task in queryset]
+    return TaskSerializer(tasks, many=True).data
+
+
+async def paginate(request, queryset):
+    """
+    タスクをページ番号方式でページングし、CustomPagination と同じ形式のデータを作成
+    次ページの有無は1件多く取得して判定する
+
+    Args:
+        request (HttpRequest): リクエスト
+        queryset (QuerySet): タスクのクエリセット
+
+    Returns:
+        dict: ページネーションされたタスクリスト
+
+    Raises:
+        NotFound: ページ番号が不正、または範囲外の場合
+    """
+    page_param = CustomPagination.page_query_param
+    page_size = get_page_size(request.GET)
+    try:
+        number = int(request.GET.get(page_param, 1))
+    except ValueError:
+        number = 0
+    count, count_is_exact = await get_count_strategy().acount(queryset)
+    bottom = (number - 1) * page_size
+    if number < 1 or (count_is_exact and number > 1 and bottom >= count):
+        raise NotFound(CustomPagination.invalid_page_message)
+
+    results = await serialize_tasks(queryset[bottom : bottom + page_size + 1])
+    if not results and number > 1:
+        raise NotFound(CustomPagination.invalid_page_message)
+
+    url = request.build_absolute_uri()
+    next_link = previous_link = None
+    if len(results) > page_size:
+        next_link = replace_query_param(url, page_param, number + 1)
+    if number == 2:
+        previous_link = remove_query_param(url, page_param)
+    elif number > 2:
+        previous_link = replace_query_param(url, page_param, number - 1)
+    return {
+        "links": {"next": next_link, "previous": previous_link},
+        "count": count,
+        "count_is_exact": count_is_exact,
+        "page_size": page_size,
+        "results": results[:page_size],
+    }
+
+
+@require_safe
+@cache_by_data_version
+async def task_list(request):
+    """
+    タスクリストを取得する非同期ビュー
+    ListView のGETと同じ絞り込み・並び替え・ページング・条件付きリクエスト・レスポンスキャッシュに対応する
+    ?fields= / ?omit= とキーセット方式のページングには対応せず、400を返す
+    ASGIサーバーではデータベースの応答待ちの間に他のリクエストを処理できる
+
+    Returns:
+        HttpResponse: ページネーションされたタスクリスト
+    """
+    try:
+        reject_unsupported_params(request.GET, keyset=True)
+        queryset = filter_tasks(task_queryset(request.GET), request.GET)
+        ordering = parse_ordering(request.GET)
+        if ordering is not None:
+            queryset = queryset.order_by(*ordering)
+
+        etag = None
+        if not (is_time_dependent(request.GET) or includes_archived(request.GET)):
+            etag = collection_etag(request, await aget_data_state())
+            response = evaluate_preconditions(request, etag=etag)
+            if response is not None:
+                return response
+        data = await paginate(request, queryset)
+    except APIException as exc:
+        return error_response(exc)
+    response = json_response(data)
+    link = link_header(data["links"])
+    if link:
+        response["Link"] = link
+    set_validators(response, etag)
+    return response
+
+
+@require_safe
+async def task_detail(request, pk):
+    """
+    タスクの詳細を取得する非同期ビュー
+    DetailView のGETと同じくETag/Last-Modifiedによる条件付きリクエストに対応する
+    ?fields= / ?omit= には対応せず、400を返す
+
+    Args:
+        pk (int): タスクのID
+
+    Returns:
+        HttpResponse: タスクの詳細
+    """
+    try:
+        reject_unsupported_params(request.GET)
+    except APIException as exc:
+        return error_response(exc)
+    try:
+        task = await Task.objects.aget(pk=pk)
+    except Task.DoesNotExist:
+        task = await ArchivedTask.objects.filter(pk=pk).afirst()
+        if task is None:
+            return error_response(NotFound())
+    etag = task_etag(task.pk, task.updated_at)
+    response = evaluate_preconditions(request, etag, task.updated_at)
+    if response is not None:
+        return response
+    response = json_response(TaskSerializer(task).data)
+    set_validators(response, etag, task.updated_at)
+    return response
+
+
+@require_safe
+async def task_summary(request):
+    """
+    タスクのサマリー情報を取得する非同期ビュー
+    task_summary と同じく件数はカウンターから取得し、?breakdown=true で内訳を集計する
+    ?include_archived=true を指定するとアーカイブ済みのタスクも件数に含める
+
+    Returns:
+        HttpResponse: タスクのサマリー情報
+    """
+    try:
+        archived = includes_archived(request.GET)
+    except APIException as exc:
+        return error_response(exc)
+    if request.GET.get("breakdown") in ("1", "true"):
+        queryset = TaskWithArchived.objects.all() if archived else None
+        return json_response(await atask_breakdown(queryset))
+    return await _status_summary(request, archived)
+
+
+@cache_by_data_version
+async def _status_summary(request, archived=False):
+    """
+    カウンターから合計件数と完了件数を取得する (views._status_summary の非同期版)
+
+    Args:
+        request (HttpRequest): リクエスト
+        archived (bool): アーカイブ済みのタスク (全て完了) の件数を含める場合はTrue
+
+    Returns:
+        HttpResponse: 合計件数と完了件数
+    """
+    summary = await astatus_summary(archived)
+    etag = summary_etag(request, summary)
+    response = evaluate_preconditions(request, etag=etag)
+    if response is not None:
+        return response
+    response = json_response(summary)
+    set_validators(response, etag)
+    return response
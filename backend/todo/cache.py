@@ -0,0 +1,233 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+from todo.conditional import evaluate_preconditions, set_validators
+from todo.models import Task
+from todo.routers import reads_primary
+
+DATA_VERSION_KEY = "todo:task:data-version"
+
+
+def get_data_version():
+    """
+    タスクデータのバージョンを取得
+    タスクが更新されるたびに増加し、キャッシュのキーに含めることで古いエントリを無効化する
+
+    Returns:
+        int: 現在のデータバージョン
+    """
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # キャッシュから追い出された後に過去の値を再利用しないよう時刻を初期値にする
+        cache.add(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """
+    タスクデータのバージョンを進める
+    タスクの登録・更新・削除の後に呼び出す
+
+    Returns:
+        int: 更新後のデータバージョン
+    """
+    try:
+        return cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.set(DATA_VERSION_KEY, time.time_ns(), timeout=None)
+        return cache.get(DATA_VERSION_KEY)
+
+
+def invalidate_task_data(using=None):
+    """
+    タスクの変更をキャッシュに反映する
+    トランザクション中はコミット前に古いデータがキャッシュされる可能性があるため、
+    コミット後にもう一度バージョンを進める
+
+    Args:
+        using (str): 変更を行ったデータベースのエイリアス
+    """
+    bump_data_version()
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(bump_data_version, using=using)
+
+
+RESPONSE_CACHE_STATS_KEYS = {
+    "hits": "todo:response-cache:hits",
+    "misses": "todo:response-cache:misses",
+}
+
+
+def response_cache_key(request, version):
+    """
+    レスポンスキャッシュのキーを作成
+    データバージョンを含めるため、タスクが変更されると古いエントリは参照されなくなる
+
+    Args:
+        request (HttpRequest): リクエスト
+        version (int): データバージョン
+
+    Returns:
+        str: キャッシュキー
+    """
+    source = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    digest = hashlib.md5(source.encode()).hexdigest()
+    return f"todo:response:{version}:{digest}"
+
+
+def _record(stat):
+    key = RESPONSE_CACHE_STATS_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_response_cache_stats():
+    """
+    レスポンスキャッシュのヒット数とミス数を取得
+
+    Returns:
+        dict: {"hits": int, "misses": int}
+    """
+    values = cache.get_many(RESPONSE_CACHE_STATS_KEYS.values())
+    return {stat: values.get(key, 0) for stat, key in RESPONSE_CACHE_STATS_KEYS.items()}
+
+
+def _cached_response(request, entry):
+    """
+    キャッシュのエントリからレスポンスを作成
+    条件付きリクエストにはエントリのETagで304を返す
+
+    Args:
+        request (HttpRequest): リクエスト
+        entry (dict): キャッシュのエントリ
+
+    Returns:
+        HttpResponse: レスポンス
+    """
+    response = evaluate_preconditions(request, etag=entry["etag"])
+    if response is None:
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        set_validators(response, entry["etag"])
+        if entry.get("link"):
+            response["Link"] = entry["link"]
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def _cache_entry(response):
+    """
+    変換済みのレスポンスからキャッシュのエントリを作成
+
+    Args:
+        response (HttpResponse): 変換済みのレスポンス
+
+    Returns:
+        dict: キャッシュのエントリ
+    """
+    return {
+        "content": response.content,
+        "content_type": response["Content-Type"],
+        "etag": response.get("ETag"),
+        "link": response.get("Link"),
+    }
+
+
+def cache_by_data_version(view):
+    """
+    GETのレスポンスを (URL, Acceptヘッダー, データバージョン) をキーにキャッシュするデコレーター
+    キャッシュにヒットした場合はデータベースにアクセスせずにレスポンスを返す
+    ETagのないレスポンスはデータ以外の要因で変わりうるため、キャッシュしない
+    レプリカから読み取ったレスポンスは書き込みより古い場合があるため、ヒットは返すが保存しない
+    非同期ビューにも適用できる
+    settings.TODO_RESPONSE_CACHE_TIMEOUT が0の場合は無効
+
+    Args:
+        view (callable): ビュー関数
+
+    Returns:
+        callable: キャッシュを適用したビュー関数
+    """
+    if iscoroutinefunction(view):
+        return _acache_by_data_version(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = settings.TODO_RESPONSE_CACHE_TIMEOUT
+        if not timeout or request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+
+        key = response_cache_key(request, get_data_version())
+        entry = cache.get(key)
+        if entry is not None:
+            _record("hits")
+            return _cached_response(request, entry)
+
+        _record("misses")
+        # ビューの実行前に判定する (プライマリへの固定はリクエスト全体に適用される)
+        cacheable = reads_primary(Task)
+        response = view(request, *args, **kwargs)
+        if (
+            cacheable
+            and response.status_code == 200
+            and response.has_header("ETag")
+            and hasattr(response, "add_post_render_callback")
+        ):
+            response.add_post_render_callback(
+                lambda rendered: cache.set(key, _cache_entry(rendered), timeout)
+            )
+        response["X-Cache"] = "MISS"
+        return response
+
+    return wrapper
+
+
+def _acache_by_data_version(view):
+    """
+    非同期ビューに cache_by_data_version() を適用する
+    非同期ビューのレスポンスは変換済みのため、ビューの実行後にそのまま保存する
+
+    Args:
+        view (callable): 非同期ビュー関数
+
+    Returns:
+        callable: キャッシュを適用した非同期ビュー関数
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        timeout = settings.TODO_RESPONSE_CACHE_TIMEOUT
+        if not timeout or request.method not in ("GET", "HEAD"):
+            return await view(request, *args, **kwargs)
+
+        key = response_cache_key(request, await sync_to_async(get_data_version)())
+        entry = await cache.aget(key)
+        if entry is not None:
+            await sync_to_async(_record)("hits")
+            return _cached_response(request, entry)
+
+        await sync_to_async(_record)("misses")
+        # トランザクションの状態は、クエリを実行するスレッドの接続で判定する
+        cacheable = await sync_to_async(reads_primary)(Task)
+        response = await view(request, *args, **kwargs)
+        if (
+            cacheable
+            and response.status_code == 200
+            and response.has_header("ETag")
+            and not response.streaming
+        ):
+            await cache.aset(key, _cache_entry(response), timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    return wrapper
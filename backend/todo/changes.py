@@ -0,0 +1,243 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import BigIntegerField, F, Value
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from todo.models import Task, TaskDeletion
+from todo.pagination import _Row, _RowCompare
+from todo.routers import pin_primary
+from todo.serializers import TaskReadSerializer
+
+# 行を書き込んだトランザクションのID (xid8) の列
+CHANGE_XID = "change_xid"
+
+
+class ChangeTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "トークンの有効期限が切れています。一覧を取得し直してください"
+    default_code = "token_expired"
+
+
+def change_xid(model):
+    """
+    行を書き込んだトランザクションのID (マイグレーション 0010 でモデル外に追加した列)
+
+    Args:
+        model (type): Task または TaskDeletion
+
+    Returns:
+        RawSQL: change_xid 列の式
+    """
+    return RawSQL(f'"{model._meta.db_table}"."{CHANGE_XID}"', (), BigIntegerField())
+
+
+def changes_horizon():
+    """
+    変更フィードで確定済みとみなすトランザクションIDを取得
+    現在のスナップショットの xmin より前のトランザクションは全て完了しているため、
+    これより前のIDの変更がこれからコミットされることはない
+    実行中のトランザクションの変更はコミットが遅れても次回以降に返す
+
+    Returns:
+        int: 実行中の最も古いトランザクションのID (xid8)
+    """
+    with connections[router.db_for_write(Task)].cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def encode_token(tasks_key, deletions_key, issued_at):
+    """
+    タスクと削除の記録の読み取り位置をトークンに変換
+
+    Args:
+        tasks_key (tuple): 最後に返したタスクの (change_xid, id)
+        deletions_key (tuple): 最後に返した削除の記録の (change_xid, id)
+        issued_at (datetime): トークンの発行日時 (保持期間の判定に使用する)
+
+    Returns:
+        str: URLに含められるトークン
+    """
+    payload = json.dumps(
+        {"u": list(tasks_key), "d": list(deletions_key), "t": issued_at.isoformat()}
+    )
+    encoded = base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+    return encoded.rstrip("=")
+
+
+def decode_token(token):
+    """
+    トークンを読み取り位置に復号
+
+    Args:
+        token (str): encode_token() で作成したトークン
+
+    Returns:
+        tuple: (タスクの (change_xid, id), 削除の記録の (change_xid, id), 発行日時)
+
+    Raises:
+        ValidationError: トークンが不正な場合
+        ChangeTokenExpired: 変更日時を位置としていた以前の形式のトークンの場合
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(data, dict) and "u" in data and "t" not in data:
+            raise ChangeTokenExpired()
+        keys = [(int(data[name][0]), int(data[name][1])) for name in ("u", "d")]
+        issued_at = parse_datetime(data["t"])
+        if issued_at is None or timezone.is_naive(issued_at):
+            raise ValueError(data["t"])
+        return keys[0], keys[1], issued_at
+    except (TypeError, ValueError, KeyError, IndexError, UnicodeError):
+        raise ValidationError({"since": ["トークンが不正です"]})
+
+
+def current_token(now=None):
+    """
+    現在の位置のトークンを取得
+    クライアントは一覧を取得する前にこのトークンを取得し、以降の変更を ?since= で取得する
+
+    Args:
+        now (datetime): 発行日時、省略時は timezone.now()
+
+    Returns:
+        str: トークン
+    """
+    key = (changes_horizon(), 0)
+    return encode_token(key, key, now or timezone.now())
+
+
+def _read_after(queryset, key, horizon, limit):
+    """
+    (change_xid, id) が key より後の行を最大limit件取得し、次の読み取り位置を決める
+    確定前 (horizon 以降) のトランザクションの行は返すが、位置は horizon より先に進めない
+
+    Args:
+        queryset (QuerySet): change_xid を含めて values() を適用したクエリセット
+        key (tuple): 前回の読み取り位置 (change_xid, id)
+        horizon (int): 確定済みとみなすトランザクションID
+        limit (int): 取得する最大件数
+
+    Returns:
+        tuple: (行のリスト, 次の読み取り位置, 続きがある場合はTrue)
+    """
+    rows = list(
+        queryset.filter(
+            _RowCompare(
+                _Row(F(CHANGE_XID), F("id")),
+                ">",
+                _Row(Value(key[0]), Value(key[1])),
+            )
+        ).order_by(CHANGE_XID, "id")[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more and rows[-1][CHANGE_XID] < horizon:
+        return rows, (rows[-1][CHANGE_XID], rows[-1]["id"]), True
+    # 残りを全て返した (または確定前の行だけが残る) 場合は horizon まで進める
+    return rows, max(key, (horizon, 0)), False
+
+
+def read_changes(token, limit=None, now=None):
+    """
+    トークンの位置以降にコミットされたタスクの登録・更新・削除を取得
+
+    Args:
+        token (str): 前回のレスポンスの next
+        limit (int): タスク・削除それぞれの最大件数、省略時は TODO_CHANGES_LIMIT
+        now (datetime): 現在時刻、省略時は timezone.now()
+
+    Returns:
+        dict: 登録・更新されたタスク (tasks)、削除されたタスクのid (deleted)、
+            次回のトークン (next)、続きがあるか (has_more)
+
+    Raises:
+        ValidationError: トークンが不正な場合
+        ChangeTokenExpired: 削除の記録の保持期間より前のトークンの場合
+    """
+    tasks_key, deletions_key, issued_at = decode_token(token)
+    now = now or timezone.now()
+    retention = timedelta(days=settings.TODO_CHANGES_RETENTION_DAYS)
+    if issued_at < now - retention:
+        raise ChangeTokenExpired()
+    limit = limit or settings.TODO_CHANGES_LIMIT
+    # 読み取りより前に取得し、horizon より前の変更は全て読み取りで参照できるようにする
+    horizon = changes_horizon()
+
+    reader = TaskReadSerializer()
+    tasks, tasks_key, tasks_more = _read_after(
+        reader.select(
+            Task.objects.annotate(**{CHANGE_XID: change_xid(Task)}),
+            required=[CHANGE_XID],
+        ),
+        tasks_key,
+        horizon,
+        limit,
+    )
+    deletions, deletions_key, deletions_more = _read_after(
+        TaskDeletion.objects.annotate(**{CHANGE_XID: change_xid(TaskDeletion)}).values(
+            "id", "task_id", "deleted_at", CHANGE_XID
+        ),
+        deletions_key,
+        horizon,
+        limit,
+    )
+    to_datetime = serializers.DateTimeField().to_representation
+    return {
+        "tasks": reader.to_representation(tasks),
+        "deleted": [
+            {"id": row["task_id"], "deleted_at": to_datetime(row["deleted_at"])}
+            for row in deletions
+        ],
+        "next": encode_token(tasks_key, deletions_key, now),
+        "has_more": tasks_more or deletions_more,
+    }
+
+
+def prune_deletions(before):
+    """
+    保持期間を過ぎた削除の記録を削除する
+
+    Args:
+        before (datetime): この日時より前の記録を削除する
+
+    Returns:
+        int: 削除した件数
+    """
+    deleted, _ = TaskDeletion.objects.filter(deleted_at__lt=before).delete()
+    return deleted
+
+
+@api_view(["GET"])
+def task_changes(request):
+    """
+    ?since= のトークン以降に登録・更新・削除されたタスクを取得するAPIビュー
+    ?since= を省略すると変更は返さず、現在の位置のトークンだけを返す
+    削除 (アーカイブへの移動を含む) はidと削除日時だけを返す
+    読み取りレプリカの遅延で確定済みの変更を飛ばさないよう、プライマリから読み取る
+    位置はコミット順に進むトランザクションIDで管理し、コミットの遅い変更も取りこぼさない
+    実行中のトランザクションがある間の変更は次回のレスポンスにも含まれる場合があるため、
+    クライアントはidで上書きする
+    has_more がTrueの場合は next のトークンですぐに続きを取得する
+
+    Returns:
+        Response: tasks / deleted / next / has_more
+    """
+    token = request.query_params.get("since")
+    if not token:
+        return Response(
+            {"tasks": [], "deleted": [], "next": current_token(), "has_more": False}
+        )
+    with pin_primary():
+        return Response(read_changes(token))
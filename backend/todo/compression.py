@@ -0,0 +1,324 @@
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# 圧縮するレスポンスの Content-Type (イベントストリームは逐次配信のため圧縮しない)
+# 管理画面・ブラウザブルAPIのHTMLは CSRF トークンを含み、圧縮後の長さから推測される (BREACH) ため、
+# APIのJSON/CSVだけを圧縮する
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+)
+
+
+def parse_accept_encoding(header):
+    """
+    Accept-Encoding ヘッダーを符号化方式ごとの q 値に変換
+
+    Args:
+        header (str): Accept-Encoding ヘッダーの値
+
+    Returns:
+        dict: 小文字の符号化方式をキー、q 値を値とする辞書
+    """
+    qualities = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate_encoding(header):
+    """
+    クライアントが受け入れる符号化方式から使用する方式を選択
+    q 値が同じ場合は圧縮率の高い br を優先する (brotli が導入されていない場合は gzip のみ)
+
+    Args:
+        header (str): Accept-Encoding ヘッダーの値
+
+    Returns:
+        str | None: "br" または "gzip"、どちらも受け入れない場合はNone
+    """
+    qualities = parse_accept_encoding(header)
+    wildcard = qualities.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class GzipCompressor:
+    """
+    gzip 形式で逐次圧縮する (zlib.compressobj の gzip ヘッダー付きモード)
+    """
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(
+            settings.TODO_COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    """
+    brotli 形式で逐次圧縮する
+    """
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=settings.TODO_COMPRESS_BROTLI_QUALITY
+        )
+
+    def process(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+COMPRESSORS = {
+    "gzip": GzipCompressor,
+    "br": BrotliCompressor,
+}
+
+
+# 圧縮したレスポンスのETagに付ける符号化方式の接尾辞 ("abc" → "abc-br")
+_ETAG_CODING_RE = re.compile(r'-(?:%s)"' % "|".join(COMPRESSORS))
+
+
+def etag_with_coding(etag, coding):
+    """
+    ETagに符号化方式の接尾辞を付ける
+    符号化の異なる表現は本文が異なるため、強いETagを共有しないようにする
+
+    Args:
+        etag (str): 元のETag (強い・弱いETag)
+        coding (str): "br" または "gzip"
+
+    Returns:
+        str: 接尾辞を付けたETag
+    """
+    return f'{etag[:-1]}-{coding}"'
+
+
+def strip_etag_codings(header):
+    """
+    If-Match / If-None-Match の値からETagの符号化方式の接尾辞を取り除く
+    ビューは元のETagと比較するため、どの符号化の表現で受け取ったETagも同じ状態として評価できる
+
+    Args:
+        header (str): If-Match / If-None-Match ヘッダーの値
+
+    Returns:
+        str: 接尾辞を取り除いた値
+    """
+    return _ETAG_CODING_RE.sub('"', header)
+
+
+def compress(coding, data):
+    """
+    バイト列を一括で圧縮
+
+    Args:
+        coding (str): "br" または "gzip"
+        data (bytes): 圧縮するデータ
+
+    Returns:
+        bytes: 圧縮したデータ
+    """
+    compressor = COMPRESSORS[coding]()
+    return compressor.process(data) + compressor.finish()
+
+
+def compress_stream(coding, chunks):
+    """
+    ストリーミングレスポンスのチャンクを順に圧縮
+    チャンクごとにフラッシュし、クライアントが受信したデータから順に展開できるようにする
+
+    Args:
+        coding (str): "br" または "gzip"
+        chunks (Iterable[bytes]): レスポンスのチャンク
+
+    Yields:
+        bytes: 圧縮したチャンク
+    """
+    compressor = COMPRESSORS[coding]()
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(coding, chunks):
+    """
+    compress_stream() の非同期イテレーター版
+
+    Args:
+        coding (str): "br" または "gzip"
+        chunks (AsyncIterable[bytes]): レスポンスのチャンク
+
+    Yields:
+        bytes: 圧縮したチャンク
+    """
+    compressor = COMPRESSORS[coding]()
+    async for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    CompressionMiddlewareクラス
+    Accept-Encoding に応じてレスポンスを brotli または gzip で圧縮する
+    TODO_COMPRESS_MIN_SIZE バイト未満のレスポンスは圧縮の効果より処理時間が大きいため圧縮しない
+    圧縮したレスポンスの ETag には符号化方式の接尾辞を付け、表現ごとに異なる ETag にする
+    条件付きリクエストの ETag は接尾辞を取り除いてからビューに渡す
+    (ビューは接尾辞のない ETag で If-Match / If-None-Match を評価する)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        return self.process_response(request, await self.get_response(request))
+
+    def process_request(self, request):
+        """
+        条件付きリクエストの ETag から符号化方式の接尾辞を取り除く
+
+        Args:
+            request (HttpRequest): リクエスト
+        """
+        # 304のレスポンスに接尾辞付きの ETag を返すため、元の If-None-Match を保持する
+        request.compression_if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+        for header in ("HTTP_IF_MATCH", "HTTP_IF_NONE_MATCH"):
+            if header in request.META:
+                request.META[header] = strip_etag_codings(request.META[header])
+
+    def process_response(self, request, response):
+        """
+        圧縮できるレスポンスを圧縮して返す
+
+        Args:
+            request (HttpRequest): リクエスト
+            response (HttpResponse): レスポンス
+
+        Returns:
+            HttpResponse: 圧縮したレスポンス、または元のレスポンス
+        """
+        if response.status_code == 304:
+            self.restore_etag(request, response)
+            return response
+        if not self.is_compressible(response):
+            return response
+        # 圧縮の有無がクライアントによって変わるため、圧縮しない場合も Vary を付ける
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(
+                    coding, response.streaming_content
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    coding, response.streaming_content
+                )
+            del response["Content-Length"]
+        else:
+            if len(response.content) < settings.TODO_COMPRESS_MIN_SIZE:
+                return response
+            compressed = compress(coding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = coding
+        if response.has_header("ETag"):
+            response["ETag"] = etag_with_coding(response["ETag"], coding)
+        return response
+
+    def restore_etag(self, request, response):
+        """
+        304のレスポンスの ETag を、クライアントが保持している表現の ETag (接尾辞付き) に戻す
+        304には本文がなく圧縮しないため、ビューが設定した接尾辞のない ETag のままになっている
+
+        Args:
+            request (HttpRequest): リクエスト
+            response (HttpResponse): 304のレスポンス
+        """
+        etag = response.get("ETag")
+        coding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+        if not etag or coding is None:
+            return
+        coded = etag_with_coding(etag, coding)
+        if coded in request.compression_if_none_match:
+            response["ETag"] = coded
+
+    def is_compressible(self, response):
+        """
+        レスポンスが圧縮の対象か判定
+
+        Args:
+            response (HttpResponse): レスポンス
+
+        Returns:
+            bool: 本文があり、未圧縮かつ圧縮の効果がある Content-Type の場合はTrue
+        """
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return False
+        if response.has_header("Content-Encoding"):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
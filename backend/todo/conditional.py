@@ -0,0 +1,164 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from todo.models import Task, TaskStatusCounter
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def get_data_state(queryset=None):
+    """
+    タスクデータ全体の状態を取得
+    件数はカウンター、最終更新日時は updated_at のインデックスから取得するため、
+    どちらもテーブルを走査せずに求められる
+    件数は削除、最終更新日時は登録・更新で必ず変化する
+
+    Args:
+        queryset (QuerySet): 最終更新日時を求めるタスクのクエリセット
+
+    Returns:
+        tuple: (件数, 最終更新日時)
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    total = sum(TaskStatusCounter.objects.totals().values())
+    last_modified = queryset.order_by().aggregate(last=Max("updated_at"))["last"]
+    return total, last_modified
+
+
+async def aget_data_state(queryset=None):
+    """
+    非同期ビューでタスクデータ全体の状態を取得 (get_data_state を参照)
+
+    Args:
+        queryset (QuerySet): 最終更新日時を求めるタスクのクエリセット
+
+    Returns:
+        tuple: (件数, 最終更新日時)
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    total = sum((await TaskStatusCounter.objects.atotals()).values())
+    row = await queryset.order_by().aaggregate(last=Max("updated_at"))
+    return total, row["last"]
+
+
+def collection_etag(request, state):
+    """
+    一覧・サマリーのETagを作成
+    データの状態に加えて、表現を変えるURL (クエリパラメータ) とAcceptヘッダーを含める
+
+    Args:
+        request (HttpRequest): リクエスト
+        state (tuple): get_data_state() で取得したデータの状態
+
+    Returns:
+        str: 弱いETag
+    """
+    total, last_modified = state
+    source = "|".join(
+        [
+            str(total),
+            last_modified.isoformat() if last_modified else "",
+            request.get_full_path(),
+            request.META.get("HTTP_ACCEPT", ""),
+        ]
+    )
+    return "W/" + quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+
+def summary_etag(request, summary):
+    """
+    サマリーのETagを作成
+    件数だけで決まるため、データの状態の代わりに件数から作成する
+
+    Args:
+        request (HttpRequest): リクエスト
+        summary (dict): 合計件数と完了件数 (summary.build_status_summary() の形式)
+
+    Returns:
+        str: 弱いETag
+    """
+    state = f"{summary['total_tasks']}/{summary['completed_tasks']}"
+    return collection_etag(request, (state, None))
+
+
+def task_etag(pk, updated_at):
+    """
+    タスク1件のETagを作成
+    If-Match で更新の競合を検出できるよう、タスクの更新日時から強いETagを作成する
+
+    Args:
+        pk (int): タスクのID
+        updated_at (datetime): タスクの更新日時
+
+    Returns:
+        str: 強いETag
+    """
+    # 浮動小数点の誤差で更新日時と1マイクロ秒ずれないよう、整数で計算する
+    return quote_etag(f"{pk}-{(updated_at - _EPOCH) // _MICROSECOND}")
+
+
+def parse_if_match(request, pk):
+    """
+    If-Match に指定されたタスクのETagから更新日時を取得
+    ETagは task_etag() の形式で、更新日時をマイクロ秒単位で含む
+
+    Args:
+        request (HttpRequest): リクエスト
+        pk (int): 更新するタスクのID
+
+    Returns:
+        datetime | None: ETagの更新日時
+            If-Match が1つのタスクのETagでない場合 (複数、"*"、弱いETag、別のタスク、範囲外の値) はNone
+    """
+    etags = parse_etags(request.META.get("HTTP_IF_MATCH", ""))
+    if len(etags) != 1 or not etags[0].startswith('"'):
+        return None
+    etag_pk, _, micro = etags[0].strip('"').partition("-")
+    try:
+        if int(etag_pk) != int(pk):
+            return None
+        return _EPOCH + int(micro) * _MICROSECOND
+    except (ValueError, OverflowError):
+        # 日時の範囲を超える値は、どのタスクのETagとも一致しないため通常の評価で412にする
+        return None
+
+
+def evaluate_preconditions(request, etag=None, last_modified=None):
+    """
+    条件付きリクエストのヘッダーを評価
+
+    Args:
+        request (HttpRequest): リクエスト
+        etag (str): 現在のETag
+        last_modified (datetime): 現在の最終更新日時
+
+    Returns:
+        HttpResponse: 304または412のレスポンス、条件を満たす場合はNone
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """
+    レスポンスにETagとLast-Modifiedを設定
+
+    Args:
+        response (HttpResponse): レスポンス
+        etag (str): ETag
+        last_modified (datetime): 最終更新日時
+    """
+    if etag and not response.has_header("ETag"):
+        response["ETag"] = etag
+    if last_modified and not response.has_header("Last-Modified"):
+        response["Last-Modified"] = http_date(last_modified.timestamp())
@@ -0,0 +1,144 @@
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from todo.cache import get_data_version
+
+
+class ExactCount:
+    """
+    SELECT COUNT(*) で正確な件数を取得する
+    """
+
+    def count(self, queryset):
+        """
+        クエリセットの件数を取得
+
+        Args:
+            queryset (QuerySet): 対象のクエリセット
+
+        Returns:
+            tuple: (件数, 正確な件数であればTrue)
+        """
+        return queryset.count(), True
+
+    async def acount(self, queryset):
+        """
+        非同期ビューでクエリセットの件数を取得
+
+        Args:
+            queryset (QuerySet): 対象のクエリセット
+
+        Returns:
+            tuple: (件数, 正確な件数であればTrue)
+        """
+        return await queryset.acount(), True
+
+
+class EstimatedCount(ExactCount):
+    """
+    テーブルの件数が閾値以上の場合にPostgreSQLの統計情報から推定件数を取得する
+    絞り込みのないクエリは pg_class.reltuples、絞り込みのあるクエリは実行計画の推定行数を使用する
+    """
+
+    def __init__(self, threshold=None):
+        if threshold is None:
+            threshold = settings.TODO_COUNT_ESTIMATE_THRESHOLD
+        self.threshold = threshold
+
+    def count(self, queryset):
+        connection = connections[queryset.db]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # ANALYZE前のテーブルは reltuples が -1 になる
+            if row is None or row[0] < 0 or row[0] < self.threshold:
+                return super().count(queryset)
+            if not queryset.query.where:
+                return int(row[0]), False
+
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), False
+
+    async def acount(self, queryset):
+        # 統計情報と実行計画はカーソルで直接取得するため、スレッドで実行する
+        return await sync_to_async(self.count)(queryset)
+
+
+class CachedCount(ExactCount):
+    """
+    正確な件数をキャッシュし、タスクの変更時にデータバージョンの更新で無効化する
+    レプリカで数えた件数は書き込みより古い場合があるため、プライマリで数えた件数だけを保存する
+    """
+
+    def __init__(self, timeout=None):
+        if timeout is None:
+            timeout = settings.TODO_COUNT_CACHE_TIMEOUT
+        self.timeout = timeout
+
+    @staticmethod
+    def get_cache_key(queryset, version):
+        """
+        クエリセットの件数のキャッシュキーを作成
+
+        Args:
+            queryset (QuerySet): 対象のクエリセット
+            version (int): データバージョン
+
+        Returns:
+            str: キャッシュキー
+        """
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(f"{sql}{params!r}".encode()).hexdigest()
+        return f"todo:count:{version}:{digest}"
+
+    def count(self, queryset):
+        key = self.get_cache_key(queryset, get_data_version())
+        count = cache.get(key)
+        if count is None:
+            count, _ = super().count(queryset)
+            if queryset.db == DEFAULT_DB_ALIAS:
+                cache.set(key, count, self.timeout)
+        return count, True
+
+    async def acount(self, queryset):
+        key = self.get_cache_key(queryset, await sync_to_async(get_data_version)())
+        count = await cache.aget(key)
+        if count is None:
+            count, _ = await super().acount(queryset)
+            # 振り分け先は、クエリを実行したスレッドの接続の状態で判定する
+            using = await sync_to_async(lambda: queryset.db)()
+            if using == DEFAULT_DB_ALIAS:
+                await cache.aset(key, count, self.timeout)
+        return count, True
+
+
+COUNT_STRATEGIES = {
+    "exact": ExactCount,
+    "estimate": EstimatedCount,
+    "cached": CachedCount,
+}
+
+
+def get_count_strategy(name=None):
+    """
+    設定に応じた件数取得方式を取得
+
+    Args:
+        name (str): 件数取得方式の名前、省略時は settings.TODO_COUNT_STRATEGY
+
+    Returns:
+        ExactCount: 件数取得方式のインスタンス
+    """
+    return COUNT_STRATEGIES[name or settings.TODO_COUNT_STRATEGY]()
@@ -0,0 +1,255 @@
+import asyncio
+import json
+
+import psycopg2
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from todo.renderers import dumps
+from todo.responses import error_response
+
+# タスクの変更を通知するチャンネル (マイグレーション 0008 のトリガーと同じ)
+TASK_CHANNEL = "todo_task_changes"
+# 通知を取りこぼした可能性がある場合のイベント (クライアントは一覧を取得し直す)
+RESYNC_EVENT = {"op": "resync", "ids": None}
+
+
+class PostgresNotifier:
+    """
+    PostgreSQL の LISTEN で受け取ったタスクの変更を callback に渡す
+    プロセスで1つの専用接続を使用し、イベントループの add_reader で受信を待つ
+    接続が切れた場合は TODO_EVENTS_RETRY_SECONDS 秒後に接続し直し、再同期のイベントを渡す
+    """
+
+    def __init__(self, callback, using=DEFAULT_DB_ALIAS):
+        self.callback = callback
+        self.using = using
+        self.listening = asyncio.Event()
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def connect(self, params):
+        """
+        LISTEN を実行した専用の接続を作成 (ブロックするためスレッドで実行する)
+
+        Args:
+            params (dict): psycopg2.connect() に渡す接続情報
+
+        Returns:
+            connection: 自動コミットの接続
+        """
+        conn = psycopg2.connect(**params)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {TASK_CHANNEL}")
+        return conn
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        params = connections[self.using].get_connection_params()
+        reconnecting = False
+        while True:
+            try:
+                conn = await loop.run_in_executor(None, self.connect, params)
+            except psycopg2.Error:
+                await asyncio.sleep(settings.TODO_EVENTS_RETRY_SECONDS)
+                continue
+            if reconnecting:
+                # 切断中の変更は通知されないため、購読者に再同期を求める
+                self.callback(RESYNC_EVENT)
+            closed = loop.create_future()
+            loop.add_reader(conn.fileno(), self.receive, conn, closed)
+            self.listening.set()
+            try:
+                await closed
+            except psycopg2.Error:
+                pass
+            finally:
+                self.listening.clear()
+                loop.remove_reader(conn.fileno())
+                conn.close()
+            reconnecting = True
+            await asyncio.sleep(settings.TODO_EVENTS_RETRY_SECONDS)
+
+    def receive(self, conn, closed):
+        """
+        接続から受信した通知を callback に渡す (イベントループから呼び出される)
+
+        Args:
+            conn (connection): LISTEN している接続
+            closed (Future): 接続が切れた場合に例外を設定する
+        """
+        try:
+            conn.poll()
+        except psycopg2.Error as exc:
+            if not closed.done():
+                closed.set_exception(exc)
+            return
+        while conn.notifies:
+            self.callback(json.loads(conn.notifies.pop(0).payload))
+
+
+class LocalNotifier:
+    """
+    データベースを使わずにプロセス内でタスクの変更を渡す通知 (テスト用の代替)
+    notify() に PostgreSQL の通知と同じ形式のペイロードを渡す
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.listening = asyncio.Event()
+
+    def start(self):
+        self.listening.set()
+
+    def stop(self):
+        self.listening.clear()
+
+    def notify(self, payload):
+        self.callback(json.loads(payload))
+
+
+EVENT_NOTIFIERS = {
+    "postgres": PostgresNotifier,
+    "local": LocalNotifier,
+}
+
+
+class TaskEventBroker:
+    """
+    タスクの変更イベントをプロセス内の購読者 (イベントストリーム) に配信する
+    最初の購読で通知の受信を開始し、購読者がいなくなると停止する
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.notifier = None
+
+    def subscribe(self):
+        """
+        購読を開始 (イベントループから呼び出す)
+
+        Returns:
+            asyncio.Queue: 変更イベントを受け取るキュー
+        """
+        queue = asyncio.Queue(maxsize=settings.TODO_EVENTS_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self.notifier is None:
+            notifier_class = EVENT_NOTIFIERS[settings.TODO_EVENTS_NOTIFIER]
+            self.notifier = notifier_class(self.publish)
+            self.notifier.start()
+        return queue
+
+    def unsubscribe(self, queue):
+        """
+        購読を終了
+
+        Args:
+            queue (asyncio.Queue): subscribe() で取得したキュー
+        """
+        self.subscribers.discard(queue)
+        if not self.subscribers and self.notifier is not None:
+            self.notifier.stop()
+            self.notifier = None
+
+    def publish(self, event):
+        """
+        全ての購読者にイベントを配信する
+        受信が追いつかずキューが一杯の購読者には、溜まったイベントの代わりに再同期を求める
+
+        Args:
+            event (dict): 変更イベント
+        """
+        for queue in self.subscribers:
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_EVENT)
+            else:
+                queue.put_nowait(event)
+
+
+broker = TaskEventBroker()
+
+
+def format_event(event):
+    """
+    変更イベントを Server-Sent Events の形式に変換
+
+    Args:
+        event (dict): 変更イベント
+
+    Returns:
+        str: event / data のフィールドと空行
+    """
+    return f"event: task\ndata: {dumps(event).decode()}\n\n"
+
+
+async def stream_events(broker):
+    """
+    購読したイベントを順に出力する
+    TODO_EVENTS_KEEPALIVE_SECONDS 秒イベントがない場合はコメント行を送り、接続を維持する
+
+    Args:
+        broker (TaskEventBroker): 購読するブローカー
+
+    Yields:
+        str: Server-Sent Events の1イベント分の文字列
+    """
+    queue = broker.subscribe()
+    try:
+        # 購読の開始後に最初の出力を返すため、クライアントは以降の変更を受け取れる
+        yield f"retry: {settings.TODO_EVENTS_RETRY_SECONDS * 1000}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.TODO_EVENTS_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(queue)
+
+
+class EventsUnavailable(APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "イベントの配信はASGIサーバーでのみ提供しています"
+    default_code = "events_unavailable"
+
+
+@require_safe
+async def task_events(request):
+    """
+    タスクの登録・更新・削除を Server-Sent Events (text/event-stream) で配信するビュー
+    イベントは {"op": "insert" | "update" | "delete" | "truncate" | "resync", "ids": [...]} で、
+    ids が null の場合 (多数の変更、再同期) は一覧を取得し直す
+    クライアントはイベントを受け取ったら /api/todo/changes/ で差分を取得する
+    購読者ごとにデータベースの接続は使用せず、プロセスで1つの LISTEN の接続を共有する
+
+    Returns:
+        StreamingHttpResponse: イベントストリーム
+    """
+    if not isinstance(request, ASGIRequest):
+        # WSGIではストリームがワーカーを占有し、イベントループも共有できない
+        return error_response(EventsUnavailable())
+    response = StreamingHttpResponse(
+        stream_events(broker), content_type="text/event-stream; charset=utf-8"
+    )
+    response["Cache-Control"] = "no-cache"
+    # リバースプロキシ (nginx) でバッファリングしない
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,161 @@
+import csv
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException, ValidationError
+
+from todo.filters import filter_tasks, parse_ordering, task_queryset
+from todo.renderers import dumps
+from todo.responses import error_response
+from todo.serializers import TaskReadSerializer, TaskSerializer
+
+
+class _Echo:
+    """csv.writer の書き込み先として、書き込んだ文字列をそのまま返すファイル風オブジェクト"""
+
+    def write(self, value):
+        return value
+
+
+class NdjsonEncoder:
+    """1行に1件のJSONを出力する (application/x-ndjson)"""
+
+    content_type = "application/x-ndjson; charset=utf-8"
+    extension = "ndjson"
+
+    def __init__(self, field_names):
+        self.field_names = field_names
+
+    def header(self):
+        return ""
+
+    def encode(self, rows):
+        return "".join(dumps(row).decode() + "\n" for row in rows)
+
+
+class CsvEncoder:
+    """1行目を項目名とするCSVを出力する (値がNoneの項目は空欄)"""
+
+    content_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self, field_names):
+        self.field_names = field_names
+        self.writer = csv.writer(_Echo())
+
+    def header(self):
+        return self.writer.writerow(self.field_names)
+
+    def encode(self, rows):
+        writerow = self.writer.writerow
+        return "".join(
+            writerow([row[name] for name in self.field_names]) for row in rows
+        )
+
+
+EXPORT_FORMATS = {
+    "ndjson": NdjsonEncoder,
+    "csv": CsvEncoder,
+}
+
+
+class TaskExporter:
+    """
+    TaskExporterクラス
+    タスクをサーバーサイドカーソルで chunk_size 件ずつ取得し、件数によらず一定のメモリで出力する
+    """
+
+    def __init__(self, queryset, encoder_class, chunk_size=None):
+        """
+        Args:
+            queryset (QuerySet): 出力するタスクのクエリセット
+            encoder_class (type): 出力形式 (EXPORT_FORMATS の値)
+            chunk_size (int): 1回に取得する件数、省略時は settings.TODO_EXPORT_CHUNK_SIZE
+        """
+        self.chunk_size = chunk_size or settings.TODO_EXPORT_CHUNK_SIZE
+        if TaskReadSerializer.is_supported():
+            self.reader = TaskReadSerializer()
+            self.queryset = self.reader.select(queryset)
+        else:
+            self.reader = None
+            self.queryset = queryset
+        field_names, _ = TaskReadSerializer.get_field_names()
+        self.encoder = encoder_class(field_names)
+
+    def encode_chunk(self, chunk):
+        """
+        取得したタスクをシリアライズして出力形式に変換
+
+        Args:
+            chunk (list): values() の辞書、またはタスクのリスト
+
+        Returns:
+            str: 出力する文字列
+        """
+        if self.reader is not None:
+            rows = self.reader.to_representation(chunk)
+        else:
+            rows = TaskSerializer(chunk, many=True).data
+        return self.encoder.encode(rows)
+
+    def __iter__(self):
+        yield self.encoder.header()
+        chunk = []
+        for row in self.queryset.iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield self.encode_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield self.encode_chunk(chunk)
+
+    async def __aiter__(self):
+        yield self.encoder.header()
+        chunk = []
+        async for row in self.queryset.aiterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield self.encode_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield self.encode_chunk(chunk)
+
+
+@require_safe
+def task_export(request):
+    """
+    全タスクを ?format=ndjson|csv の形式でストリーミング出力するビュー
+    一覧と同じ絞り込み・並び替え・?include_archived= のクエリパラメータに対応する
+    ?format= は DRF の形式指定と衝突するため、DRF を経由しないDjangoのビューとしている
+
+    Returns:
+        StreamingHttpResponse: タスクを順に出力するレスポンス
+    """
+    export_format = request.GET.get("format", "ndjson")
+    try:
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"format": [f"対応していない形式です: {export_format}"]}
+            )
+        queryset = filter_tasks(task_queryset(request.GET), request.GET)
+        ordering = parse_ordering(request.GET)
+        if ordering is not None:
+            queryset = queryset.order_by(*ordering)
+    except APIException as exc:
+        return error_response(exc)
+
+    exporter = TaskExporter(queryset, EXPORT_FORMATS[export_format])
+    # ASGIでは同期イテレーターが全件読み込まれてしまうため、非同期イテレーターで出力する
+    if isinstance(request, ASGIRequest):
+        content = exporter.__aiter__()
+    else:
+        content = iter(exporter)
+    response = StreamingHttpResponse(
+        content, content_type=exporter.encoder.content_type
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="tasks.{exporter.encoder.extension}"'
+    )
+    return response
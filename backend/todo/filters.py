@@ -0,0 +1,286 @@
+import re
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from todo.models import Task, TaskWithArchived
+from todo.summary import COMPLETED_STATUS
+
+# 並び替えに使用できる項目 (いずれも先頭列とするインデックスがある)
+ORDERING_FIELDS = ("due_date", "priority", "status", "updated_at", "id")
+# 現在時刻によって結果が変わる絞り込み条件
+TIME_DEPENDENT_PARAMS = ("overdue",)
+
+_TRUE_VALUES = ("true", "1")
+_FALSE_VALUES = ("false", "0")
+
+
+def _parse_choices(param, value, choices):
+    """
+    カンマ区切りの選択肢を解析
+
+    Args:
+        param (str): クエリパラメータ名
+        value (str): クエリパラメータの値
+        choices (list): モデルの選択肢
+
+    Returns:
+        list: 選択された値
+
+    Raises:
+        ValidationError: 選択肢にない値が指定された場合
+    """
+    allowed = {str(choice) for choice, _ in choices}
+    values = [item.strip() for item in value.split(",") if item.strip()]
+    invalid = [item for item in values if item not in allowed]
+    if invalid or not values:
+        raise ValidationError({param: [f"不正な値です: {value}"]})
+    return [int(item) for item in values]
+
+
+def _parse_boolean(param, value):
+    """
+    真偽値を解析
+
+    Args:
+        param (str): クエリパラメータ名
+        value (str): クエリパラメータの値
+
+    Returns:
+        bool: 解析した値
+
+    Raises:
+        ValidationError: 真偽値として解釈できない場合
+    """
+    if value.lower() in _TRUE_VALUES:
+        return True
+    if value.lower() in _FALSE_VALUES:
+        return False
+    raise ValidationError({param: [f"true または false を指定してください: {value}"]})
+
+
+def _parse_due(param, value):
+    """
+    期限の範囲指定を解析
+    日付のみの場合は現在のタイムゾーンでその日の0時とする
+
+    Args:
+        param (str): クエリパラメータ名
+        value (str): クエリパラメータの値 (ISO 8601形式の日時または日付)
+
+    Returns:
+        datetime: 解析した日時
+
+    Raises:
+        ValidationError: 日時として解釈できない場合
+    """
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            if date is not None:
+                parsed = datetime.combine(date, time.min)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({param: [f"日時の形式が不正です: {value}"]})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def search_query(value):
+    """
+    検索語から部分一致検索の条件を作成
+    空白で区切った語をすべて含む (タスク名・詳細のどちらかに含む) タスクを大文字・小文字を区別せずに検索する
+    日本語は語の区切りがないため、全文検索の語ではなく文字列の部分一致で検索する
+    pg_trgm のGINインデックスで絞り込むため、3文字以上の語で効果がある
+
+    Args:
+        value (str): 検索語
+
+    Returns:
+        Q: 検索条件、検索語がない場合はNone
+    """
+    terms = [term for term in re.split(r"\s+", value) if term]
+    if not terms:
+        return None
+    query = Q()
+    for term in terms:
+        query &= Q(title__icontains=term) | Q(description__icontains=term)
+    return query
+
+
+def includes_archived(params):
+    """
+    ?include_archived=true でアーカイブ済みのタスクを含めるか判定
+
+    Args:
+        params (QueryDict): クエリパラメータ
+
+    Returns:
+        bool: アーカイブ済みのタスクを含める場合はTrue
+
+    Raises:
+        ValidationError: 真偽値として解釈できない場合
+    """
+    value = params.get("include_archived")
+    return bool(value) and _parse_boolean("include_archived", value)
+
+
+def task_queryset(params):
+    """
+    一覧の絞り込み前のクエリセットを取得
+    通常はタスクテーブルだけを参照し、?include_archived=true の場合はアーカイブを含むビューを参照する
+
+    Args:
+        params (QueryDict): クエリパラメータ
+
+    Returns:
+        QuerySet: 期限順・id順に並べたクエリセット
+    """
+    model = TaskWithArchived if includes_archived(params) else Task
+    return model.objects.order_by("due_date", "id")
+
+
+def filter_tasks(queryset, params, now=None):
+    """
+    クエリパラメータでタスクを絞り込む
+
+    ?status=0,1 / ?priority=2 : 状況・優先度 (カンマ区切りで複数指定)
+    ?due_after= / ?due_before= : 期限の範囲 (due_after以上、due_before未満)
+    ?has_due=true : 期限の有無
+    ?overdue=true : 未完了で期限切れ (falseの場合は期限切れ以外)
+    ?search= : タスク名・詳細の部分一致検索
+
+    Args:
+        queryset (QuerySet): 対象のクエリセット
+        params (QueryDict): クエリパラメータ
+        now (datetime): 期限切れの判定に使用する現在時刻、省略時は現在時刻
+
+    Returns:
+        QuerySet: 絞り込んだクエリセット
+
+    Raises:
+        ValidationError: パラメータの値が不正な場合
+    """
+    if params.get("status"):
+        statuses = _parse_choices("status", params["status"], Task.STATUS_CHOICES)
+        queryset = queryset.filter(status__in=statuses)
+    if params.get("priority"):
+        priorities = _parse_choices(
+            "priority", params["priority"], Task.PRIORITY_CHOICES
+        )
+        queryset = queryset.filter(priority__in=priorities)
+    if params.get("due_after"):
+        queryset = queryset.filter(
+            due_date__gte=_parse_due("due_after", params["due_after"])
+        )
+    if params.get("due_before"):
+        queryset = queryset.filter(
+            due_date__lt=_parse_due("due_before", params["due_before"])
+        )
+    if params.get("has_due"):
+        has_due = _parse_boolean("has_due", params["has_due"])
+        queryset = queryset.filter(due_date__isnull=not has_due)
+    if params.get("overdue"):
+        overdue = Q(due_date__lt=now or timezone.now()) & ~Q(status=COMPLETED_STATUS)
+        if _parse_boolean("overdue", params["overdue"]):
+            queryset = queryset.filter(overdue)
+        else:
+            queryset = queryset.exclude(overdue)
+    if params.get("search"):
+        query = search_query(params["search"])
+        if query is not None:
+            queryset = queryset.filter(query)
+    return queryset
+
+
+def is_time_dependent(params):
+    """
+    絞り込み結果が現在時刻によって変わるか判定
+    該当する場合はデータが変わらなくても結果が変わるため、ETagやキャッシュを使用できない
+
+    Args:
+        params (QueryDict): クエリパラメータ
+
+    Returns:
+        bool: 現在時刻によって結果が変わる場合はTrue
+    """
+    return any(params.get(param) for param in TIME_DEPENDENT_PARAMS)
+
+
+def parse_ordering(params, param="ordering"):
+    """
+    クエリパラメータから並び順を取得
+    ?ordering=-priority,due_date のようにインデックスのある項目を指定する
+    同順のタスクの順序が一定になるよう、最後にidで並べる
+
+    Args:
+        params (QueryDict): クエリパラメータ
+        param (str): 並び順のクエリパラメータ名
+
+    Returns:
+        list: order_by() に渡す並び順、指定がない場合はNone
+
+    Raises:
+        ValidationError: 並び替えできない項目が指定された場合
+    """
+    value = params.get(param)
+    if not value:
+        return None
+    ordering = [item.strip() for item in value.split(",") if item.strip()]
+    invalid = [item for item in ordering if item.lstrip("-") not in ORDERING_FIELDS]
+    if invalid or not ordering:
+        raise ValidationError(
+            {param: [f"並び替えできない項目です: {', '.join(invalid) or value}"]}
+        )
+    if not any(item.lstrip("-") == "id" for item in ordering):
+        ordering.append("id")
+    return ordering
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    TaskFilterBackendクラス
+    クエリパラメータでタスクを絞り込むフィルター (条件は filter_tasks を参照)
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_tasks(queryset, request.query_params)
+
+
+class TaskOrderingFilter(BaseFilterBackend):
+    """
+    TaskOrderingFilterクラス
+    ?ordering=-priority,due_date のようにインデックスのある項目で並び替えるフィルター
+    """
+
+    ordering_param = "ordering"
+
+    def get_ordering(self, request):
+        """
+        リクエストから並び順を取得 (parse_ordering を参照)
+
+        Args:
+            request (Request): リクエスト
+
+        Returns:
+            list: order_by() に渡す並び順、指定がない場合はNone
+        """
+        return parse_ordering(request.query_params, self.ordering_param)
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request)
+        if ordering is None:
+            return queryset
+        # キーセット方式のページングはキーの順序で並べる必要がある
+        if getattr(getattr(view, "paginator", None), "key_fields", None):
+            raise ValidationError(
+                {self.ordering_param: ["キーセット方式のページングでは指定できません"]}
+            )
+        return queryset.order_by(*ordering)
@@ -0,0 +1,325 @@
+import csv
+import io
+import json
+from functools import lru_cache
+from itertools import chain, islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from todo.cache import invalidate_task_data
+from todo.models import Task
+
+# COPY で書き込む列 (登録日・更新日は取り込み時刻とする)
+COPY_COLUMNS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "created_at",
+    "updated_at",
+)
+
+_TITLE_MAX_LENGTH = Task._meta.get_field("title").max_length
+_STATUS_VALUES = {value for value, _ in Task.STATUS_CHOICES}
+_PRIORITY_VALUES = {value for value, _ in Task.PRIORITY_CHOICES}
+# COPY のテキスト形式でエスケープが必要な文字
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+class _BinaryReader(io.RawIOBase):
+    """read() だけを持つストリームを io.BufferedReader で読めるようにするアダプター"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def open_text(stream):
+    """
+    アップロードファイルやリクエスト本文のバイナリストリームをUTF-8のテキストとして開く
+    全体を読み込まず、読み進めた分だけデコードする
+
+    Args:
+        stream: read() を持つバイナリストリーム
+
+    Returns:
+        TextIOWrapper: テキストストリーム (BOM付きのUTF-8にも対応)
+    """
+    return io.TextIOWrapper(
+        io.BufferedReader(_BinaryReader(stream)), encoding="utf-8-sig", newline=""
+    )
+
+
+def read_csv(stream):
+    """
+    1行目を項目名とするCSVを1行ずつ読み込む
+    空欄は未指定 (None) として扱う
+
+    Args:
+        stream (TextIO): CSVのテキストストリーム
+
+    Yields:
+        tuple: (行番号, 項目名をキーとする辞書)
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {
+            key: (value if value != "" else None) for key, value in row.items()
+        }
+
+
+def read_ndjson(stream):
+    """
+    1行に1件のJSONオブジェクトを1行ずつ読み込む
+    JSONとして解釈できない行は辞書の代わりに例外を返す
+
+    Args:
+        stream (TextIO): NDJSONのテキストストリーム
+
+    Yields:
+        tuple: (行番号, 辞書またはValueError)
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+            continue
+        if not isinstance(row, dict):
+            row = ValueError("JSONオブジェクトではありません")
+        yield line_number, row
+
+
+IMPORT_FORMATS = {
+    "csv": read_csv,
+    "ndjson": read_ndjson,
+}
+
+
+def _parse_choice(value, choices):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = int(value)
+    elif not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(value)
+    if value not in choices:
+        raise ValueError
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _parse_due_date(value):
+    """
+    期限をISO 8601形式の文字列に正規化
+    同じ期限が繰り返し現れることが多いため、解析結果をキャッシュする
+
+    Args:
+        value (str): 期限の文字列
+
+    Returns:
+        str: タイムゾーン付きのISO 8601形式の文字列、解釈できない場合はNone
+    """
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed.isoformat()
+
+
+def validate_row(row):
+    """
+    取り込むタスク1件を Task の制約に従って検証
+    TaskSerializer と同じく、タスク名は前後の空白を除いて必須、255文字以内とする
+    id・登録日・更新日などの書き込みに使用しない項目は無視する
+
+    Args:
+        row (dict): 項目名をキーとする辞書
+
+    Returns:
+        tuple: (書き込む値のタプル、エラーがある場合はNone, 項目ごとのエラー)
+            期限はISO 8601形式の文字列に変換する
+    """
+    errors = {}
+
+    title = row.get("title")
+    if not isinstance(title, str) or not title.strip():
+        errors["title"] = ["この項目は必須です"]
+    else:
+        title = title.strip()
+        if len(title) > _TITLE_MAX_LENGTH:
+            errors["title"] = [f"{_TITLE_MAX_LENGTH}文字以下で指定してください"]
+
+    description = row.get("description")
+    if description is not None and not isinstance(description, str):
+        errors["description"] = ["文字列を指定してください"]
+
+    # PostgreSQLのテキストはNUL文字を格納できず、COPY全体が失敗する
+    for name, value in (("title", title), ("description", description)):
+        if name not in errors and isinstance(value, str) and "\x00" in value:
+            errors[name] = ["NUL文字は使用できません"]
+
+    values = {}
+    for name, choices in (("status", _STATUS_VALUES), ("priority", _PRIORITY_VALUES)):
+        try:
+            values[name] = _parse_choice(row.get(name), choices)
+        except (TypeError, ValueError):
+            errors[name] = [f"{sorted(choices)} のいずれかを指定してください"]
+
+    due_date = row.get("due_date")
+    if due_date is not None:
+        due_date = _parse_due_date(due_date) if isinstance(due_date, str) else None
+        if due_date is None:
+            errors["due_date"] = ["日時の形式が不正です"]
+
+    if errors:
+        return None, errors
+    return (title, description, values["status"], values["priority"], due_date), {}
+
+
+class _CopySource:
+    """
+    COPY FROM STDIN の読み込み元
+    読み込まれるたびに必要な分の行だけを変換するため、変換とデータベースでの書き込みが並行して進む
+    """
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def read(self, size=8192):
+        parts = []
+        length = 0
+        for line in self.lines:
+            parts.append(line)
+            length += len(line)
+            if length >= size:
+                break
+        return "".join(parts)
+
+
+class TaskImporter:
+    """
+    TaskImporterクラス
+    CSV/NDJSONのタスクを検証し、COPY FROM STDIN で batch_size 件ずつ書き込む
+    行は COPY が読み込む分だけ検証・変換するため、メモリに保持するのは読み込み中の数KBと
+    max_errors 件までのエラーだけとなる
+    取り込みは1トランザクションで行い、不正な行は取り込まずに行番号とエラーを報告する
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=None, max_errors=None):
+        """
+        Args:
+            using (str): データベースのエイリアス
+            batch_size (int): 1回の COPY で書き込む件数、省略時は settings.TODO_IMPORT_BATCH_SIZE
+            max_errors (int): 報告するエラーの最大件数、省略時は settings.TODO_IMPORT_MAX_ERRORS
+        """
+        self.using = using
+        self.batch_size = batch_size or settings.TODO_IMPORT_BATCH_SIZE
+        if max_errors is None:
+            max_errors = settings.TODO_IMPORT_MAX_ERRORS
+        self.max_errors = max_errors
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, line, errors):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": errors})
+
+    def encode_rows(self, rows, now):
+        """
+        行を検証し、正しい行を COPY のテキスト形式に変換する
+        不正な行は reject() で記録する
+
+        Args:
+            rows (iterable): read_csv() / read_ndjson() の (行番号, 辞書) の組
+            now (str): 登録日・更新日とする時刻
+
+        Yields:
+            str: COPY のテキスト形式の1行
+        """
+        for line, row in rows:
+            if isinstance(row, Exception):
+                self.reject(line, {"non_field_errors": [str(row)]})
+                continue
+            values, errors = validate_row(row)
+            if errors:
+                self.reject(line, errors)
+                continue
+            yield self.encode(values, now)
+
+    def run(self, rows):
+        """
+        タスクを取り込む
+
+        Args:
+            rows (iterable): read_csv() / read_ndjson() の (行番号, 辞書) の組
+
+        Returns:
+            dict: 取り込んだ件数、不正な行の件数と max_errors 件までのエラー
+        """
+        lines = self.encode_rows(rows, timezone.now().isoformat())
+        sql = f"COPY {Task._meta.db_table} ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+        with transaction.atomic(using=self.using):
+            with connections[self.using].cursor() as cursor:
+                for first in lines:
+                    batch = chain([first], islice(lines, self.batch_size - 1))
+                    cursor.cursor.copy_expert(sql, _CopySource(batch))
+                    self.imported += cursor.cursor.rowcount
+            if self.imported:
+                invalidate_task_data(self.using)
+        return {
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+    @staticmethod
+    def encode(values, now):
+        """
+        タスク1件を COPY のテキスト形式の1行に変換
+
+        Args:
+            values (tuple): validate_row() で検証した値
+            now (str): 登録日・更新日とする時刻
+
+        Returns:
+            str: タブ区切りの1行
+        """
+        title, description, status, priority, due_date = values
+        return (
+            "\t".join(
+                [
+                    title.translate(_COPY_ESCAPES),
+                    (
+                        "\\N"
+                        if description is None
+                        else description.translate(_COPY_ESCAPES)
+                    ),
+                    str(status),
+                    str(priority),
+                    "\\N" if due_date is None else due_date,
+                    now,
+                    now,
+                ]
+            )
+            + "\n"
+        )
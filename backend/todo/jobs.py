@@ -0,0 +1,483 @@
+import inspect
+import logging
+import os
+import select
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import psycopg2
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import generics, serializers, status
+from rest_framework.exceptions import APIException
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from todo.archive import archive_cutoff, archive_tasks
+from todo.changes import prune_deletions
+from todo.models import Job, TaskStatusCounter
+from todo.pagination import PAGE_SIZE_QUERY_PARAM, get_page_size, paginated_response
+from todo.routers import pin_primary
+
+logger = logging.getLogger(__name__)
+
+# ジョブの登録を通知するチャンネル (マイグレーション 0009 のトリガーと同じ)
+JOB_CHANNEL = "todo_jobs"
+
+# ジョブの種類ごとの処理 (ジョブの params をキーワード引数として呼び出し、戻り値を result に保存する)
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    """
+    ジョブの処理を登録するデコレーター
+
+    Args:
+        kind (str): ジョブの種類
+
+    Returns:
+        callable: 処理をそのまま返すデコレーター
+    """
+
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+
+    return register
+
+
+@job_handler("archive_tasks")
+def run_archive_tasks(days=None, batch_size=None):
+    """archive_tasks コマンドと同じく、完了から一定期間が経過したタスクをアーカイブする"""
+    return {"archived": archive_tasks(archive_cutoff(days), batch_size=batch_size)}
+
+
+@job_handler("rebuild_task_counters")
+def run_rebuild_task_counters():
+    """rebuild_task_counters コマンドと同じく、状況ごとの件数のカウンターを作り直す"""
+    totals = TaskStatusCounter.objects.rebuild()
+    return {"totals": {str(key): count for key, count in totals.items()}}
+
+
+@job_handler("prune_task_deletions")
+def run_prune_task_deletions(days=None):
+    """prune_task_deletions コマンドと同じく、保持期間を過ぎた削除の記録を削除する"""
+    if days is None:
+        days = settings.TODO_CHANGES_RETENTION_DAYS
+    return {"deleted": prune_deletions(timezone.now() - timedelta(days=days))}
+
+
+def enqueue(kind, params=None, run_at=None):
+    """
+    ジョブを登録
+    コミット時にトリガーが通知し、待機中のワーカーが取得する
+
+    Args:
+        kind (str): ジョブの種類 (JOB_HANDLERS のキー)
+        params (dict): 処理に渡すキーワード引数
+        run_at (datetime): 実行予定日時、省略時はすぐに実行する
+
+    Returns:
+        Job: 登録したジョブ
+    """
+    return Job.objects.create(
+        kind=kind,
+        params=params or {},
+        run_at=run_at or timezone.now(),
+        max_attempts=settings.TODO_JOBS_MAX_ATTEMPTS,
+    )
+
+
+def claim_jobs(worker, limit, now=None):
+    """
+    実行予定日時を過ぎた待機中のジョブを取得し、実行中にする
+    SKIP LOCKED で他のワーカーが取得中の行を飛ばすため、複数のワーカーが同じジョブを実行しない
+    取得のたびに増える実行回数 (attempts) を、その取得を識別する値として使用する
+
+    Args:
+        worker (str): ワーカーの名前
+        limit (int): 取得する最大件数
+        now (datetime): 現在時刻、省略時は timezone.now()
+
+    Returns:
+        list: 実行中にしたジョブ
+    """
+    now = now or timezone.now()
+    using = router.db_for_write(Job)
+    with transaction.atomic(using=using):
+        jobs = list(
+            Job.objects.using(using)
+            .select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by("run_at", "id")[:limit]
+        )
+        if not jobs:
+            return []
+        Job.objects.using(using).filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+    for job in jobs:
+        job.status = Job.RUNNING
+        job.locked_by = worker
+        job.started_at = now
+        job.heartbeat_at = now
+        job.attempts += 1
+    return jobs
+
+
+def claimed(job):
+    """
+    ジョブを取得した時点の状態のままであれば選択するクエリセットを作成
+    応答が途絶えて待機中に戻された後に取得し直された場合は実行回数が変わるため、
+    元の取得による更新は反映されない
+
+    Args:
+        job (Job): claim_jobs() で取得したジョブ
+
+    Returns:
+        QuerySet: 実行中かつ実行回数が同じ場合だけジョブを選択するクエリセット
+    """
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, attempts=job.attempts)
+
+
+def heartbeat(jobs, now=None):
+    """
+    実行中のジョブの最終応答日時を更新する
+
+    Args:
+        jobs (Iterable[Job]): claim_jobs() で取得し、実行中のジョブ
+        now (datetime): 現在時刻、省略時は timezone.now()
+
+    Returns:
+        int: 更新した件数
+    """
+    now = now or timezone.now()
+    updated = 0
+    for job in jobs:
+        updated += claimed(job).update(heartbeat_at=now)
+    return updated
+
+
+def run_job(job):
+    """
+    ジョブを実行し、結果を保存する
+    失敗した場合は最大実行回数まで TODO_JOBS_RETRY_SECONDS 秒 (2回目以降は倍) 後に再実行する
+
+    Args:
+        job (Job): claim_jobs() で取得したジョブ
+
+    Returns:
+        str: 実行後のジョブの状況
+    """
+    # 応答が途絶えたとみなされ、他のワーカーが取得し直した場合は、結果を上書きしない
+    running = claimed(job)
+    try:
+        handler = JOB_HANDLERS[job.kind]
+        result = handler(**job.params)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("ジョブ %s (%s) が失敗しました", job.pk, job.kind)
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = settings.TODO_JOBS_RETRY_SECONDS * 2 ** (job.attempts - 1)
+            running.update(
+                status=Job.QUEUED,
+                locked_by="",
+                error=error,
+                run_at=now + timedelta(seconds=delay),
+            )
+            return Job.QUEUED
+        running.update(status=Job.FAILED, error=error, finished_at=now)
+        return Job.FAILED
+    running.update(status=Job.SUCCEEDED, result=result, finished_at=timezone.now())
+    return Job.SUCCEEDED
+
+
+def requeue_stale_jobs(now=None):
+    """
+    TODO_JOBS_TIMEOUT_SECONDS 秒を超えて最終応答日時が更新されていない実行中のジョブ
+    (停止したワーカーのジョブ) を待機中に戻す
+    実行時間の長いジョブも、ワーカーが応答を更新している間は戻さない
+    最大実行回数に達したジョブは失敗にする
+
+    Args:
+        now (datetime): 現在時刻、省略時は timezone.now()
+
+    Returns:
+        int: 待機中に戻した件数
+    """
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.TODO_JOBS_TIMEOUT_SECONDS),
+    )
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, error="タイムアウトしました", finished_at=now
+    )
+    return stale.update(status=Job.QUEUED, locked_by="", run_at=now)
+
+
+class Worker:
+    """
+    ジョブを取得してスレッドプールで実行するワーカー (run_todo_worker コマンド)
+    待機中は LISTEN した接続でジョブの登録の通知を待ち、通知がなくても TODO_JOBS_POLL_SECONDS 秒ごとに確認する
+    確認のたびに実行中のジョブの最終応答日時を更新する
+    外部のメッセージブローカーは使用せず、ジョブの受け渡しは全て PostgreSQL で行う
+    """
+
+    def __init__(self, concurrency=None, poll_seconds=None, name=None):
+        """
+        Args:
+            concurrency (int): 同時に実行するジョブの数、省略時は settings.TODO_JOBS_CONCURRENCY
+            poll_seconds (float): 通知がない場合に確認する間隔、省略時は settings.TODO_JOBS_POLL_SECONDS
+            name (str): ワーカーの名前、省略時は ホスト名:プロセスID
+        """
+        self.concurrency = concurrency or settings.TODO_JOBS_CONCURRENCY
+        self.poll_seconds = poll_seconds or settings.TODO_JOBS_POLL_SECONDS
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self.listener = None
+
+    def stop(self):
+        """実行中のジョブの終了後にワーカーを停止する (シグナルハンドラーから呼び出せる)"""
+        self.stopping.set()
+
+    def listen(self):
+        """
+        ジョブの登録の通知を受け取る専用の接続を作成
+        接続できない場合は通知を使わず、一定間隔の確認だけで動作する
+        """
+        try:
+            params = connections[DEFAULT_DB_ALIAS].get_connection_params()
+            self.listener = psycopg2.connect(**params)
+            self.listener.autocommit = True
+            with self.listener.cursor() as cursor:
+                cursor.execute(f"LISTEN {JOB_CHANNEL}")
+        except psycopg2.Error:
+            logger.warning("ジョブの通知を受信できないため、一定間隔で確認します")
+            self.listener = None
+
+    def wait_for_notify(self):
+        """ジョブの登録の通知、または poll_seconds 秒の経過まで待機する (停止は待機後に反映される)"""
+        if self.listener is None:
+            self.stopping.wait(self.poll_seconds)
+            return
+        try:
+            readable, _, _ = select.select([self.listener], [], [], self.poll_seconds)
+            if readable:
+                self.listener.poll()
+                self.listener.notifies.clear()
+        except (OSError, psycopg2.Error):
+            # 接続が切れた場合は次の待機で接続し直す
+            self.listener.close()
+            self.listen()
+
+    def execute(self, job):
+        """スレッドプールでジョブを実行し、スレッドのデータベース接続を閉じる"""
+        try:
+            return run_job(job)
+        finally:
+            connections.close_all()
+
+    def run(self, once=False):
+        """
+        停止するまでジョブを取得して実行する
+
+        Args:
+            once (bool): Trueの場合は実行できるジョブがなくなった時点で終了する
+
+        Returns:
+            int: 実行したジョブの件数
+        """
+        self.listen()
+        executed = 0
+        # 実行中の Future と実行しているジョブ
+        running = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                while not self.stopping.is_set():
+                    running = {
+                        future: job
+                        for future, job in running.items()
+                        if not future.done()
+                    }
+                    heartbeat(running.values())
+                    requeue_stale_jobs()
+                    free = self.concurrency - len(running)
+                    jobs = claim_jobs(self.name, free) if free else []
+                    for job in jobs:
+                        running[executor.submit(self.execute, job)] = job
+                    executed += len(jobs)
+                    if jobs and len(running) < self.concurrency:
+                        continue
+                    if running and (once or len(running) >= self.concurrency):
+                        # 空きができるまで待つ (終了した Future は次の確認で除く)
+                        wait(
+                            running,
+                            timeout=self.poll_seconds,
+                            return_when=FIRST_COMPLETED,
+                        )
+                    elif once:
+                        break
+                    else:
+                        self.wait_for_notify()
+        finally:
+            if self.listener is not None:
+                self.listener.close()
+            connections.close_all()
+        return executed
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    ジョブのシリアライザ
+    登録時は種類 (kind) と引数 (params) だけを指定する
+    """
+
+    class Meta:
+        model = Job
+        fields = "__all__"
+        read_only_fields = [
+            "status",
+            "result",
+            "error",
+            "attempts",
+            "max_attempts",
+            "run_at",
+            "locked_by",
+            "created_at",
+            "started_at",
+            "heartbeat_at",
+            "finished_at",
+        ]
+
+    def validate_kind(self, value):
+        if value not in JOB_HANDLERS:
+            raise serializers.ValidationError(f"対応していないジョブです: {value}")
+        return value
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("オブジェクトを指定してください")
+        return value
+
+    def validate(self, attrs):
+        # 処理の引数と一致しない params は実行前に拒否する
+        handler = JOB_HANDLERS[attrs["kind"]]
+        try:
+            inspect.signature(handler).bind(**attrs.get("params", {}))
+        except TypeError as exc:
+            raise serializers.ValidationError({"params": [str(exc)]})
+        return attrs
+
+    def create(self, validated_data):
+        return enqueue(validated_data["kind"], validated_data.get("params"))
+
+
+class JobNotCancelable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "待機中のジョブだけを取り消せます"
+    default_code = "not_cancelable"
+
+
+class JobPagination(PageNumberPagination):
+    """
+    JobPaginationクラス
+    ジョブの一覧のページネーション
+    タスクの件数取得方式 (TODO_COUNT_STRATEGY) はタスクのデータバージョンでキャッシュするため使用せず、
+    登録・実行で変わるジョブの件数は毎回 COUNT で取得する
+    """
+
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+
+    def get_page_size(self, request):
+        return get_page_size(request.query_params)
+
+    def get_paginated_response(self, data):
+        """
+        タスクの一覧と同じ形式のレスポンスを作成
+
+        Args:
+            data (list): シリアライズされたジョブデータのリスト
+
+        Returns:
+            Response: ページネーションされたレスポンスデータ
+        """
+        links = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        return paginated_response(
+            {
+                "links": links,
+                "count": self.page.paginator.count,
+                "page_size": self.page.paginator.per_page,
+                "results": data,
+            },
+            links,
+        )
+
+
+class JobListView(generics.ListCreateAPIView):
+    """
+    ジョブの一覧の取得と登録を行うAPI
+    GETリクエストでジョブを新しい順に取得 (?status= で状況を絞り込める)
+    POSTリクエストで {"kind": ..., "params": {...}} のジョブを登録し、202を返す
+    ジョブはリクエストの中では実行せず、run_todo_worker コマンドのワーカーが実行する
+    実行状況を確認できるよう、読み取りレプリカではなくプライマリから読み取る
+    """
+
+    serializer_class = JobSerializer
+    pagination_class = JobPagination
+
+    def get_queryset(self):
+        queryset = Job.objects.order_by("-id")
+        job_status = self.request.query_params.get("status")
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        with pin_primary():
+            return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response["Location"] = request.build_absolute_uri(f"{response.data['id']}/")
+        return response
+
+
+class JobDetailView(generics.RetrieveDestroyAPIView):
+    """
+    ジョブの実行状況の取得と取り消しを行うAPI
+    GETリクエストでジョブの状況・結果を取得
+    DELETEリクエストで待機中のジョブを取り消す (実行中・終了済みのジョブは409)
+    """
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        with pin_primary():
+            return super().retrieve(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with pin_primary():
+            job = self.get_object()
+        canceled = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.CANCELED, finished_at=timezone.now()
+        )
+        if not canceled:
+            raise JobNotCancelable()
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from todo.archive import archivable_tasks, archive_cutoff, archive_tasks
+
+
+class Command(BaseCommand):
+    """
+    完了から一定期間が経過したタスクをアーカイブテーブルに移動するコマンド
+    定期的に実行し、一覧・サマリーが参照するタスクテーブルを未完了と最近のタスクだけに保つ
+    --dry-run を指定した場合は移動せずに対象の件数だけを出力する
+    """
+
+    help = "完了から一定期間が経過したタスクをアーカイブします"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="完了 (最終更新) からの日数、省略時は TODO_ARCHIVE_AFTER_DAYS",
+        )
+        parser.add_argument("--batch-size", type=int, help="1回で移動する件数")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="移動せずに対象の件数を出力します"
+        )
+
+    def handle(self, *args, **options):
+        before = archive_cutoff(options["days"])
+        if options["dry_run"]:
+            count = archivable_tasks(before).count()
+            self.stdout.write(f"{before.isoformat()} より前に完了したタスク: {count}件")
+            return
+
+        start = time.perf_counter()
+        archived = archive_tasks(before, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{archived}件をアーカイブしました ({time.perf_counter() - start:.2f}秒)"
+            )
+        )
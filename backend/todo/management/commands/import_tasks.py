@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.importer import IMPORT_FORMATS, TaskImporter
+
+
+class Command(BaseCommand):
+    """
+    CSV/NDJSONファイルのタスクを COPY FROM STDIN で一括登録するコマンド
+    形式は --format、省略時はファイルの拡張子から判定する
+    不正な行は登録せずに行番号とエラーを出力する
+    """
+
+    help = "CSV/NDJSONファイルのタスクを一括登録します"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="取り込むファイル (- で標準入力)")
+        parser.add_argument(
+            "--format", choices=sorted(IMPORT_FORMATS), help="ファイルの形式"
+        )
+        parser.add_argument("--batch-size", type=int, help="1回の COPY で書き込む件数")
+        parser.add_argument("--max-errors", type=int, help="出力するエラーの最大件数")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"]
+        if import_format is None:
+            extension = os.path.splitext(path)[1].lstrip(".").lower()
+            import_format = "ndjson" if extension == "jsonl" else extension
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError("--format で csv または ndjson を指定してください")
+
+        importer = TaskImporter(
+            batch_size=options["batch_size"], max_errors=options["max_errors"]
+        )
+        start = time.perf_counter()
+        if path == "-":
+            stream = open(
+                sys.stdin.fileno(), encoding="utf-8", newline="", closefd=False
+            )
+        else:
+            try:
+                stream = open(path, encoding="utf-8-sig", newline="")
+            except OSError as exc:
+                raise CommandError(exc)
+        with stream:
+            result = importer.run(IMPORT_FORMATS[import_format](stream))
+        elapsed = time.perf_counter() - start
+
+        for error in result["errors"]:
+            self.stderr.write(f"{error['line']}行目: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['imported']}件を登録しました "
+                f"(不正な行 {result['rejected']}件、{elapsed:.2f}秒)"
+            )
+        )
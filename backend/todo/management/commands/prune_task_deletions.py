@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from todo.changes import prune_deletions
+
+
+class Command(BaseCommand):
+    """
+    変更フィードの保持期間を過ぎた削除の記録を削除するコマンド
+    保持期間より前のトークンは410になるため、削除しても取りこぼしは起きない
+    """
+
+    help = "保持期間を過ぎたタスクの削除の記録を削除します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="保持する日数、省略時は TODO_CHANGES_RETENTION_DAYS",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = settings.TODO_CHANGES_RETENTION_DAYS
+        deleted = prune_deletions(timezone.now() - timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(f"{deleted}件の削除の記録を削除しました"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.models import Task, TaskStatusCounter
+
+
+class Command(BaseCommand):
+    """
+    状況ごとのタスク件数カウンターをタスクテーブルから再構築するコマンド
+    --check を指定した場合は再構築せずに差分の有無だけを確認する
+    """
+
+    help = "状況ごとのタスク件数カウンターを再構築します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="再構築せず、カウンターと実際の件数が一致しているか確認します",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            counters = TaskStatusCounter.objects.totals()
+            actual = TaskStatusCounter.objects.actual_totals()
+            mismatches = [
+                f"{label}: カウンター={counters.get(status, 0)} 実件数={actual.get(status, 0)}"
+                for status, label in Task.STATUS_CHOICES
+                if counters.get(status, 0) != actual.get(status, 0)
+            ]
+            if mismatches:
+                raise CommandError(
+                    "カウンターが一致していません\n" + "\n".join(mismatches)
+                )
+            self.stdout.write(self.style.SUCCESS("カウンターは一致しています"))
+            return
+
+        totals = TaskStatusCounter.objects.rebuild()
+        for status, label in Task.STATUS_CHOICES:
+            self.stdout.write(f"{label}: {totals.get(status, 0)}")
+        self.stdout.write(self.style.SUCCESS("カウンターを再構築しました"))
@@ -0,0 +1,44 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from todo.jobs import Worker
+
+
+class Command(BaseCommand):
+    """
+    バックグラウンドのジョブ (/api/todo/jobs/ で登録) を実行するワーカーのコマンド
+    スレッドプールで --concurrency 件まで同時に実行し、複数のプロセス・サーバーで起動できる
+    SIGTERM / SIGINT を受け取ると、実行中のジョブの終了を待ってから停止する
+    """
+
+    help = "バックグラウンドのジョブを実行します"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="同時に実行するジョブの数、省略時は TODO_JOBS_CONCURRENCY",
+        )
+        parser.add_argument(
+            "--poll-seconds",
+            type=float,
+            help="通知がない場合に確認する間隔、省略時は TODO_JOBS_POLL_SECONDS",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="実行できるジョブがなくなったら終了します (cron などから起動する場合)",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options["concurrency"], poll_seconds=options["poll_seconds"]
+        )
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: worker.stop())
+        self.stdout.write(
+            f"ワーカー {worker.name} を開始しました (同時実行数: {worker.concurrency})"
+        )
+        executed = worker.run(once=options["once"])
+        self.stdout.write(self.style.SUCCESS(f"{executed}件のジョブを実行しました"))
@@ -0,0 +1,327 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+
+# 処理時間のヒストグラムの区切り (秒)
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+# 1リクエストのSQL実行回数のヒストグラムの区切り
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# 処理中のリクエストの計測値
+_current = ContextVar("todo_request_metrics", default=None)
+
+
+class Histogram:
+    """
+    Histogramクラス
+    ラベルの組ごとに観測値の区切りごとの件数・合計・件数を保持し、Prometheusのテキスト形式で出力する
+    プロセス内のメモリに保持するため、複数プロセスで動かす場合はプロセスごとの値となる
+    """
+
+    def __init__(self, name, documentation, buckets, labelnames=("route", "method")):
+        """
+        Args:
+            name (str): メトリクス名
+            documentation (str): メトリクスの説明 (# HELP)
+            buckets (tuple): 区切りの上限値 (昇順)
+            labelnames (tuple): ラベル名
+        """
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        """
+        観測値を記録
+
+        Args:
+            labels (tuple): labelnames の順のラベルの値
+            value (float): 観測値
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # 区切りごとの件数 (最後は +Inf)、合計
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def collect(self):
+        """
+        Prometheusのテキスト形式の行を作成
+
+        Returns:
+            list: 出力する行のリスト
+        """
+        with self._lock:
+            series = {
+                labels: (list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            }
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, total) in sorted(series.items()):
+            label_text = ",".join(
+                f'{name}="{_escape_label(value)}"'
+                for name, value in zip(self.labelnames, labels)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{le}"}} {cumulative}'
+                )
+            lines.append(f"{self.name}_sum{{{label_text}}} {total!r}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "todo_request_duration_seconds",
+    "ビューの処理時間 (レスポンスの変換を含む)",
+    DURATION_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "todo_request_db_duration_seconds",
+    "1リクエストのSQLの実行時間の合計",
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "todo_request_db_queries",
+    "1リクエストのSQLの実行回数",
+    QUERY_COUNT_BUCKETS,
+)
+SERIALIZE_DURATION = Histogram(
+    "todo_request_serialize_duration_seconds",
+    "1リクエストのシリアライズの処理時間 (SQLの実行時間を除く)",
+    DURATION_BUCKETS,
+)
+METRICS = (REQUEST_DURATION, DB_DURATION, DB_QUERIES, SERIALIZE_DURATION)
+
+
+class RequestMetrics:
+    """
+    RequestMetricsクラス
+    1リクエストのSQLの実行回数・実行時間と処理段階ごとの時間を保持する
+    """
+
+    __slots__ = ("start", "render_start", "queries", "db_time", "timings")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.render_start = None
+        self.queries = 0
+        self.db_time = 0.0
+        # 処理段階の名前 → 時間 (秒)
+        self.timings = {}
+
+    def add(self, name, duration):
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+    def server_timing(self, total):
+        """
+        Server-Timing ヘッダーの値を作成
+
+        Args:
+            total (float): リクエスト全体の処理時間 (秒)
+
+        Returns:
+            str: Server-Timing ヘッダーの値 (時間はミリ秒)
+        """
+        entries = [f'db;dur={self.db_time * 1000:.3f};desc="{self.queries} queries"']
+        entries.extend(
+            f"{name};dur={duration * 1000:.3f}"
+            for name, duration in self.timings.items()
+        )
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    SQLの実行回数・時間を処理中のリクエストに記録する execute_wrapper
+    非同期ビューのSQLはイベントループとは別のスレッドの接続で実行されるため、
+    リクエストごとではなく全ての接続に常に設定し、計測値はコンテキスト変数から参照する
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def install_query_recorder(connection):
+    """
+    データベース接続に record_query を設定する
+    接続ごとに1度だけ、他の execute_wrapper より外側に設定する
+
+    Args:
+        connection (BaseDatabaseWrapper): データベース接続
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def timer(name):
+    """
+    ブロックの処理時間を処理中のリクエストの処理段階として記録する
+    ブロック内で実行したSQLの時間は db に計上されるため、この段階の時間からは除く
+    計測中のリクエストがない場合は何もしない
+
+    Args:
+        name (str): 処理段階の名前 (Server-Timing の項目名)
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    db_time = metrics.db_time
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.add(name, elapsed - (metrics.db_time - db_time))
+
+
+class RequestMetricsMiddleware:
+    """
+    RequestMetricsMiddlewareクラス
+    ビューごとのSQLの実行回数・実行時間、シリアライズ・レスポンスの変換の時間と処理時間を計測する
+    計測値は Server-Timing ヘッダーで返し、URLの名前ごとのヒストグラムとして /metrics で公開する
+    レスポンスの変換 (render) を計測するため、MIDDLEWARE の最後に追加する
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.TODO_METRICS:
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.TODO_METRICS:
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF のレスポンスはこの後に JSON などへ変換される
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.render_start = time.perf_counter()
+        return response
+
+    @staticmethod
+    def finish(request, response, metrics):
+        """
+        計測値をヒストグラムに記録し、Server-Timing ヘッダーを付ける
+        名前のないURLと /metrics 自身は記録しない
+
+        Args:
+            request (HttpRequest): リクエスト
+            response (HttpResponse): レスポンス
+            metrics (RequestMetrics): リクエストの計測値
+        """
+        end = time.perf_counter()
+        total = end - metrics.start
+        if metrics.render_start is not None:
+            metrics.add("render", end - metrics.render_start)
+
+        match = request.resolver_match
+        route = match.url_name if match is not None else None
+        if route is not None and route != "metrics":
+            labels = (route, request.method)
+            REQUEST_DURATION.observe(labels, total)
+            DB_DURATION.observe(labels, metrics.db_time)
+            DB_QUERIES.observe(labels, metrics.queries)
+            SERIALIZE_DURATION.observe(labels, metrics.timings.get("serialize", 0.0))
+        if settings.TODO_SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing(total)
+
+
+def render_metrics():
+    """
+    全てのメトリクスをPrometheusのテキスト形式で出力
+
+    Returns:
+        str: Prometheusのテキスト形式の文字列
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+@require_safe
+def metrics_view(request):
+    """
+    Prometheus のスクレイプ用にメトリクスを返すビュー
+
+    Returns:
+        HttpResponse: Prometheusのテキスト形式のレスポンス
+    """
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
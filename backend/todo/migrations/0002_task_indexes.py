@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:54
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 大量データのテーブルをロックしないようにCONCURRENTLYで作成する
+    atomic = False
+
+    dependencies = [
+        ("todo", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["due_date", "id"], name="todo_task_due_date_id_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["status", "priority", "due_date"],
+                name="todo_task_status_prio_due_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", 2)),
+                fields=["id"],
+                name="todo_task_completed_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", 2), _negated=True),
+                fields=["due_date", "id"],
+                name="todo_task_incomplete_due_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+# 文単位のトリガーで遷移テーブルを集計し、状況ごとの増減をまとめてカウンターに反映する
+# COPYや一括登録でもカウンターの更新は文ごとに1回で済む
+TRIGGER_SQL = """
+CREATE FUNCTION todo_task_status_counter() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE todo_taskstatuscounter SET count = 0;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO todo_taskstatuscounter (status, count)
+        SELECT status, count(*) FROM new_rows GROUP BY status
+        ON CONFLICT (status)
+        DO UPDATE SET count = todo_taskstatuscounter.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE todo_taskstatuscounter AS counter SET count = counter.count - d.n
+        FROM (SELECT status, count(*) AS n FROM old_rows GROUP BY status) AS d
+        WHERE counter.status = d.status;
+    ELSE
+        INSERT INTO todo_taskstatuscounter (status, count)
+        SELECT status, sum(n) FROM (
+            SELECT status, 1 AS n FROM new_rows
+            UNION ALL
+            SELECT status, -1 AS n FROM old_rows
+        ) AS d
+        GROUP BY status
+        HAVING sum(n) <> 0
+        ON CONFLICT (status)
+        DO UPDATE SET count = todo_taskstatuscounter.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER todo_task_status_counter_insert
+AFTER INSERT ON todo_task REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_status_counter();
+
+CREATE TRIGGER todo_task_status_counter_update
+AFTER UPDATE ON todo_task REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_status_counter();
+
+CREATE TRIGGER todo_task_status_counter_delete
+AFTER DELETE ON todo_task REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_status_counter();
+
+CREATE TRIGGER todo_task_status_counter_truncate
+AFTER TRUNCATE ON todo_task
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_status_counter();
+
+-- 既存データで初期化する (集計中の書き込みはロックで待たせる)
+LOCK TABLE todo_task IN SHARE ROW EXCLUSIVE MODE;
+INSERT INTO todo_taskstatuscounter (status, count)
+SELECT status, count(*) FROM todo_task GROUP BY status;
+"""
+
+REVERSE_TRIGGER_SQL = """
+DROP TRIGGER todo_task_status_counter_insert ON todo_task;
+DROP TRIGGER todo_task_status_counter_update ON todo_task;
+DROP TRIGGER todo_task_status_counter_delete ON todo_task;
+DROP TRIGGER todo_task_status_counter_truncate ON todo_task;
+DROP FUNCTION todo_task_status_counter();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0002_task_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskStatusCounter",
+            fields=[
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[(0, "未実施"), (1, "実施中"), (2, "完了")],
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="状況",
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0, verbose_name="件数")),
+            ],
+        ),
+        migrations.RunSQL(TRIGGER_SQL, REVERSE_TRIGGER_SQL),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:03
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("todo", "0003_task_status_counter"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(fields=["updated_at"], name="todo_task_updated_at_idx"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:06
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("todo", "0004_task_updated_at_index"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["priority", "due_date", "id"], name="todo_task_priority_due_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "title", "description", config="simple"
+                ),
+                name="todo_task_search_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:38
+
+from django.db import migrations, models
+
+# タスクとアーカイブ済みのタスクを合わせたビュー
+# UNION ALL のため、絞り込み・並び替えの条件はそれぞれのテーブルに適用される
+VIEW_SQL = """
+CREATE VIEW todo_task_with_archived AS
+SELECT id, title, description, status, priority, due_date, created_at, updated_at
+FROM todo_task
+UNION ALL
+SELECT id, title, description, status, priority, due_date, created_at, updated_at
+FROM todo_archivedtask;
+"""
+
+REVERSE_VIEW_SQL = "DROP VIEW todo_task_with_archived;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0005_task_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                ("title", models.CharField(max_length=255, verbose_name="タスク名")),
+                (
+                    "description",
+                    models.TextField(blank=True, null=True, verbose_name="詳細"),
+                ),
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[(0, "未実施"), (1, "実施中"), (2, "完了")],
+                        default=0,
+                        verbose_name="状況",
+                    ),
+                ),
+                (
+                    "priority",
+                    models.IntegerField(
+                        choices=[(0, "低"), (1, "中"), (2, "高")],
+                        default=0,
+                        verbose_name="優先度",
+                    ),
+                ),
+                (
+                    "due_date",
+                    models.DateTimeField(blank=True, null=True, verbose_name="期限"),
+                ),
+                (
+                    "id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="登録日")),
+                ("updated_at", models.DateTimeField(verbose_name="更新日")),
+                ("archived_at", models.DateTimeField(verbose_name="アーカイブ日時")),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["due_date", "id"], name="todo_archived_due_date_id_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TaskWithArchived",
+            fields=[
+                ("title", models.CharField(max_length=255, verbose_name="タスク名")),
+                (
+                    "description",
+                    models.TextField(blank=True, null=True, verbose_name="詳細"),
+                ),
+                (
+                    "status",
+                    models.IntegerField(
+                        choices=[(0, "未実施"), (1, "実施中"), (2, "完了")],
+                        default=0,
+                        verbose_name="状況",
+                    ),
+                ),
+                (
+                    "priority",
+                    models.IntegerField(
+                        choices=[(0, "低"), (1, "中"), (2, "高")],
+                        default=0,
+                        verbose_name="優先度",
+                    ),
+                ),
+                (
+                    "due_date",
+                    models.DateTimeField(blank=True, null=True, verbose_name="期限"),
+                ),
+                (
+                    "id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="登録日")),
+                ("updated_at", models.DateTimeField(verbose_name="更新日")),
+            ],
+            options={
+                "db_table": "todo_task_with_archived",
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(VIEW_SQL, REVERSE_VIEW_SQL),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:42
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+
+# 文単位のトリガーで削除されたタスクのidを削除の記録に登録する
+# アーカイブへの移動 (DELETE ... RETURNING) や一括削除も1文で記録される
+# TRUNCATE は削除したidを参照できないため記録しない
+TRIGGER_SQL = """
+CREATE FUNCTION todo_task_record_deletion() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO todo_taskdeletion (task_id, deleted_at)
+    SELECT id, clock_timestamp() FROM old_rows;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER todo_task_record_deletion
+AFTER DELETE ON todo_task REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_record_deletion();
+"""
+
+REVERSE_TRIGGER_SQL = """
+DROP TRIGGER todo_task_record_deletion ON todo_task;
+DROP FUNCTION todo_task_record_deletion();
+"""
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("todo", "0006_task_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskDeletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField(verbose_name="タスクID")),
+                ("deleted_at", models.DateTimeField(verbose_name="削除日時")),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["deleted_at", "id"],
+                        name="todo_deletion_deleted_at_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(TRIGGER_SQL, REVERSE_TRIGGER_SQL),
+        # 新しいインデックスを作成してから、置き換える updated_at のインデックスを削除する
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["updated_at", "id"], name="todo_task_updated_at_id_idx"
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="task",
+            name="todo_task_updated_at_idx",
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.6 on 2026-10-18 08:50
+
+from django.db import migrations
+
+# 文単位のトリガーでタスクの変更を todo_task_changes チャンネルに NOTIFY する
+# 通知はコミット時に配信され、ロールバックした変更は配信されない
+# ペイロードは8000バイトまでのため、100件を超える変更ではidを省略 (null) する
+TRIGGER_SQL = """
+CREATE FUNCTION todo_task_notify() RETURNS trigger AS $$
+DECLARE
+    ids json;
+BEGIN
+    IF TG_OP = 'INSERT' OR TG_OP = 'UPDATE' THEN
+        SELECT json_agg(id) INTO ids FROM (SELECT id FROM new_rows LIMIT 101) AS r;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT json_agg(id) INTO ids FROM (SELECT id FROM old_rows LIMIT 101) AS r;
+    END IF;
+    IF TG_OP <> 'TRUNCATE' THEN
+        IF ids IS NULL THEN
+            -- 対象の行がない文は通知しない
+            RETURN NULL;
+        ELSIF json_array_length(ids) > 100 THEN
+            ids := NULL;
+        END IF;
+    END IF;
+    PERFORM pg_notify(
+        'todo_task_changes',
+        json_build_object('op', lower(TG_OP), 'ids', ids)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER todo_task_notify_insert
+AFTER INSERT ON todo_task REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_notify();
+
+CREATE TRIGGER todo_task_notify_update
+AFTER UPDATE ON todo_task REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_notify();
+
+CREATE TRIGGER todo_task_notify_delete
+AFTER DELETE ON todo_task REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_notify();
+
+CREATE TRIGGER todo_task_notify_truncate
+AFTER TRUNCATE ON todo_task
+FOR EACH STATEMENT EXECUTE FUNCTION todo_task_notify();
+"""
+
+REVERSE_TRIGGER_SQL = """
+DROP TRIGGER todo_task_notify_insert ON todo_task;
+DROP TRIGGER todo_task_notify_update ON todo_task;
+DROP TRIGGER todo_task_notify_delete ON todo_task;
+DROP TRIGGER todo_task_notify_truncate ON todo_task;
+DROP FUNCTION todo_task_notify();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0007_task_changes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(TRIGGER_SQL, REVERSE_TRIGGER_SQL),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:03
+
+from django.db import migrations, models
+
+# ジョブの登録を todo_jobs チャンネルに NOTIFY し、待機中のワーカーをすぐに起こす
+# 通知はコミット時に配信されるため、ワーカーはコミット済みのジョブを取得できる
+TRIGGER_SQL = """
+CREATE FUNCTION todo_job_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('todo_jobs', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER todo_job_notify_insert
+AFTER INSERT ON todo_job
+FOR EACH STATEMENT EXECUTE FUNCTION todo_job_notify();
+"""
+
+REVERSE_TRIGGER_SQL = """
+DROP TRIGGER todo_job_notify_insert ON todo_job;
+DROP FUNCTION todo_job_notify();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0008_task_notify"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=64, verbose_name="種類")),
+                (
+                    "params",
+                    models.JSONField(blank=True, default=dict, verbose_name="引数"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "待機中"),
+                            ("running", "実行中"),
+                            ("succeeded", "成功"),
+                            ("failed", "失敗"),
+                            ("canceled", "取消"),
+                        ],
+                        default="queued",
+                        max_length=16,
+                        verbose_name="状況",
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(blank=True, null=True, verbose_name="結果"),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="エラー"),
+                ),
+                ("attempts", models.IntegerField(default=0, verbose_name="実行回数")),
+                (
+                    "max_attempts",
+                    models.IntegerField(default=3, verbose_name="最大実行回数"),
+                ),
+                ("run_at", models.DateTimeField(verbose_name="実行予定日時")),
+                (
+                    "locked_by",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        max_length=128,
+                        verbose_name="実行中のワーカー",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="登録日"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="開始日時"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="終了日時"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "queued")),
+                        fields=["run_at", "id"],
+                        name="todo_job_queued_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("status", "running")),
+                        fields=["started_at"],
+                        name="todo_job_running_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(TRIGGER_SQL, REVERSE_TRIGGER_SQL),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:05
+
+from django.db import migrations
+
+# 変更フィードの読み取り位置として、行を書き込んだトランザクションのID (xid8) を記録する
+# 更新日時はコミット前に決まるため、コミットの遅いトランザクションの変更を取りこぼす
+# 列はモデルに含めず (APIに出力しない)、登録は列の既定値、更新はトリガーで設定する
+# 既存の行は 0 とし、移行前のトークンは変更日時の形式のため410で一覧を取得し直させる
+COLUMN_SQL = """
+ALTER TABLE todo_task ADD COLUMN change_xid bigint NOT NULL DEFAULT 0;
+ALTER TABLE todo_task
+    ALTER COLUMN change_xid SET DEFAULT pg_current_xact_id()::text::bigint;
+ALTER TABLE todo_taskdeletion ADD COLUMN change_xid bigint NOT NULL DEFAULT 0;
+ALTER TABLE todo_taskdeletion
+    ALTER COLUMN change_xid SET DEFAULT pg_current_xact_id()::text::bigint;
+
+CREATE FUNCTION todo_task_set_change_xid() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER todo_task_set_change_xid
+BEFORE UPDATE ON todo_task
+FOR EACH ROW EXECUTE FUNCTION todo_task_set_change_xid();
+"""
+
+REVERSE_COLUMN_SQL = """
+DROP TRIGGER todo_task_set_change_xid ON todo_task;
+DROP FUNCTION todo_task_set_change_xid();
+ALTER TABLE todo_taskdeletion DROP COLUMN change_xid;
+ALTER TABLE todo_task DROP COLUMN change_xid;
+"""
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("todo", "0009_job"),
+    ]
+
+    operations = [
+        migrations.RunSQL(COLUMN_SQL, REVERSE_COLUMN_SQL),
+        # 変更フィードのキーセット (change_xid, id)
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY todo_task_change_xid_idx "
+            "ON todo_task (change_xid, id)",
+            "DROP INDEX CONCURRENTLY todo_task_change_xid_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY todo_deletion_change_xid_idx "
+            "ON todo_taskdeletion (change_xid, id)",
+            "DROP INDEX CONCURRENTLY todo_deletion_change_xid_idx",
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:40
+
+from django.db import migrations
+
+# 0003 のトリガー関数を置き換え、複数のカウンター行を常に状況の順にロックする
+# 逆向きに状況を変える (0→2 と 2→0) トランザクションが同時に実行されても、
+# 行のロックを取得する順序が同じになるためデッドロックしない
+# INSERT ... SELECT は ORDER BY の順に行を処理し、UPDATE は先に FOR UPDATE で順にロックする
+TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION todo_task_status_counter() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM 1 FROM todo_taskstatuscounter ORDER BY status FOR UPDATE;
+        UPDATE todo_taskstatuscounter SET count = 0;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO todo_taskstatuscounter (status, count)
+        SELECT status, count(*) FROM new_rows GROUP BY status ORDER BY status
+        ON CONFLICT (status)
+        DO UPDATE SET count = todo_taskstatuscounter.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM 1 FROM todo_taskstatuscounter
+        WHERE status IN (SELECT status FROM old_rows)
+        ORDER BY status
+        FOR UPDATE;
+        UPDATE todo_taskstatuscounter AS counter SET count = counter.count - d.n
+        FROM (SELECT status, count(*) AS n FROM old_rows GROUP BY status) AS d
+        WHERE counter.status = d.status;
+    ELSE
+        INSERT INTO todo_taskstatuscounter (status, count)
+        SELECT status, sum(n) FROM (
+            SELECT status, 1 AS n FROM new_rows
+            UNION ALL
+            SELECT status, -1 AS n FROM old_rows
+        ) AS d
+        GROUP BY status
+        HAVING sum(n) <> 0
+        ORDER BY status
+        ON CONFLICT (status)
+        DO UPDATE SET count = todo_taskstatuscounter.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0010_task_change_xid"),
+    ]
+
+    operations = [
+        # 集計の結果は変わらないため、戻す場合も置き換えた関数をそのまま使用する
+        migrations.RunSQL(TRIGGER_SQL, migrations.RunSQL.noop),
+    ]
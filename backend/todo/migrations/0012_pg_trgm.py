@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:10
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# タスク名・詳細の部分一致検索 (0013) に使用する pg_trgm を導入する
+# CREATE EXTENSION は pg_trgm のファイルがサーバーに導入されていること (postgres イメージは導入済み) と、
+# データベースの CREATE 権限 (pg_trgm は信頼された拡張のため、スーパーユーザーでなくてよい) が必要
+# 権限のない接続ユーザーで移行する場合は、管理者が事前に次を実行すればこのマイグレーションは何もしない
+#     CREATE EXTENSION IF NOT EXISTS pg_trgm;
+# インデックスの変更は 0013 で行うため、ここで失敗しても既存の全文検索のインデックスは残る
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0011_task_status_counter_lock_order"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:10
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations
+
+# simple 設定の全文検索は区切りのない日本語の文を1語として扱い、文の途中の語で検索できないため、
+# pg_trgm (0012) のトライグラムによる部分一致検索に置き換える
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("todo", "0012_pg_trgm"),
+    ]
+
+    operations = [
+        # 新しいインデックスを作成してから、置き換える全文検索のインデックスを削除する
+        AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"),
+                    name="gin_trgm_ops",
+                ),
+                name="todo_task_title_trgm_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("description"),
+                    name="gin_trgm_ops",
+                ),
+                name="todo_task_description_trgm_idx",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="task",
+            name="todo_task_search_idx",
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+# サマリーの ?include_archived=true でアーカイブ済みのタスクを正確に数えるため、
+# 0003 の状況ごとのカウンターと同じく文単位のトリガーで件数を維持する
+# 行は id=1 の1行とし、テーブルを空にした後 (テストの flush など) も登録し直せるよう UPSERT する
+TRIGGER_SQL = """
+CREATE FUNCTION todo_archivedtask_counter() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE todo_archivedtaskcounter SET count = 0;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO todo_archivedtaskcounter (id, count)
+        SELECT 1, count(*) FROM new_rows
+        ON CONFLICT (id)
+        DO UPDATE SET count = todo_archivedtaskcounter.count + EXCLUDED.count;
+    ELSE
+        INSERT INTO todo_archivedtaskcounter (id, count)
+        SELECT 1, -count(*) FROM old_rows
+        ON CONFLICT (id)
+        DO UPDATE SET count = todo_archivedtaskcounter.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER todo_archivedtask_counter_insert
+AFTER INSERT ON todo_archivedtask REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_archivedtask_counter();
+
+CREATE TRIGGER todo_archivedtask_counter_delete
+AFTER DELETE ON todo_archivedtask REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION todo_archivedtask_counter();
+
+CREATE TRIGGER todo_archivedtask_counter_truncate
+AFTER TRUNCATE ON todo_archivedtask
+FOR EACH STATEMENT EXECUTE FUNCTION todo_archivedtask_counter();
+
+-- 既存データで初期化する (集計中の書き込みはロックで待たせる)
+LOCK TABLE todo_archivedtask IN SHARE ROW EXCLUSIVE MODE;
+INSERT INTO todo_archivedtaskcounter (id, count)
+SELECT 1, count(*) FROM todo_archivedtask;
+"""
+
+REVERSE_TRIGGER_SQL = """
+DROP TRIGGER todo_archivedtask_counter_insert ON todo_archivedtask;
+DROP TRIGGER todo_archivedtask_counter_delete ON todo_archivedtask;
+DROP TRIGGER todo_archivedtask_counter_truncate ON todo_archivedtask;
+DROP FUNCTION todo_archivedtask_counter();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0013_task_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.SmallIntegerField(
+                        default=1, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0, verbose_name="件数")),
+            ],
+        ),
+        migrations.RunSQL(TRIGGER_SQL, REVERSE_TRIGGER_SQL),
+    ]
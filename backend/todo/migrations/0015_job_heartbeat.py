@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:55
+
+from django.db import migrations, models
+
+# 実行中のジョブは開始日時ではなく最終応答日時で停止を判定する
+# 移行前から実行中のジョブは開始日時を最終応答日時とする
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0014_archived_task_counter"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="job",
+            name="todo_job_running_idx",
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="最終応答日時"
+            ),
+        ),
+        migrations.RunSQL(
+            "UPDATE todo_job SET heartbeat_at = started_at WHERE status = 'running'",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("status", "running")),
+                fields=["heartbeat_at"],
+                name="todo_job_heartbeat_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,13 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Upper
 
 
-class Task(models.Model):
+class AbstractTask(models.Model):
+    """
+    タスク・アーカイブ済みのタスクに共通の項目
+    """
+
     STATUS_CHOICES = [
         (0, "未実施"),
         (1, "実施中"),
@@ -20,8 +26,288 @@ class Task(models.Model):
         choices=PRIORITY_CHOICES, default=0, verbose_name="優先度"
     )
     due_date = models.DateTimeField(blank=True, null=True, verbose_name="期限")
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return self.title
+
+
+class Task(AbstractTask):
+    # 変更フィードの位置に使う change_xid 列 (書き込んだトランザクションのID) は
+    # APIに出力しないようモデル外に持つ (マイグレーション 0010、todo/changes.py)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="登録日")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新日")
 
+    class Meta:
+        indexes = [
+            # 一覧の並び順 (due_date, id) とキーセット方式のページング
+            models.Index(fields=["due_date", "id"], name="todo_task_due_date_id_idx"),
+            # 状況・優先度で絞り込んだ一覧
+            models.Index(
+                fields=["status", "priority", "due_date"],
+                name="todo_task_status_prio_due_idx",
+            ),
+            # 優先度順の一覧
+            models.Index(
+                fields=["priority", "due_date", "id"],
+                name="todo_task_priority_due_idx",
+            ),
+            # タスク名・詳細の部分一致検索 (pg_trgm のトライグラム)
+            # icontains の条件 UPPER(列) LIKE UPPER(%s) と同じ式で作成する
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="todo_task_title_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("description"), name="gin_trgm_ops"),
+                name="todo_task_description_trgm_idx",
+            ),
+            # 最終更新日時の取得 (ETag) と変更フィードのキーセット (updated_at, id)
+            models.Index(
+                fields=["updated_at", "id"], name="todo_task_updated_at_id_idx"
+            ),
+            # 完了タスクの件数取得
+            models.Index(
+                fields=["id"],
+                name="todo_task_completed_idx",
+                condition=models.Q(status=2),
+            ),
+            # 未完了タスクを期限順に取得
+            models.Index(
+                fields=["due_date", "id"],
+                name="todo_task_incomplete_due_idx",
+                condition=~models.Q(status=2),
+            ),
+        ]
+
+
+class ArchivedTask(AbstractTask):
+    """
+    アーカイブ済みのタスク
+    完了から一定期間が経過したタスクを archive_tasks コマンドでタスクテーブルから移動する
+    idはタスクテーブルでのidを引き継ぐため、詳細APIは同じidで参照できる
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    created_at = models.DateTimeField(verbose_name="登録日")
+    updated_at = models.DateTimeField(verbose_name="更新日")
+    archived_at = models.DateTimeField(verbose_name="アーカイブ日時")
+
+    class Meta:
+        indexes = [
+            # アーカイブを含む一覧の並び順 (due_date, id)
+            models.Index(
+                fields=["due_date", "id"], name="todo_archived_due_date_id_idx"
+            ),
+        ]
+
+
+class TaskDeletion(models.Model):
+    """
+    削除されたタスクの記録 (変更フィードの削除通知)
+    タスクテーブルのトリガーで削除 (アーカイブへの移動を含む) のたびに登録する
+    TODO_CHANGES_RETENTION_DAYS を過ぎた記録は prune_task_deletions コマンドで削除する
+    タスクと同じく、変更フィードの位置に使う change_xid 列をモデル外に持つ
+    """
+
+    task_id = models.BigIntegerField(verbose_name="タスクID")
+    deleted_at = models.DateTimeField(verbose_name="削除日時")
+
+    class Meta:
+        indexes = [
+            # 変更フィードのキーセット (deleted_at, id)
+            models.Index(
+                fields=["deleted_at", "id"], name="todo_deletion_deleted_at_idx"
+            ),
+        ]
+
+
+class TaskWithArchived(AbstractTask):
+    """
+    タスクとアーカイブ済みのタスクを合わせたビュー (UNION ALL)
+    ?include_archived=true の一覧で使用する読み取り専用のモデル
+    絞り込み・並び替えの条件はそれぞれのテーブルのインデックスで処理される
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    created_at = models.DateTimeField(verbose_name="登録日")
+    updated_at = models.DateTimeField(verbose_name="更新日")
+
+    class Meta:
+        managed = False
+        db_table = "todo_task_with_archived"
+
+
+class TaskStatusCounterManager(models.Manager):
+    def totals(self):
+        """
+        状況ごとのタスク件数を取得
+
+        Returns:
+            dict: 状況をキー、件数を値とする辞書
+        """
+        return dict(self.values_list("status", "count"))
+
+    async def atotals(self):
+        """
+        非同期ビューで状況ごとのタスク件数を取得
+
+        Returns:
+            dict: 状況をキー、件数を値とする辞書
+        """
+        return {
+            status: count async for status, count in self.values_list("status", "count")
+        }
+
+    def actual_totals(self):
+        """
+        タスクテーブルを集計して状況ごとの実際の件数を取得
+
+        Returns:
+            dict: 状況をキー、件数を値とする辞書
+        """
+        rows = (
+            Task.objects.order_by()
+            .values("status")
+            .annotate(count=models.Count("id"))
+            .values_list("status", "count")
+        )
+        return dict(rows)
+
+    def rebuild(self):
+        """
+        タスクテーブルを集計してカウンターを作り直す
+        集計中の更新を防ぐため、トランザクション内でタスクテーブルの書き込みをロックする
+
+        Returns:
+            dict: 再構築後の状況ごとの件数
+        """
+        using = router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {Task._meta.db_table} IN SHARE ROW EXCLUSIVE MODE"
+                )
+            totals = self.actual_totals()
+            self.all().delete()
+            self.bulk_create(
+                [
+                    self.model(status=status, count=count)
+                    for status, count in totals.items()
+                ]
+            )
+        return totals
+
+
+class TaskStatusCounter(models.Model):
+    """
+    状況ごとのタスク件数
+    タスクテーブルのトリガーで登録・更新・削除のたびに増減する
+    """
+
+    status = models.IntegerField(
+        primary_key=True, choices=Task.STATUS_CHOICES, verbose_name="状況"
+    )
+    count = models.BigIntegerField(default=0, verbose_name="件数")
+
+    objects = TaskStatusCounterManager()
+
     def __str__(self):
-        return self.title
+        return f"{self.get_status_display()}: {self.count}"
+
+
+class ArchivedTaskCounterManager(models.Manager):
+    def total(self):
+        """
+        アーカイブ済みのタスクの件数を取得
+
+        Returns:
+            int: 件数
+        """
+        return self.filter(pk=1).values_list("count", flat=True).first() or 0
+
+    async def atotal(self):
+        """
+        非同期ビューでアーカイブ済みのタスクの件数を取得
+
+        Returns:
+            int: 件数
+        """
+        return await self.filter(pk=1).values_list("count", flat=True).afirst() or 0
+
+
+class ArchivedTaskCounter(models.Model):
+    """
+    アーカイブ済みのタスクの件数 (id=1 の1行)
+    アーカイブテーブルのトリガーで移動・削除のたびに増減する
+    """
+
+    id = models.SmallIntegerField(primary_key=True, default=1, verbose_name="ID")
+    count = models.BigIntegerField(default=0, verbose_name="件数")
+
+    objects = ArchivedTaskCounterManager()
+
+    def __str__(self):
+        return f"アーカイブ: {self.count}"
+
+
+class Job(models.Model):
+    """
+    バックグラウンドで実行するジョブ (アーカイブ、カウンターの再構築など)
+    run_todo_worker コマンドのワーカーが SELECT ... FOR UPDATE SKIP LOCKED で取得して実行する
+    実行中はワーカーが heartbeat_at を定期的に更新し、更新が途絶えたジョブだけを再実行する
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELED = "canceled"
+    STATUS_CHOICES = [
+        (QUEUED, "待機中"),
+        (RUNNING, "実行中"),
+        (SUCCEEDED, "成功"),
+        (FAILED, "失敗"),
+        (CANCELED, "取消"),
+    ]
+
+    kind = models.CharField(max_length=64, verbose_name="種類")
+    params = models.JSONField(default=dict, blank=True, verbose_name="引数")
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=QUEUED, verbose_name="状況"
+    )
+    result = models.JSONField(blank=True, null=True, verbose_name="結果")
+    error = models.TextField(blank=True, default="", verbose_name="エラー")
+    attempts = models.IntegerField(default=0, verbose_name="実行回数")
+    max_attempts = models.IntegerField(default=3, verbose_name="最大実行回数")
+    run_at = models.DateTimeField(verbose_name="実行予定日時")
+    locked_by = models.CharField(
+        max_length=128, blank=True, default="", verbose_name="実行中のワーカー"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="登録日")
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name="開始日時")
+    heartbeat_at = models.DateTimeField(
+        blank=True, null=True, verbose_name="最終応答日時"
+    )
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="終了日時")
+
+    class Meta:
+        indexes = [
+            # 待機中のジョブを実行予定順に取得 (実行済みのジョブは含めない)
+            models.Index(
+                fields=["run_at", "id"],
+                name="todo_job_queued_idx",
+                condition=models.Q(status="queued"),
+            ),
+            # 実行中のまま応答が途絶えたジョブの検出
+            models.Index(
+                fields=["heartbeat_at"],
+                name="todo_job_heartbeat_idx",
+                condition=models.Q(status="running"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} ({self.get_status_display()})"
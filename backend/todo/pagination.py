@@ -0,0 +1,401 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import BooleanField, DateTimeField, F, Func, Value
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from todo.counting import get_count_strategy
+
+PAGE_SIZE_QUERY_PARAM = "page_size"
+
+
+def get_page_size(params):
+    """
+    クエリパラメータからページサイズを取得
+    指定がない・不正な場合は settings.TODO_PAGE_SIZE、上限は settings.TODO_MAX_PAGE_SIZE とする
+    (上限を超える指定は上限に切り詰め、レスポンスの page_size で実際の件数を返す)
+
+    Args:
+        params (QueryDict): クエリパラメータ
+
+    Returns:
+        int: 1ページあたりの件数
+    """
+    try:
+        page_size = int(params[PAGE_SIZE_QUERY_PARAM])
+    except (KeyError, ValueError):
+        return settings.TODO_PAGE_SIZE
+    if page_size <= 0:
+        return settings.TODO_PAGE_SIZE
+    return min(page_size, settings.TODO_MAX_PAGE_SIZE)
+
+
+def link_header(links):
+    """
+    前後のページのURLを Link ヘッダー (RFC 8288) の値に変換
+    クライアントはレスポンス本文を解析する前に次のページを先読みできる
+
+    Args:
+        links (dict): {"next": str | None, "previous": str | None}
+
+    Returns:
+        str | None: Link ヘッダーの値、前後のページがない場合はNone
+    """
+    values = [
+        f'<{url}>; rel="{rel}"'
+        for rel, url in (("next", links["next"]), ("prev", links["previous"]))
+        if url
+    ]
+    return ", ".join(values) or None
+
+
+def paginated_response(data, links):
+    """
+    ページネーションのレスポンスを作成し、前後のページを Link ヘッダーで示す
+
+    Args:
+        data (dict): レスポンスデータ
+        links (dict): {"next": str | None, "previous": str | None}
+
+    Returns:
+        Response: ページネーションされたレスポンス
+    """
+    link = link_header(links)
+    return Response(data, headers={"Link": link} if link else None)
+
+
+class TaskPage(Page):
+    """
+    件数が推定値の場合でも次ページの有無を正しく判定するPage
+    """
+
+    has_more = None
+
+    def has_next(self):
+        if self.has_more is not None:
+            return self.has_more
+        return super().has_next()
+
+
+class TaskPaginator(Paginator):
+    """
+    TaskPaginatorクラス
+    設定された件数取得方式で総件数を取得するPaginator
+    件数が推定値の場合はページ番号の上限を確認せず、1件多く取得して次ページの有無を判定する
+    """
+
+    def __init__(self, *args, count_strategy=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_strategy = count_strategy or get_count_strategy()
+
+    @cached_property
+    def _count_result(self):
+        return self.count_strategy.count(self.object_list)
+
+    @property
+    def count(self):
+        return self._count_result[0]
+
+    @property
+    def count_is_exact(self):
+        return self._count_result[1]
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # 推定件数を超えるページにも実データが存在する可能性がある
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        page = self._get_page(rows[: self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return TaskPage(*args, **kwargs)
+
+
+class CustomPagination(PageNumberPagination):
+    """
+    CustomPaginationクラス
+    ページネーションをカスタマイズし、1ページあたりのタスク数を設定 (settings.TODO_PAGE_SIZE) から取得
+    ?page_size= で指定できる件数は settings.TODO_MAX_PAGE_SIZE までとする
+    """
+
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+    django_paginator_class = TaskPaginator
+
+    def get_page_size(self, request):
+        return get_page_size(request.query_params)
+
+    def get_paginated_response(self, data):
+        """
+        ページネーションのレスポンスをカスタマイズ
+
+        Args:
+            data (list): シリアライズされたタスクデータのリスト
+
+        Returns:
+            Response: ページネーションされたレスポンスデータ
+                count_is_exact は count が推定値の場合にFalseになる
+        """
+        links = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        return paginated_response(
+            {
+                "links": links,
+                "count": self.page.paginator.count,
+                "count_is_exact": self.page.paginator.count_is_exact,
+                "page_size": self.page.paginator.per_page,
+                "results": data,
+            },
+            links,
+        )
+
+
+class _Row(Func):
+    """行値コンストラクタ ROW(a, b, ...)"""
+
+    function = "ROW"
+
+
+class _RowCompare(Func):
+    """
+    行値の比較 ROW(a, b) > ROW(c, d)
+    PostgreSQLは複合インデックスの範囲条件としてこの比較を利用できる
+    """
+
+    template = "%(expressions)s"
+    output_field = BooleanField()
+
+    def __init__(self, lhs, operator, rhs):
+        self.arg_joiner = f" {operator} "
+        super().__init__(lhs, rhs)
+
+
+class KeysetPagination(BasePagination):
+    """
+    KeysetPaginationクラス
+    (due_date NULLS LAST, id) をキーとしたキーセット(カーソル)方式のページネーション
+    OFFSETと件数取得を行わないため、どのページでもインデックス範囲走査1〜2回で取得できる
+    ?pagination=keyset または ?cursor=... が指定された場合に使用する
+    """
+
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+    mode_query_param = "pagination"
+    mode_query_value = "keyset"
+    cursor_query_param = "cursor"
+    key_fields = ("due_date", "id")
+    invalid_cursor_message = "カーソルが不正です"
+
+    @classmethod
+    def is_requested(cls, request):
+        """
+        リクエストがキーセット方式を要求しているか判定
+
+        Args:
+            request (Request): リクエスト
+
+        Returns:
+            bool: キーセット方式を使用する場合はTrue
+        """
+        params = request.query_params
+        return (
+            params.get(cls.mode_query_param) == cls.mode_query_value
+            or cls.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        カーソル位置から1ページ分のタスクを取得
+
+        Args:
+            queryset (QuerySet): 対象のクエリセット
+            request (Request): リクエスト
+            view (APIView): 呼び出し元のビュー
+
+        Returns:
+            list: 1ページ分のタスク
+        """
+        self.request = request
+        self.page_size = get_page_size(request.query_params)
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            key, reverse = None, False
+        else:
+            key, reverse = (cursor["d"], cursor["i"]), cursor["r"]
+
+        rows = self._fetch(queryset, key, reverse, self.page_size + 1)
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        # シリアライズで行が変換される前に先頭と末尾のキーを保持する
+        self.page = rows
+        self.keys = [self._get_key(row) for row in rows[:1] + rows[-1:]]
+        return rows
+
+    def _fetch(self, queryset, key, reverse, limit):
+        """
+        キーの前後から最大limit件を取得
+        期限ありの区間と期限なし(NULL)の区間をそれぞれインデックス順に走査する
+
+        Args:
+            queryset (QuerySet): 対象のクエリセット
+            key (tuple): 基準となる (due_date, id)、先頭から取得する場合はNone
+            reverse (bool): 基準より前のタスクを逆順に取得する場合はTrue
+            limit (int): 取得する最大件数
+
+        Returns:
+            list: 取得したタスク
+        """
+        dated = queryset.filter(due_date__isnull=False)
+        undated = queryset.filter(due_date__isnull=True)
+        if reverse:
+            dated = dated.order_by("-due_date", "-id")
+            undated = undated.order_by("-id")
+        else:
+            dated = dated.order_by("due_date", "id")
+            undated = undated.order_by("id")
+
+        if key is None:
+            segments = [undated, dated] if reverse else [dated, undated]
+        elif key[0] is None:
+            # 基準が期限なし区間にある場合、期限あり区間は常に基準より前になる
+            if reverse:
+                segments = [undated.filter(id__lt=key[1]), dated]
+            else:
+                segments = [undated.filter(id__gt=key[1])]
+        else:
+            dated = dated.filter(
+                _RowCompare(
+                    _Row(F("due_date"), F("id")),
+                    "<" if reverse else ">",
+                    _Row(Value(key[0], DateTimeField()), Value(key[1])),
+                )
+            )
+            segments = [dated] if reverse else [dated, undated]
+
+        rows = []
+        for segment in segments:
+            rows.extend(segment[: limit - len(rows)])
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def decode_cursor(self, request):
+        """
+        リクエストのカーソルを復号
+
+        Args:
+            request (Request): リクエスト
+
+        Returns:
+            dict: 復号したカーソル、指定がない場合はNone
+
+        Raises:
+            NotFound: カーソルが不正な場合
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            due_date = data["d"]
+            if due_date is not None:
+                due_date = parse_datetime(due_date)
+                if due_date is None:
+                    raise ValueError(data["d"])
+            return {"d": due_date, "i": int(data["i"]), "r": bool(data["r"])}
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _get_key(task):
+        """
+        タスクのキー (due_date, id) を取得
+
+        Args:
+            task (Task | dict): タスク、または values() で取得した辞書
+
+        Returns:
+            tuple: (due_date, id)
+        """
+        if isinstance(task, dict):
+            return task["due_date"], task["id"]
+        return task.due_date, task.pk
+
+    def encode_cursor(self, key, reverse):
+        """
+        タスクの位置をカーソル付きURLに変換
+
+        Args:
+            key (tuple): 基準となるタスクの (due_date, id)
+            reverse (bool): 基準より前を取得するカーソルの場合はTrue
+
+        Returns:
+            str: カーソル付きのURL
+        """
+        due_date, pk = key
+        due_date = due_date.isoformat() if due_date else None
+        payload = json.dumps({"d": due_date, "i": pk, "r": reverse})
+        encoded = base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded.rstrip("="))
+
+    def get_next_link(self):
+        if not self.has_next or not self.keys:
+            return None
+        return self.encode_cursor(self.keys[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.keys:
+            return None
+        return self.encode_cursor(self.keys[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        """
+        ページネーションのレスポンスをカスタマイズ
+        件数は取得しないため count は含めない
+
+        Args:
+            data (list): シリアライズされたタスクデータのリスト
+
+        Returns:
+            Response: ページネーションされたレスポンスデータ
+        """
+        links = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        return paginated_response(
+            {"links": links, "page_size": self.page_size, "results": data}, links
+        )
@@ -0,0 +1,148 @@
+import hashlib
+import re
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_PLACEHOLDER = re.compile(r"%([s%])")
+
+# データベース接続ごとの準備済みステートメント (SQL → ステートメント名)
+# 準備に失敗したSQLは名前をNoneとして記録し、再度準備しない
+_statements = WeakKeyDictionary()
+
+
+class PreparedStatements:
+    """
+    PreparedStatementsクラス
+    データベース接続の execute_wrapper として使用し、SELECT文をプリペアドステートメントで実行する
+    同じSQLの2回目以降はPostgreSQLでの構文解析と実行計画の作成を省略できる
+    ステートメントは接続ごとに準備するため、永続的な接続 (CONN_MAX_AGE) と組み合わせて使用する
+    PgBouncer のトランザクションプーリングでは接続が切り替わるため使用できない
+    サーバーサイドカーソル (QuerySet.iterator()) のSQLは DECLARE ... CURSOR FOR で実行されるため、
+    EXECUTE に置き換えずにそのまま実行する
+    """
+
+    prefix = "todo_"
+
+    def __init__(self, max_statements=None):
+        """
+        Args:
+            max_statements (int): 接続ごとに保持するステートメントの上限、
+                省略時は settings.TODO_PREPARED_STATEMENTS_MAX
+        """
+        if max_statements is None:
+            max_statements = settings.TODO_PREPARED_STATEMENTS_MAX
+        self.max_statements = max_statements
+
+    def __call__(self, execute, sql, params, many, context):
+        if (
+            many
+            or not isinstance(params, (list, tuple))
+            or not sql.lstrip()[:6].upper() == "SELECT"
+            or getattr(context["cursor"].cursor, "name", None)
+        ):
+            return execute(sql, params, many, context)
+
+        name = self.prepare(context["connection"], context["cursor"], sql)
+        if name is None:
+            return execute(sql, params, many, context)
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            return execute(f"EXECUTE {name} ({placeholders})", params, many, context)
+        return execute(f"EXECUTE {name}", None, many, context)
+
+    def prepare(self, connection, cursor, sql):
+        """
+        SQLのプリペアドステートメントを準備
+        準備済みの場合はそのまま名前を返し、上限を超えた場合は最も古いステートメントを解放する
+
+        Args:
+            connection (BaseDatabaseWrapper): データベース接続
+            cursor (CursorWrapper): カーソル
+            sql (str): %s をプレースホルダーとするSQL
+
+        Returns:
+            str: ステートメント名、準備できない場合はNone
+        """
+        statements = _statements.setdefault(connection.connection, OrderedDict())
+        if sql in statements:
+            statements.move_to_end(sql)
+            return statements[sql]
+
+        name = self.prefix + hashlib.md5(sql.encode()).hexdigest()[:16]
+        numbers = iter(range(1, sql.count("%s") + 1))
+        converted = _PLACEHOLDER.sub(
+            lambda match: "%" if match.group(1) == "%" else f"${next(numbers)}", sql
+        )
+        # 生のカーソルで実行し、他の execute_wrapper やクエリの記録を経由しない
+        raw = cursor.cursor
+        savepoint = connection.in_atomic_block
+        try:
+            if savepoint:
+                raw.execute("SAVEPOINT todo_prepare")
+            raw.execute(f"PREPARE {name} AS {converted}")
+            if savepoint:
+                raw.execute("RELEASE SAVEPOINT todo_prepare")
+        except DatabaseError:
+            # パラメータの型を推定できないSQLなどは通常どおり実行する
+            if savepoint:
+                raw.execute("ROLLBACK TO SAVEPOINT todo_prepare")
+            name = None
+        statements[sql] = name
+
+        while len(statements) > self.max_statements:
+            _, oldest = statements.popitem(last=False)
+            if oldest is not None:
+                raw.execute(f"DEALLOCATE {oldest}")
+        return name
+
+
+@contextmanager
+def prepared_statements(using=None):
+    """
+    ブロック内のSELECT文をプリペアドステートメントで実行する
+    settings.TODO_PREPARED_STATEMENTS がFalseの場合は何もしない
+    読み取りの振り分け先はクエリごとに変わる (トランザクション内はプライマリなど) ため、
+    エイリアスを省略した場合はプライマリと読み取りレプリカの両方の接続に設定する
+
+    Args:
+        using (str): データベースのエイリアス、省略時はタスクの読み取りに使用しうる全てのデータベース
+    """
+    if not settings.TODO_PREPARED_STATEMENTS:
+        yield
+        return
+    if using is not None:
+        aliases = [using]
+    else:
+        aliases = [DEFAULT_DB_ALIAS]
+        if settings.TODO_READ_REPLICA not in (None, DEFAULT_DB_ALIAS):
+            aliases.append(settings.TODO_READ_REPLICA)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(
+                connections[alias].execute_wrapper(PreparedStatements())
+            )
+        yield
+
+
+def use_prepared_statements(view):
+    """
+    ビューのSELECT文をプリペアドステートメントで実行するデコレーター
+
+    Args:
+        view (callable): ビュー関数
+
+    Returns:
+        callable: プリペアドステートメントを使用するビュー関数
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with prepared_statements():
+            return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,52 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson は UUID・dict/list/str のサブクラス (ReturnDict、ErrorDetail など) を直接出力する
+# 整数キーの辞書 (状況ごとの件数) は文字列キーに変換する
+# 日時は orjson と DRF で形式が異なる場合がある (秒単位のUTCオフセット、タイムゾーン付きの時刻など) ため、
+# DRF の JSONEncoder で変換する
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_default = JSONEncoder().default
+
+# JavaScript の文字列に含められない行区切り・段落区切り (UTF-8)
+_LINE_SEPARATOR = "\u2028".encode()
+_PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+def dumps(data):
+    """
+    DRF の JSONRenderer と同じ形式 (区切りの空白なし、非ASCII文字をそのまま出力) のJSONに変換
+    orjson が直接出力できない値 (遅延評価の文字列、Decimal など) と日時は DRF の JSONEncoder で変換する
+
+    Args:
+        data: 変換する値
+
+    Returns:
+        bytes: UTF-8のJSON
+    """
+    content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    # DRF と同じく U+2028 / U+2029 はエスケープする
+    if _LINE_SEPARATOR in content or _PARAGRAPH_SEPARATOR in content:
+        content = content.replace(_LINE_SEPARATOR, b"\\u2028").replace(
+            _PARAGRAPH_SEPARATOR, b"\\u2029"
+        )
+    return content
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ORJSONRendererクラス
+    標準ライブラリの json の代わりに orjson でJSONに変換するレンダラー
+    出力は JSONRenderer と同じになる
+    インデント (Accept: application/json; indent=4 やブラウザブルAPI) を指定した場合は JSONRenderer で変換する
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
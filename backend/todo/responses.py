@@ -0,0 +1,34 @@
+from django.http import HttpResponse
+
+from todo.renderers import dumps
+
+
+def json_response(data, status=200):
+    """
+    DRF のレスポンスと同じ形式のJSONレスポンスを作成
+    DRF を経由しないビューでも ORJSONRenderer と同じく orjson で変換する
+
+    Args:
+        data (dict | list): レスポンスデータ
+        status (int): ステータスコード
+
+    Returns:
+        HttpResponse: JSONレスポンス
+    """
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def error_response(exc):
+    """
+    DRF の例外を DRF の exception_handler と同じ形式のレスポンスに変換
+
+    Args:
+        exc (APIException): 例外
+
+    Returns:
+        HttpResponse: エラーレスポンス
+    """
+    data = (
+        exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    )
+    return json_response(data, status=exc.status_code)
@@ -0,0 +1,162 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+# プライマリから読み取るリクエスト・処理の中でTrueになる
+_pinned = ContextVar("todo_read_primary", default=False)
+
+
+def is_pinned():
+    """
+    読み取りをプライマリに固定しているか判定
+
+    Returns:
+        bool: 固定している場合はTrue
+    """
+    return _pinned.get()
+
+
+@contextmanager
+def pin_primary():
+    """
+    ブロック内の読み取りをプライマリで実行する
+    レプリカの遅延で結果が欠けると困る処理 (変更フィードなど) で使用する
+    """
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def reads_primary(model):
+    """
+    現在の処理でモデルの読み取りがプライマリで実行されるか判定
+    レプリカから読み取った結果は書き込みより古い場合があるため、キャッシュに保存する前に確認する
+    (キャッシュのキーのデータバージョンは、プライマリへの書き込みの時点で進む)
+
+    Args:
+        model (type): 読み取るモデル
+
+    Returns:
+        bool: プライマリから読み取る場合はTrue
+    """
+    return router.db_for_read(model) == DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """
+    todo アプリの読み取りを読み取りレプリカ (settings.TODO_READ_REPLICA)、書き込みをプライマリに振り分ける
+    レプリカが設定されていない場合は振り分けない (全て default)
+    次の場合はレプリカの遅延で直前の書き込みが見えなくなるため、読み取りもプライマリで実行する
+    - プライマリのトランザクション内 (更新前の確認、SELECT ... FOR UPDATE など)
+    - pin_primary() のブロック内、ReplicaPinningMiddleware が固定したリクエスト
+    """
+
+    app_label = "todo"
+
+    def _replica(self, model):
+        if model._meta.app_label != self.app_label:
+            return None
+        return settings.TODO_READ_REPLICA
+
+    def db_for_read(self, model, **hints):
+        replica = self._replica(model)
+        if replica is None:
+            return None
+        if is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        if self._replica(model) is None:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # レプリカはプライマリの複製のため、どちらから読み取ったオブジェクトも関連付けられる
+        aliases = {DEFAULT_DB_ALIAS, settings.TODO_READ_REPLICA}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    ReplicaPinningMiddlewareクラス
+    クライアントが書き込んだ直後の TODO_REPLICA_PIN_SECONDS 秒間、そのクライアントの読み取りをプライマリに固定する
+    (自分の書き込みを直後の再取得で確実に読める read-your-writes)
+    書き込みのレスポンスで Cookie を付け、Cookie を送ったクライアントだけを固定する
+    (アドレスで固定すると、プロキシやNATの背後の全クライアントが1回の書き込みで固定されるため)
+    別オリジンのフロントエンドは資格情報付き (withCredentials) でリクエストする
+    書き込み (POST/PUT/PATCH/DELETE) のリクエスト自体も全てプライマリで実行する
+    """
+
+    sync_capable = True
+    async_capable = True
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if settings.TODO_READ_REPLICA is None:
+            return self.get_response(request)
+        token = _pinned.set(self.should_pin(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        self.remember_write(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if settings.TODO_READ_REPLICA is None:
+            return await self.get_response(request)
+        token = _pinned.set(self.should_pin(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        self.remember_write(request, response)
+        return response
+
+    def should_pin(self, request):
+        """
+        リクエストの読み取りをプライマリに固定するか判定
+
+        Args:
+            request (HttpRequest): リクエスト
+
+        Returns:
+            bool: 書き込みのリクエスト、または直前に書き込んだクライアントの場合はTrue
+        """
+        if request.method not in self.safe_methods:
+            return True
+        return settings.TODO_REPLICA_PIN_COOKIE in request.COOKIES
+
+    def remember_write(self, request, response):
+        """
+        書き込みに成功したクライアントを一定時間プライマリに固定する
+
+        Args:
+            request (HttpRequest): リクエスト
+            response (HttpResponse): レスポンス
+        """
+        if request.method in self.safe_methods or response.status_code >= 400:
+            return
+        seconds = settings.TODO_REPLICA_PIN_SECONDS
+        response.set_cookie(
+            settings.TODO_REPLICA_PIN_COOKIE,
+            "1",
+            max_age=seconds,
+            httponly=True,
+            samesite="Lax",
+        )
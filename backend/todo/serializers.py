@@ -1,9 +1,203 @@
-from rest_framework import serializers
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
+from todo.metrics import timer
 from todo.models import Task
 
 
+class TaskListSerializer(serializers.ListSerializer):
+    """
+    タスクの一括登録・一括更新を行うListSerializer
+    bulk_create / bulk_update で batch_size 件ずつまとめて書き込む
+    一括更新では instance に {id: Task} の辞書を渡し、各要素の "id" で対象を特定する
+    """
+
+    default_error_messages = {
+        "not_found": "ID {pk} のタスクが見つかりません",
+        "id_required": "更新対象のIDを指定してください",
+        "duplicate": "ID {pk} が重複しています",
+    }
+
+    @property
+    def data(self):
+        with timer("serialize"):
+            return super().data
+
+    @property
+    def batch_size(self):
+        return self.context.get("batch_size", settings.TODO_BULK_BATCH_SIZE)
+
+    def to_internal_value(self, data):
+        self._seen_ids = set()
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        try:
+            pk = int(data["id"])
+        except (TypeError, KeyError, ValueError):
+            raise serializers.ValidationError(
+                {"id": [self.error_messages["id_required"]]}
+            )
+        task = self.instance.get(pk)
+        if task is None:
+            raise serializers.ValidationError(
+                {"id": [self.error_messages["not_found"].format(pk=pk)]}
+            )
+        if task.pk in self._seen_ids:
+            raise serializers.ValidationError(
+                {"id": [self.error_messages["duplicate"].format(pk=pk)]}
+            )
+        self._seen_ids.add(task.pk)
+        self.child.instance = task
+        self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        validated["id"] = task.pk
+        return validated
+
+    def create(self, validated_data):
+        tasks = [Task(**attrs) for attrs in validated_data]
+        return Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+
+    def update(self, instance, validated_data):
+        # bulk_update では auto_now が適用されないため更新日時を明示的に設定する
+        now = timezone.now()
+        fields = {"updated_at"}
+        tasks = []
+        for attrs in validated_data:
+            task = instance[attrs.pop("id")]
+            for field, value in attrs.items():
+                setattr(task, field, value)
+            fields.update(attrs)
+            task.updated_at = now
+            tasks.append(task)
+        Task.objects.bulk_update(tasks, sorted(fields), batch_size=self.batch_size)
+        return tasks
+
+
 class TaskSerializer(serializers.ModelSerializer):
+    """
+    タスクのシリアライザ
+    fields 引数を指定すると、その項目だけを出力する
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @property
+    def data(self):
+        with timer("serialize"):
+            return super().data
+
     class Meta:
         model = Task
         fields = "__all__"
+        list_serializer_class = TaskListSerializer
+
+
+class TaskReadSerializer:
+    """
+    TaskSerializer の読み取り専用の高速版
+    フィールドオブジェクトを使わず、values() で取得した辞書の日時だけをまとめて変換する
+    出力は TaskSerializer(many=True).data と同じ値・同じキー順になる
+    """
+
+    serializer_class = TaskSerializer
+    _fields = None
+
+    def __init__(self, fields=None):
+        """
+        Args:
+            fields (list): 出力する項目、省略時は全項目
+        """
+        all_fields, datetime_fields = self.get_field_names()
+        self.field_names = [
+            name for name in all_fields if fields is None or name in fields
+        ]
+        self.datetime_fields = [
+            name for name in datetime_fields if name in self.field_names
+        ]
+        self.extra_fields = []
+
+    @classmethod
+    def get_field_names(cls):
+        """
+        TaskSerializer の項目名を取得
+        項目の構成はモデルから決まるため、初回だけ TaskSerializer から取得する
+
+        Returns:
+            tuple: (全項目名のリスト, 日時の項目名のリスト)
+        """
+        if cls._fields is None:
+            fields = cls.serializer_class().fields
+            cls._fields = (
+                list(fields),
+                [
+                    name
+                    for name, field in fields.items()
+                    if isinstance(field, serializers.DateTimeField)
+                ],
+            )
+        return cls._fields
+
+    @classmethod
+    def is_supported(cls):
+        """
+        高速版で TaskSerializer と同じ出力を得られる設定か判定
+
+        Returns:
+            bool: タイムゾーンが有効で、日時の出力形式がISO 8601の場合はTrue
+        """
+        if not settings.USE_TZ:
+            return False
+        output_format = api_settings.DATETIME_FORMAT
+        return output_format is not None and output_format.lower() == ISO_8601
+
+    def select(self, queryset, required=()):
+        """
+        シリアライズに必要な列だけを辞書で取得するクエリセットに変換
+
+        Args:
+            queryset (QuerySet): タスクのクエリセット
+            required (tuple): 出力しないがページネーションなどで必要な項目
+
+        Returns:
+            QuerySet: values() を適用したクエリセット
+        """
+        self.extra_fields = [name for name in required if name not in self.field_names]
+        return queryset.values(*self.field_names, *self.extra_fields)
+
+    def to_representation(self, rows):
+        """
+        values() で取得した辞書のリストをレスポンス用に変換
+        日時は現在のタイムゾーンに変換してISO 8601形式の文字列にする
+
+        Args:
+            rows (list): values() で取得した辞書のリスト
+
+        Returns:
+            list: シリアライズされたタスクデータのリスト
+        """
+        tz = timezone.get_current_timezone()
+        datetime_fields = self.datetime_fields
+        extra_fields = self.extra_fields
+        with timer("serialize"):
+            for row in rows:
+                for name in extra_fields:
+                    del row[name]
+                for name in datetime_fields:
+                    value = row[name]
+                    if value is not None:
+                        value = value.astimezone(tz).isoformat()
+                        if value.endswith("+00:00"):
+                            value = value[:-6] + "Z"
+                        row[name] = value
+        return rows
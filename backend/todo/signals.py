@@ -0,0 +1,25 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from todo.cache import invalidate_task_data
+from todo.metrics import install_query_recorder
+from todo.models import ArchivedTask, Task
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=ArchivedTask)
+def invalidate_task_caches(sender, using, **kwargs):
+    """
+    タスクの保存・削除時にキャッシュを無効化する
+    """
+    invalidate_task_data(using)
+
+
+@receiver(connection_created)
+def install_request_metrics(sender, connection, **kwargs):
+    """
+    データベースへの接続時にSQLの計測を設定する
+    """
+    install_query_recorder(connection)
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from todo.models import ArchivedTaskCounter, Task, TaskStatusCounter
+
+COMPLETED_STATUS = 2
+
+
+def build_status_summary(counts, archived_tasks=0):
+    """
+    状況ごとの件数から合計件数と完了件数を作成
+    アーカイブ済みのタスクは全て完了のため、どちらの件数にも加える
+
+    Args:
+        counts (dict): 状況をキー、件数を値とする辞書
+        archived_tasks (int): 含めるアーカイブ済みのタスクの件数
+
+    Returns:
+        dict: 合計件数と完了件数
+    """
+    return {
+        "total_tasks": sum(counts.values()) + archived_tasks,
+        "completed_tasks": counts.get(COMPLETED_STATUS, 0) + archived_tasks,
+    }
+
+
+def status_summary(archived=False):
+    """
+    カウンターから合計件数と完了件数を取得
+    アーカイブ済みのタスクの件数もトリガーで維持しているカウンターから正確に取得する
+
+    Args:
+        archived (bool): アーカイブ済みのタスクの件数を含める場合はTrue
+
+    Returns:
+        dict: build_status_summary() の形式のサマリー
+    """
+    counts = TaskStatusCounter.objects.totals()
+    archived_tasks = ArchivedTaskCounter.objects.total() if archived else 0
+    return build_status_summary(counts, archived_tasks)
+
+
+async def astatus_summary(archived=False):
+    """
+    非同期ビューでカウンターから合計件数と完了件数を取得 (status_summary を参照)
+
+    Args:
+        archived (bool): アーカイブ済みのタスクの件数を含める場合はTrue
+
+    Returns:
+        dict: build_status_summary() の形式のサマリー
+    """
+    counts = await TaskStatusCounter.objects.atotals()
+    archived_tasks = await ArchivedTaskCounter.objects.atotal() if archived else 0
+    return build_status_summary(counts, archived_tasks)
+
+
+def breakdown_aggregates(now):
+    """
+    サマリーの内訳を1回の集計で取得するための条件付き集計式を作成
+
+    Args:
+        now (datetime): 期限切れ・期限間近の判定に使用する現在時刻
+
+    Returns:
+        dict: aggregate() に渡す集計式
+    """
+    due_soon_until = now + timedelta(hours=settings.TODO_DUE_SOON_HOURS)
+    incomplete = ~Q(status=COMPLETED_STATUS)
+    aggregates = {
+        f"s{status}_p{priority}": Count(
+            "id", filter=Q(status=status, priority=priority)
+        )
+        for status, _ in Task.STATUS_CHOICES
+        for priority, _ in Task.PRIORITY_CHOICES
+    }
+    aggregates["overdue"] = Count("id", filter=incomplete & Q(due_date__lt=now))
+    aggregates["due_soon"] = Count(
+        "id",
+        filter=incomplete & Q(due_date__gte=now, due_date__lt=due_soon_until),
+    )
+    return aggregates
+
+
+def build_breakdown(row):
+    """
+    集計結果をサマリーのレスポンス形式に変換
+
+    Args:
+        row (dict): breakdown_aggregates() による集計結果
+
+    Returns:
+        dict: 合計・状況別・優先度別・状況×優先度別の件数と期限切れ・期限間近の件数
+    """
+    matrix = {
+        status: {
+            priority: row[f"s{status}_p{priority}"]
+            for priority, _ in Task.PRIORITY_CHOICES
+        }
+        for status, _ in Task.STATUS_CHOICES
+    }
+    status_counts = {status: sum(counts.values()) for status, counts in matrix.items()}
+    priority_counts = {
+        priority: sum(counts[priority] for counts in matrix.values())
+        for priority, _ in Task.PRIORITY_CHOICES
+    }
+    return {
+        "total_tasks": sum(status_counts.values()),
+        "completed_tasks": status_counts[COMPLETED_STATUS],
+        "status_counts": status_counts,
+        "priority_counts": priority_counts,
+        "status_priority_counts": matrix,
+        "overdue_tasks": row["overdue"],
+        "due_soon_tasks": row["due_soon"],
+    }
+
+
+def task_breakdown(queryset=None, now=None):
+    """
+    タスクのサマリーを内訳付きで取得
+
+    Args:
+        queryset (QuerySet): 集計対象のタスク、省略時は全件
+        now (datetime): 現在時刻、省略時は timezone.now()
+
+    Returns:
+        dict: build_breakdown() の形式のサマリー
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    row = queryset.aggregate(**breakdown_aggregates(now or timezone.now()))
+    return build_breakdown(row)
+
+
+async def atask_breakdown(queryset=None, now=None):
+    """
+    非同期ビューでタスクのサマリーを内訳付きで取得 (task_breakdown を参照)
+
+    Args:
+        queryset (QuerySet): 集計対象のタスク、省略時は全件
+        now (datetime): 現在時刻、省略時は timezone.now()
+
+    Returns:
+        dict: build_breakdown() の形式のサマリー
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    row = await queryset.aaggregate(**breakdown_aggregates(now or timezone.now()))
+    return build_breakdown(row)
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.archive import archive_tasks
+from todo.models import ArchivedTask, ArchivedTaskCounter, Task, TaskStatusCounter
+
+
+@pytest.mark.django_db
+class TestArchive:
+    """完了タスクのアーカイブに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        ArchivedTask.objects.all().delete()
+        now = timezone.now()
+        self.old = now - timedelta(days=60)
+        self.active = Task.objects.create(title="未完了", status=0)
+        self.recent = Task.objects.create(title="最近完了", status=2)
+        self.completed = [
+            Task.objects.create(title=f"完了 {i}", status=2) for i in range(3)
+        ]
+        # 最終更新日時は auto_now で上書きされるため update() で過去にする
+        Task.objects.filter(pk__in=[task.pk for task in self.completed]).update(
+            updated_at=self.old
+        )
+        Task.objects.filter(pk=self.active.pk).update(updated_at=self.old)
+
+    def test_archive_tasks(self):
+        """一定期間前に完了したタスクだけをidを保ったままバッチで移動することを確認"""
+        cutoff = timezone.now() - timedelta(days=30)
+        assert archive_tasks(cutoff, batch_size=2) == 3
+
+        assert set(Task.objects.values_list("pk", flat=True)) == {
+            self.active.pk,
+            self.recent.pk,
+        }
+        archived = ArchivedTask.objects.order_by("pk")
+        assert [task.pk for task in archived] == [task.pk for task in self.completed]
+        assert all(task.updated_at == self.old for task in archived)
+        assert all(task.archived_at is not None for task in archived)
+        totals = TaskStatusCounter.objects.totals()
+        assert (totals.get(0, 0), totals.get(1, 0), totals.get(2, 0)) == (1, 0, 1)
+
+    def test_command(self):
+        """archive_tasks コマンドの --dry-run では移動しないことを確認"""
+        out = StringIO()
+        call_command("archive_tasks", "--dry-run", stdout=out)
+        assert "3件" in out.getvalue()
+        assert ArchivedTask.objects.count() == 0
+
+        call_command("archive_tasks", "--days", "30", stdout=out)
+        assert "3件をアーカイブしました" in out.getvalue()
+        assert ArchivedTask.objects.count() == 3
+
+    def test_list_include_archived(self):
+        """一覧は通常アーカイブを含まず、?include_archived=true で含めることを確認"""
+        archive_tasks(timezone.now() - timedelta(days=30))
+
+        response = self.client.get("/api/todo/?page_size=10")
+        assert response.data["count"] == 2
+        assert "ETag" in response
+
+        response = self.client.get("/api/todo/?page_size=10&include_archived=true")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 5
+        assert "ETag" not in response
+        response = self.client.get(
+            "/api/todo/?include_archived=true&status=2&search=完了&page_size=10"
+        )
+        # アーカイブ済みの3件と、タスク名の途中に「完了」を含む「最近完了」
+        assert response.data["count"] == 4
+
+        response = self.client.get("/api/async/todo/?include_archived=1&page_size=10")
+        assert response.json()["count"] == 5
+
+        response = self.client.get("/api/todo/?include_archived=maybe")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_detail_archived(self):
+        """アーカイブ済みのタスクを同じidで取得・削除でき、更新は409になることを確認"""
+        archive_tasks(timezone.now() - timedelta(days=30))
+        pk = self.completed[0].pk
+
+        response = self.client.get(f"/api/todo/{pk}/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["title"] == "完了 0"
+        assert "ETag" in response
+        response = self.client.get(f"/api/async/todo/{pk}/")
+        assert response.json()["title"] == "完了 0"
+
+        response = self.client.patch(f"/api/todo/{pk}/", {"title": "x"}, format="json")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        response = self.client.patch(f"/api/todo/{pk}/", {"status": 0}, format="json")
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = self.client.delete(f"/api/todo/{pk}/")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not ArchivedTask.objects.filter(pk=pk).exists()
+        assert self.client.get(f"/api/todo/{pk}/").status_code == 404
+
+    def test_summary_include_archived(self):
+        """サマリーの ?include_archived=true でアーカイブ済みのタスクを完了として数えることを確認"""
+        archive_tasks(timezone.now() - timedelta(days=30))
+
+        response = self.client.get("/api/todo/summary/")
+        assert response.data == {"total_tasks": 2, "completed_tasks": 1}
+        response = self.client.get("/api/todo/summary/?include_archived=true")
+        assert response.data == {"total_tasks": 5, "completed_tasks": 4}
+        response = self.client.get(
+            "/api/todo/summary/?include_archived=true&breakdown=true"
+        )
+        assert response.data["status_counts"] == {0: 1, 1: 0, 2: 4}
+        response = self.client.get("/api/async/todo/summary/?include_archived=true")
+        assert response.json() == {"total_tasks": 5, "completed_tasks": 4}
+
+    @override_settings(TODO_COUNT_STRATEGY="estimate")
+    def test_summary_archived_counter(self):
+        """アーカイブ済みの件数は一覧の件数取得方式によらずカウンターから正確に数えることを確認"""
+        archive_tasks(timezone.now() - timedelta(days=30))
+        assert ArchivedTaskCounter.objects.total() == 3
+
+        self.client.delete(f"/api/todo/{self.completed[0].pk}/")
+        assert ArchivedTaskCounter.objects.total() == ArchivedTask.objects.count() == 2
+        for path in ("/api/todo/summary/", "/api/async/todo/summary/"):
+            response = self.client.get(f"{path}?include_archived=true")
+            assert response.json() == {"total_tasks": 4, "completed_tasks": 3}, path
@@ -0,0 +1,88 @@
+import pytest
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    """非同期ビューが同期版と同じレスポンスを返すことを確認するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        self.tasks = [
+            Task.objects.create(title=f"Task {i}", status=i % 3, priority=i % 2)
+            for i in range(5)
+        ]
+
+    def test_list(self):
+        """一覧の絞り込み・ページングの結果が同期版と一致することを確認"""
+        for query in ("", "?page=2", "?status=0,2&ordering=-priority"):
+            expected = self.client.get(f"/api/todo/{query}").json()
+            response = self.client.get(f"/api/async/todo/{query}")
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            assert data["results"] == expected["results"]
+            assert data["count"] == expected["count"]
+            assert data["links"] == {
+                key: link and link.replace("/api/todo/", "/api/async/todo/")
+                for key, link in expected["links"].items()
+            }
+
+    @override_settings(TODO_COUNT_STRATEGY="cached")
+    def test_list_cached_count(self):
+        """非同期の件数取得がキャッシュされた件数を使用できることを確認"""
+        response = self.client.get("/api/async/todo/")
+        assert response.json()["count"] == 5
+
+    def test_list_errors(self):
+        """不正なパラメータとページ番号がDRFと同じ形式のエラーになることを確認"""
+        response = self.client.get("/api/async/todo/?status=9")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "status" in response.json()
+        response = self.client.get("/api/async/todo/?page=10")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert "detail" in response.json()
+
+    def test_unsupported_params(self):
+        """同期版だけが対応しているパラメータは無視せずに400で拒否することを確認"""
+        for query, param in (
+            ("?fields=title", "fields"),
+            ("?omit=description", "omit"),
+            ("?pagination=keyset", "pagination"),
+            ("?cursor=abc", "cursor"),
+        ):
+            response = self.client.get(f"/api/async/todo/{query}")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, query
+            assert param in response.json()
+        response = self.client.get(f"/api/async/todo/{self.tasks[0].pk}/?fields=title")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_detail(self):
+        """詳細と条件付きリクエストが同期版と一致することを確認"""
+        url = f"/todo/{self.tasks[0].pk}/"
+        expected = self.client.get("/api" + url)
+        response = self.client.get("/api/async" + url)
+        assert response.json() == expected.json()
+        assert response["ETag"] == expected["ETag"]
+
+        response = self.client.get(
+            "/api/async" + url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = self.client.get("/api/async/todo/0/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_summary(self):
+        """サマリーと内訳が同期版と一致することを確認"""
+        for query in ("", "?breakdown=true"):
+            expected = self.client.get(f"/api/todo/summary/{query}").json()
+            response = self.client.get(f"/api/async/todo/summary/{query}")
+            assert response.json() == expected
+
+    def test_read_only(self):
+        """非同期ビューは書き込みを受け付けないことを確認"""
+        response = self.client.post("/api/async/todo/", {"title": "New"})
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task, TaskStatusCounter
+
+
+@pytest.mark.django_db
+class TestBulkView:
+    """一括登録・更新・削除APIに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.url = "/api/todo/bulk/"
+        Task.objects.all().delete()
+
+    def test_bulk_create(self):
+        """複数のタスクを一括登録できることを確認"""
+        data = [{"title": f"Task {i}", "status": i % 3} for i in range(10)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url + "?batch_size=4", data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [task["title"] for task in response.data] == [d["title"] for d in data]
+        assert all(task["id"] for task in response.data)
+        assert Task.objects.count() == 10
+        # 10件を4件ずつ3回のINSERTで登録する
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 3
+        assert TaskStatusCounter.objects.totals() == {0: 4, 1: 3, 2: 3}
+
+    def test_bulk_create_errors(self):
+        """不正な要素があれば何も登録せずに要素ごとのエラーを返すことを確認"""
+        data = [{"title": "OK"}, {"title": ""}, {"title": "NG", "status": 9}]
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = response.data["errors"]
+        assert errors[0] == {}
+        assert "title" in errors[1]
+        assert "status" in errors[2]
+        assert Task.objects.count() == 0
+
+    def test_bulk_update(self):
+        """idを指定して複数のタスクを一括更新できることを確認"""
+        tasks = Task.objects.bulk_create([Task(title=f"Task {i}") for i in range(3)])
+        before = {task.pk: task.updated_at for task in Task.objects.all()}
+        data = [{"id": task.pk, "status": 2} for task in tasks]
+        response = self.client.patch(self.url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert [task["status"] for task in response.data] == [2, 2, 2]
+        for task in Task.objects.all():
+            assert task.status == 2
+            assert task.title.startswith("Task")
+            assert task.updated_at > before[task.pk]
+
+    def test_bulk_put_requires_all_fields(self):
+        """PUTでは必須項目が必要なことを確認"""
+        task = Task.objects.create(title="Task")
+        data = [{"id": task.pk, "status": 1}, {"id": task.pk + 1000, "title": "x"}]
+        response = self.client.put(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "title" in response.data["errors"][0]
+        assert "id" in response.data["errors"][1]
+
+    def test_bulk_update_duplicate_id(self):
+        """同じidを複数回指定するとエラーになることを確認"""
+        task = Task.objects.create(title="Task")
+        data = [{"id": task.pk, "status": 1}, {"id": task.pk, "status": 2}]
+        response = self.client.patch(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["errors"][0] == {}
+        assert "id" in response.data["errors"][1]
+
+    def test_bulk_delete(self):
+        """複数のタスクを一括削除し、存在しないidを報告することを確認"""
+        tasks = Task.objects.bulk_create([Task(title=f"Task {i}") for i in range(5)])
+        ids = [task.pk for task in tasks[:3]] + [0]
+        response = self.client.delete(self.url, {"ids": ids}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["deleted"] == sorted(ids[:3])
+        assert response.data["not_found"] == [0]
+        assert Task.objects.count() == 2
+
+    def test_bulk_delete_invalid(self):
+        """idsが配列でない場合はエラーになることを確認"""
+        response = self.client.delete(self.url, {"ids": "1"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
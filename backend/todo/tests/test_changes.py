@@ -0,0 +1,144 @@
+import base64
+import json
+from datetime import timedelta
+from io import StringIO
+
+import psycopg2
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.archive import archive_tasks
+from todo.changes import current_token
+from todo.models import ArchivedTask, Task, TaskDeletion
+
+
+# 変更フィードはトランザクション単位で位置を進めるため、テストごとのトランザクションを使用しない
+@pytest.mark.django_db(transaction=True)
+class TestChanges:
+    """変更フィードAPIに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        ArchivedTask.objects.all().delete()
+        TaskDeletion.objects.all().delete()
+        self.task = Task.objects.create(title="既存")
+
+    def get_changes(self, token):
+        response = self.client.get("/api/todo/changes/", {"since": token})
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_changes(self):
+        """トークン以降の登録・更新と削除の通知だけを返すことを確認"""
+        response = self.client.get("/api/todo/changes/")
+        assert response.data["tasks"] == []
+        token = response.data["next"]
+
+        created = self.client.post("/api/todo/", {"title": "追加"}, format="json")
+        self.client.patch(f"/api/todo/{self.task.pk}/", {"status": 1}, format="json")
+        data = self.get_changes(token)
+        assert [task["id"] for task in data["tasks"]] == [
+            created.data["id"],
+            self.task.pk,
+        ]
+        assert data["tasks"][1]["status"] == 1
+        assert data["deleted"] == []
+        assert data["has_more"] is False
+
+        self.client.delete(f"/api/todo/{self.task.pk}/")
+        data = self.get_changes(data["next"])
+        assert data["tasks"] == []
+        assert [row["id"] for row in data["deleted"]] == [self.task.pk]
+
+        data = self.get_changes(data["next"])
+        assert (data["tasks"], data["deleted"]) == ([], [])
+
+    @override_settings(TODO_CHANGES_LIMIT=2)
+    def test_has_more(self):
+        """件数の上限を超える変更は has_more で続けて取得できることを確認"""
+        token = current_token()
+        created = [Task.objects.create(title=f"追加 {i}") for i in range(5)]
+        Task.objects.filter(pk__in=[task.pk for task in created[:3]]).delete()
+
+        tasks, deleted = [], []
+        for _ in range(5):
+            data = self.get_changes(token)
+            tasks += [task["id"] for task in data["tasks"]]
+            deleted += [row["id"] for row in data["deleted"]]
+            token = data["next"]
+            if not data["has_more"]:
+                break
+        assert tasks == [task.pk for task in created[3:]]
+        assert deleted == [task.pk for task in created[:3]]
+
+    def test_late_commit(self):
+        """トークンの発行後にコミットされた変更は、更新日時が古くても返すことを確認"""
+        stamped = timezone.now() - timedelta(hours=1)
+        other = psycopg2.connect(**connection.get_connection_params())
+        try:
+            # 取り込みと同じく、コミットより前の日時を更新日時とする
+            with other.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO todo_task"
+                    " (title, status, priority, created_at, updated_at)"
+                    " VALUES (%s, 0, 0, %s, %s) RETURNING id",
+                    ["取り込み", stamped, stamped],
+                )
+                pk = cursor.fetchone()[0]
+            data = self.get_changes(current_token())
+            assert data["tasks"] == []
+            other.commit()
+        finally:
+            other.close()
+        data = self.get_changes(data["next"])
+        assert [task["id"] for task in data["tasks"]] == [pk]
+
+    def test_archive_is_deletion(self):
+        """アーカイブへの移動は削除として通知することを確認"""
+        token = current_token()
+        Task.objects.filter(pk=self.task.pk).update(
+            status=2, updated_at=timezone.now() - timedelta(days=60)
+        )
+        archive_tasks(timezone.now() - timedelta(days=30))
+        data = self.get_changes(token)
+        assert [row["id"] for row in data["deleted"]] == [self.task.pk]
+
+    def test_invalid_token(self):
+        """不正なトークンは400、保持期間より前のトークンは410になることを確認"""
+        response = self.client.get("/api/todo/changes/?since=invalid")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        token = current_token(timezone.now() - timedelta(days=8))
+        response = self.client.get("/api/todo/changes/", {"since": token})
+        assert response.status_code == status.HTTP_410_GONE
+
+        # 変更日時を位置としていた以前の形式のトークン
+        legacy = base64.urlsafe_b64encode(
+            json.dumps(
+                {
+                    "u": [timezone.now().isoformat(), 0],
+                    "d": [timezone.now().isoformat(), 0],
+                }
+            ).encode("ascii")
+        ).decode("ascii")
+        response = self.client.get("/api/todo/changes/", {"since": legacy})
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_prune_command(self):
+        """prune_task_deletions コマンドで保持期間を過ぎた削除の記録だけを削除することを確認"""
+        pk = self.task.pk
+        self.task.delete()
+        TaskDeletion.objects.create(
+            task_id=0, deleted_at=timezone.now() - timedelta(days=8)
+        )
+        out = StringIO()
+        call_command("prune_task_deletions", stdout=out)
+        assert "1件" in out.getvalue()
+        assert list(
+            TaskDeletion.objects.using("default").values_list("task_id", flat=True)
+        ) == [pk]
@@ -0,0 +1,115 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    """ETag/Last-Modifiedによる条件付きリクエストに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        self.tasks = [Task.objects.create(title=f"Task {i}") for i in range(3)]
+
+    def test_list_not_modified(self):
+        """一覧が変更されていなければ304を返し、タスクを取得しないことを確認"""
+        response = self.client.get("/api/todo/")
+        etag = response["ETag"]
+        assert etag.startswith("W/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/todo/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert all('"title"' not in q["sql"] for q in queries.captured_queries)
+
+        # クエリパラメータが異なれば別のETagになる
+        response = self.client.get("/api/todo/?page_size=2", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_modified(self):
+        """登録・更新・削除の後は200を返すことを確認"""
+        etag = self.client.get("/api/todo/")["ETag"]
+
+        Task.objects.create(title="New Task")
+        response = self.client.get("/api/todo/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response["ETag"]
+
+        self.tasks[0].delete()
+        response = self.client.get("/api/todo/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response["ETag"]
+
+        self.tasks[1].title = "Updated"
+        self.tasks[1].save()
+        response = self.client.get("/api/todo/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_detail_not_modified(self):
+        """タスクが変更されていなければ304を返すことを確認"""
+        url = f"/api/todo/{self.tasks[0].pk}/"
+        response = self.client.get(url)
+        assert "Last-Modified" in response
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=self.client.get(url)["Last-Modified"]
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_update_if_match(self):
+        """If-Matchが現在のETagと一致する場合だけ更新できることを確認"""
+        url = f"/api/todo/{self.tasks[0].pk}/"
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.patch(
+            url, {"status": 1}, format="json", HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+        # 古いETagによる更新は412で拒否される
+        response = self.client.patch(
+            url, {"status": 2}, format="json", HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        self.tasks[0].refresh_from_db()
+        assert self.tasks[0].status == 1
+
+    def test_update_if_match_out_of_range(self):
+        """If-Match の更新日時が日時の範囲を超える場合は412になることを確認"""
+        url = f"/api/todo/{self.tasks[0].pk}/"
+        response = self.client.patch(
+            url,
+            {"status": 1},
+            format="json",
+            HTTP_IF_MATCH=f'"{self.tasks[0].pk}-999999999999999999"',
+        )
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        self.tasks[0].refresh_from_db()
+        assert self.tasks[0].status == 0
+
+    def test_delete_if_match(self):
+        """古いETagによる削除は412で拒否されることを確認"""
+        url = f"/api/todo/{self.tasks[0].pk}/"
+        response = self.client.delete(url, HTTP_IF_MATCH='"0-0"')
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        assert Task.objects.filter(pk=self.tasks[0].pk).exists()
+
+    def test_summary_not_modified(self):
+        """件数が変わっていなければサマリーは304を返すことを確認"""
+        etag = self.client.get("/api/todo/summary/")["ETag"]
+        response = self.client.get("/api/todo/summary/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        Task.objects.create(title="New Task")
+        response = self.client.get("/api/todo/summary/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
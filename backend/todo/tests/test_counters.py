@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from todo.models import Task, TaskStatusCounter
+
+
+@pytest.mark.django_db
+class TestTaskStatusCounter:
+    """状況ごとのタスク件数カウンターに対するテストクラス"""
+
+    def setup_method(self):
+        Task.objects.all().delete()
+
+    def assert_consistent(self):
+        counters = {k: v for k, v in TaskStatusCounter.objects.totals().items() if v}
+        assert counters == TaskStatusCounter.objects.actual_totals()
+
+    def test_counters_follow_writes(self):
+        """登録・更新・削除のたびにカウンターが実件数と一致することを確認"""
+        task = Task.objects.create(title="Task 1")
+        self.assert_consistent()
+
+        Task.objects.bulk_create(
+            [Task(title=f"Task {i}", status=i % 3) for i in range(10)]
+        )
+        self.assert_consistent()
+
+        task.status = 2
+        task.save()
+        self.assert_consistent()
+
+        Task.objects.filter(status=0).update(status=1)
+        self.assert_consistent()
+
+        # 状況を変更しない更新
+        Task.objects.filter(status=1).update(priority=2)
+        self.assert_consistent()
+
+        Task.objects.filter(status=2).delete()
+        self.assert_consistent()
+
+        task = Task.objects.first()
+        task.delete()
+        self.assert_consistent()
+
+    def test_rebuild_command(self):
+        """コマンドでカウンターの不一致を検出し、再構築できることを確認"""
+        Task.objects.bulk_create([Task(title=f"Task {i}", status=2) for i in range(3)])
+        TaskStatusCounter.objects.filter(status=2).update(count=100)
+
+        with pytest.raises(CommandError):
+            call_command("rebuild_task_counters", "--check")
+
+        call_command("rebuild_task_counters")
+        self.assert_consistent()
+        call_command("rebuild_task_counters", "--check")
+
+    def test_summary_reads_counters(self):
+        """サマリーがタスクテーブルを集計せずにカウンターから取得することを確認"""
+        Task.objects.bulk_create(
+            [Task(title=f"Task {i}", status=i % 3) for i in range(6)]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get("/api/todo/summary/")
+        assert response.data == {"total_tasks": 6, "completed_tasks": 2}
+        assert len(queries) == 1
+        assert 'todo_task"' not in queries[0]["sql"]
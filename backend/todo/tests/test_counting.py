@@ -0,0 +1,80 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from todo.counting import CachedCount, EstimatedCount, ExactCount
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestCountStrategies:
+    """一覧の総件数の取得方式に対するテストクラス"""
+
+    def setup_method(self):
+        cache.clear()
+        self.client = APIClient()
+        Task.objects.all().delete()
+        Task.objects.bulk_create(
+            [Task(title=f"Task {i}", status=i % 3) for i in range(10)]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE todo_task")
+
+    def test_exact_count(self):
+        """既定では正確な件数を返すことを確認"""
+        response = self.client.get("/api/todo/")
+        assert response.data["count"] == 10
+        assert response.data["count_is_exact"] is True
+
+    def test_estimate_below_threshold(self):
+        """閾値未満の場合は正確な件数を返すことを確認"""
+        count, is_exact = EstimatedCount(threshold=1000).count(Task.objects.all())
+        assert (count, is_exact) == (10, True)
+
+    def test_estimate_above_threshold(self):
+        """閾値以上の場合は統計情報の推定値を返すことを確認"""
+        Task.objects.bulk_create([Task(title="Extra") for _ in range(5)])
+        count, is_exact = EstimatedCount(threshold=1).count(Task.objects.all())
+        # ANALYZE後に追加した5件は推定値に含まれない
+        assert (count, is_exact) == (10, False)
+
+        count, is_exact = EstimatedCount(threshold=1).count(
+            Task.objects.filter(status=2)
+        )
+        assert is_exact is False
+        assert count >= 1
+
+    @override_settings(TODO_COUNT_STRATEGY="estimate", TODO_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_estimated_response(self):
+        """推定件数を超えるページも取得でき、次ページの有無が正しいことを確認"""
+        Task.objects.bulk_create([Task(title="Extra") for _ in range(5)])
+        response = self.client.get("/api/todo/?page=2")
+        assert response.data["count_is_exact"] is False
+        assert response.data["count"] == 10
+
+        response = self.client.get("/api/todo/?page=5")
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 3
+        assert response.data["links"]["next"] is None
+
+        response = self.client.get("/api/todo/?page=6")
+        assert response.status_code == 404
+
+    def test_cached_count(self):
+        """キャッシュした件数がタスクの変更で無効化されることを確認"""
+        strategy = CachedCount()
+        assert strategy.count(Task.objects.all()) == (10, True)
+        with CaptureQueriesContext(connection) as queries:
+            assert strategy.count(Task.objects.all()) == (10, True)
+        assert len(queries) == 0
+
+        Task.objects.create(title="New Task")
+        assert strategy.count(Task.objects.all()) == (11, True)
+        Task.objects.first().delete()
+        assert strategy.count(Task.objects.all()) == (10, True)
+
+    def test_exact_strategy(self):
+        """絞り込みのあるクエリで正確な件数を返すことを確認"""
+        assert ExactCount().count(Task.objects.filter(status=0)) == (4, True)
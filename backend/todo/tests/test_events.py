@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.events import PostgresNotifier, TaskEventBroker, broker, stream_events
+from todo.models import Task
+
+
+def parse_event(chunk):
+    """Server-Sent Events の1イベントから data の値を取得"""
+    for line in chunk.decode().splitlines():
+        if line.startswith("data: "):
+            return json.loads(line[len("data: ") :])
+    return None
+
+
+@pytest.mark.django_db
+class TestEvents:
+    """タスクの変更イベントの配信に対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+
+    @override_settings(TODO_EVENTS_NOTIFIER="local")
+    def test_stream(self):
+        """プロセス内の通知を全ての購読者にイベントとして配信することを確認"""
+
+        async def scenario():
+            client = AsyncClient()
+            responses = [await client.get("/api/todo/events/") for _ in range(2)]
+            streams = [aiter(response.streaming_content) for response in responses]
+            assert responses[0]["Content-Type"].startswith("text/event-stream")
+            for stream in streams:
+                assert (await anext(stream)).startswith(b"retry: ")
+            assert len(broker.subscribers) == 2
+
+            broker.notifier.notify('{"op": "update", "ids": [1, 2]}')
+            for stream in streams:
+                event = parse_event(await anext(stream))
+                assert event == {"op": "update", "ids": [1, 2]}
+
+        async_to_sync(scenario)()
+        # 切断されたストリームは購読を終了し、購読者がいなくなると通知の受信を停止する
+        assert broker.subscribers == set()
+        assert broker.notifier is None
+
+    @override_settings(TODO_EVENTS_NOTIFIER="local", TODO_EVENTS_QUEUE_SIZE=2)
+    def test_slow_subscriber(self):
+        """キューが一杯になった購読者には再同期のイベントを送ることを確認"""
+
+        async def scenario():
+            local_broker = TaskEventBroker()
+            stream = stream_events(local_broker)
+            await anext(stream)
+            for pk in range(3):
+                local_broker.notifier.notify(json.dumps({"op": "insert", "ids": [pk]}))
+            event = parse_event((await anext(stream)).encode())
+            await stream.aclose()
+            assert local_broker.subscribers == set()
+            return event
+
+        assert async_to_sync(scenario)() == {"op": "resync", "ids": None}
+
+    def test_requires_asgi(self):
+        """WSGIでは501を返すことを確認"""
+        response = self.client.get("/api/todo/events/")
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
+
+    @pytest.mark.django_db(transaction=True)
+    def test_postgres_notifier(self):
+        """タスクの変更をコミット後に LISTEN の接続で受け取ることを確認"""
+        events = []
+
+        async def scenario():
+            received = asyncio.Event()
+
+            def callback(event):
+                events.append(event)
+                received.set()
+
+            notifier = PostgresNotifier(callback)
+            notifier.start()
+            await asyncio.wait_for(notifier.listening.wait(), 5)
+            task = await sync_to_async(Task.objects.create)(title="通知")
+            await asyncio.wait_for(received.wait(), 5)
+            notifier.stop()
+            return task
+
+        task = async_to_sync(scenario)()
+        assert events == [{"op": "insert", "ids": [task.pk]}]
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+import pytest
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestTaskExport:
+    """タスクのエクスポートに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        for i in range(7):
+            Task.objects.create(
+                title=f"Task {i}",
+                description="改行を含む\n詳細, カンマ" if i == 0 else None,
+                status=i % 3,
+            )
+        self.expected = self.client.get("/api/todo/?page_size=100").json()["results"]
+
+    def export(self, query):
+        response = self.client.get(f"/api/todo/export/?{query}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        return response, b"".join(response.streaming_content).decode()
+
+    @override_settings(TODO_EXPORT_CHUNK_SIZE=3)
+    def test_ndjson(self):
+        """NDJSONで一覧と同じ内容を全件出力することを確認"""
+        response, content = self.export("format=ndjson")
+        assert response["Content-Type"].startswith("application/x-ndjson")
+        assert 'filename="tasks.ndjson"' in response["Content-Disposition"]
+        rows = [json.loads(line) for line in content.splitlines()]
+        assert rows == self.expected
+
+    @override_settings(TODO_EXPORT_CHUNK_SIZE=3)
+    def test_csv(self):
+        """CSVで項目名の行と全件を出力することを確認"""
+        response, content = self.export("format=csv")
+        assert response["Content-Type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert list(rows[0]) == list(self.expected[0])
+        assert [row["id"] for row in rows] == [str(t["id"]) for t in self.expected]
+        assert rows[0]["description"] == self.expected[0]["description"]
+        assert rows[1]["description"] == ""
+
+    def test_filters(self):
+        """一覧と同じ絞り込み・並び替えができることを確認"""
+        _, content = self.export("status=1&ordering=-id")
+        ids = [json.loads(line)["id"] for line in content.splitlines()]
+        expected = [task["id"] for task in self.expected if task["status"] == 1]
+        assert ids == sorted(expected, reverse=True)
+
+    @pytest.mark.parametrize("query", ["format=xml", "status=9"])
+    def test_invalid_params(self, query):
+        """不正なパラメータは400になることを確認"""
+        response = self.client.get(f"/api/todo/export/?{query}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
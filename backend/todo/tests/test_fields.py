@@ -0,0 +1,84 @@
+from datetime import datetime
+from urllib.parse import urlparse
+
+import pytest
+import pytz
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    """出力項目の絞り込みに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        tz = pytz.timezone("Asia/Tokyo")
+        self.tasks = [
+            Task.objects.create(
+                title=f"Task {i}",
+                description="長い説明" * 100,
+                due_date=tz.localize(datetime(2024, 7, 1 + i)),
+            )
+            for i in range(5)
+        ]
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        selects = [q["sql"] for q in queries.captured_queries if "SELECT" in q["sql"]]
+        return response, selects
+
+    def test_list_fields(self):
+        """fieldsで指定した項目だけを取得・出力することを確認"""
+        response, selects = self.get("/api/todo/?fields=id,title,status")
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data["results"][0]) == ["id", "title", "status"]
+        assert all('"description"' not in sql for sql in selects)
+
+    def test_list_omit(self):
+        """omitで指定した項目を取得・出力しないことを確認"""
+        response, selects = self.get("/api/todo/?omit=description")
+        assert response.status_code == status.HTTP_200_OK
+        assert "description" not in response.data["results"][0]
+        assert "due_date" in response.data["results"][0]
+        assert all('"description"' not in sql for sql in selects)
+
+    def test_keyset_with_fields(self):
+        """キーセット方式でもキーに使う項目を出力せずにページングできることを確認"""
+        response, _ = self.get("/api/todo/?pagination=keyset&fields=title")
+        assert response.data["results"] == [
+            {"title": "Task 0"},
+            {"title": "Task 1"},
+            {"title": "Task 2"},
+        ]
+        parsed = urlparse(response.data["links"]["next"])
+        response, _ = self.get(f"{parsed.path}?{parsed.query}")
+        assert response.data["results"] == [{"title": "Task 3"}, {"title": "Task 4"}]
+
+    def test_detail_fields(self):
+        """詳細取得でも項目を絞り込めることを確認"""
+        task = self.tasks[0]
+        response, selects = self.get(f"/api/todo/{task.pk}/?fields=title,priority")
+        assert response.data == {"title": "Task 0", "priority": 0}
+        assert all('"description"' not in sql for sql in selects)
+
+    def test_unknown_field(self):
+        """存在しない項目を指定すると400になることを確認"""
+        response, _ = self.get("/api/todo/?fields=title,password")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "fields" in response.data
+
+    def test_update_ignores_fields(self):
+        """更新時は項目の絞り込みを適用せず全項目を出力することを確認"""
+        task = self.tasks[0]
+        response = self.client.patch(
+            f"/api/todo/{task.pk}/?fields=title", {"status": 1}, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == 1
+        assert "description" in response.data
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+import pytest
+import pytz
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestTaskFilters:
+    """一覧の絞り込み・検索・並び替えに対するテストクラス"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.tz = pytz.timezone("Asia/Tokyo")
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        now = timezone.now()
+        self.shopping = Task.objects.create(
+            title="買い物リスト",
+            description="牛乳 卵",
+            priority=2,
+            due_date=now - timedelta(days=1),
+        )
+        self.report = Task.objects.create(
+            title="Weekly report",
+            description="Write the summary",
+            status=1,
+            priority=1,
+            due_date=now + timedelta(days=3),
+        )
+        self.done = Task.objects.create(
+            title="Old report",
+            status=2,
+            priority=2,
+            due_date=now - timedelta(days=2),
+        )
+        self.undated = Task.objects.create(title="Someday", priority=0)
+
+    def get_ids(self, query):
+        response = self.client.get(f"/api/todo/?page_size=10&{query}")
+        assert response.status_code == status.HTTP_200_OK, response.data
+        return [task["id"] for task in response.data["results"]]
+
+    def test_status_and_priority(self):
+        """状況・優先度をカンマ区切りで絞り込めることを確認"""
+        assert self.get_ids("status=0,1&priority=2") == [self.shopping.id]
+        assert self.get_ids("priority=1,2&status=2") == [self.done.id]
+
+    def test_due_range(self):
+        """期限の範囲と有無で絞り込めることを確認"""
+        today = timezone.localdate()
+        ids = self.get_ids(f"due_after={today}")
+        assert ids == [self.report.id]
+        ids = self.get_ids(f"due_before={today}")
+        assert ids == [self.done.id, self.shopping.id]
+        assert self.get_ids("has_due=false") == [self.undated.id]
+
+    def test_overdue(self):
+        """未完了の期限切れタスクを絞り込めることを確認"""
+        assert self.get_ids("overdue=true") == [self.shopping.id]
+        assert self.get_ids("overdue=false") == [
+            self.done.id,
+            self.report.id,
+            self.undated.id,
+        ]
+
+    def test_overdue_has_no_etag(self):
+        """現在時刻によって結果が変わる絞り込みにはETagを付けないことを確認"""
+        response = self.client.get("/api/todo/?overdue=true")
+        assert "ETag" not in response
+        response = self.client.get("/api/todo/?status=0")
+        assert "ETag" in response
+
+    def test_search(self):
+        """タスク名・詳細を部分一致で検索できることを確認"""
+        assert self.get_ids("search=買い物") == [self.shopping.id]
+        assert self.get_ids("search=牛乳") == [self.shopping.id]
+        assert self.get_ids("search=REPORT") == [self.done.id, self.report.id]
+        assert self.get_ids("search=report summ") == [self.report.id]
+        assert self.get_ids("search=' | !&") == []
+        assert self.get_ids("search=%") == []
+
+    def test_search_inside_japanese_text(self):
+        """区切りのない日本語の文の途中にある語でも検索できることを確認"""
+        task = Task.objects.create(
+            title="明日買い物に行く", description="駅前のスーパー"
+        )
+        assert self.get_ids("search=買い物") == [self.shopping.id, task.id]
+        assert self.get_ids("search=物に行") == [task.id]
+        assert self.get_ids("search=スーパー 買い物") == [task.id]
+
+    def test_ordering(self):
+        """インデックスのある項目で並び替えられることを確認"""
+        ids = self.get_ids("ordering=-priority,due_date")
+        assert ids == [self.done.id, self.shopping.id, self.report.id, self.undated.id]
+
+    def test_combined_with_keyset(self):
+        """キーセット方式のページングでも絞り込めることを確認"""
+        response = self.client.get("/api/todo/?pagination=keyset&status=0")
+        ids = [task["id"] for task in response.data["results"]]
+        assert ids == [self.shopping.id, self.undated.id]
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "status=3",
+            "priority=high",
+            "due_after=tomorrow",
+            "overdue=maybe",
+            "ordering=title",
+            "ordering=-priority&pagination=keyset",
+        ],
+    )
+    def test_invalid_params(self, query):
+        """不正なパラメータは400になることを確認"""
+        response = self.client.get(f"/api/todo/?{query}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,107 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task, TaskStatusCounter
+
+
+@pytest.mark.django_db
+class TestTaskImport:
+    """COPYによるタスクの一括登録に対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+
+    @override_settings(TODO_IMPORT_BATCH_SIZE=2)
+    def test_upload_csv(self):
+        """CSVファイルを取り込み、不正な行を行番号付きで報告することを確認"""
+        content = (
+            "title,description,status,priority,due_date\n"
+            'Task 1,"タブ\tと改行\nを含む",1,2,2024-07-01T09:00:00+09:00\n'
+            "Task 2,,,,\n"
+            ",no title,0,0,\n"
+            "Task 4,,3,0,\n"
+            "Task 5,,0,0,2024-07-02T10:00:00\n"
+        )
+        upload = io.BytesIO(content.encode())
+        upload.name = "tasks.csv"
+        response = self.client.post(
+            "/api/todo/import/", {"file": upload}, format="multipart"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["imported"] == 3
+        assert response.data["rejected"] == 2
+        assert [error["line"] for error in response.data["errors"]] == [5, 6]
+        assert "title" in response.data["errors"][0]["errors"]
+        assert "status" in response.data["errors"][1]["errors"]
+
+        tasks = {task.title: task for task in Task.objects.all()}
+        assert tasks["Task 1"].description == "タブ\tと改行\nを含む"
+        assert (tasks["Task 1"].status, tasks["Task 1"].priority) == (1, 2)
+        assert tasks["Task 2"].description is None
+        assert tasks["Task 2"].created_at is not None
+        assert tasks["Task 5"].due_date.isoformat() == "2024-07-02T01:00:00+00:00"
+        assert TaskStatusCounter.objects.totals() == {0: 2, 1: 1}
+
+    def test_body_ndjson(self):
+        """NDJSONのリクエスト本文を取り込めることを確認"""
+        lines = [
+            json.dumps({"title": "Task 1", "priority": 1}),
+            "",
+            "{broken",
+            json.dumps({"title": "x" * 256}),
+            json.dumps({"title": "Task 2", "status": True}),
+            json.dumps(["not", "object"]),
+        ]
+        response = self.client.generic(
+            "POST",
+            "/api/todo/import/",
+            "\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["imported"] == 1
+        assert [error["line"] for error in response.data["errors"]] == [3, 4, 5, 6]
+        assert Task.objects.get().priority == 1
+
+    def test_all_rejected(self):
+        """空の場合は200、1件も登録できない場合は400になり何も登録しないことを確認"""
+        response = self.client.generic(
+            "POST", "/api/todo/import/", "title\n\n", content_type="text/csv"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        response = self.client.generic(
+            "POST",
+            "/api/todo/import/",
+            '{"status": 1}\n',
+            content_type="application/x-ndjson",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Task.objects.exists()
+
+    def test_invalid_format(self):
+        """対応していない形式は400になることを確認"""
+        response = self.client.generic(
+            "POST", "/api/todo/import/", "<xml/>", content_type="application/xml"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_command(self, tmp_path):
+        """管理コマンドでエクスポートしたファイルを取り込めることを確認"""
+        Task.objects.create(title="Exported", priority=2)
+        exported = self.client.get("/api/todo/export/?format=ndjson")
+        path = tmp_path / "tasks.ndjson"
+        path.write_bytes(b"".join(exported.streaming_content))
+
+        stdout = io.StringIO()
+        call_command("import_tasks", str(path), stdout=stdout)
+        assert "1件を登録しました" in stdout.getvalue()
+        assert list(Task.objects.values_list("title", "priority")) == [
+            ("Exported", 2),
+            ("Exported", 2),
+        ]
@@ -0,0 +1,149 @@
+from datetime import datetime
+
+import pytest
+import pytz
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestTaskIndexes:
+    """各ビューのクエリがインデックスを使用することを確認するテストクラス"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.tz = pytz.timezone("Asia/Tokyo")
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        self.tasks = [
+            Task.objects.create(
+                title=f"Task {i}",
+                status=i % 3,
+                priority=i % 3,
+                due_date=self.tz.localize(datetime(2024, 7, 1 + i)) if i % 4 else None,
+            )
+            for i in range(20)
+        ]
+        # 他のテストで更新された統計情報に実行計画が左右されないようにする
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE todo_task")
+
+    def explain_view_queries(self, url):
+        """
+        ビューが発行したSELECT文の実行計画を取得
+        件数が少ないとシーケンシャルスキャンが選ばれるため、無効化して計画を確認する
+
+        Args:
+            url (str): リクエストするURL
+
+        Returns:
+            list: SELECT文ごとの実行計画
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        assert response.status_code == 200
+
+        plans = []
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for query in queries.captured_queries:
+                if not query["sql"].startswith("SELECT"):
+                    continue
+                cursor.execute("EXPLAIN " + query["sql"])
+                plans.append("\n".join(row[0] for row in cursor.fetchall()))
+        assert plans
+        return plans
+
+    def assert_index_scans(self, plans):
+        # 数行しかないカウンターテーブルの走査は対象外とする
+        plans = [plan for plan in plans if "todo_taskstatuscounter" not in plan]
+        for plan in plans:
+            assert "Seq Scan" not in plan, plan
+            assert "Index" in plan, plan
+
+    def test_list_uses_index(self):
+        """一覧取得が (due_date, id) のインデックスを使用することを確認"""
+        plans = self.explain_view_queries("/api/todo/?page=2")
+        self.assert_index_scans(plans)
+        assert any("todo_task_due_date_id_idx" in plan for plan in plans)
+
+    def test_keyset_list_uses_index(self):
+        """キーセット方式の一覧取得がインデックスを使用することを確認"""
+        response = self.client.get("/api/todo/?pagination=keyset&page_size=5")
+        plans = self.explain_view_queries(response.data["links"]["next"])
+        self.assert_index_scans(plans)
+
+    def test_detail_uses_index(self):
+        """詳細取得が主キーのインデックスを使用することを確認"""
+        plans = self.explain_view_queries(f"/api/todo/{self.tasks[0].pk}/")
+        self.assert_index_scans(plans)
+
+    def test_summary_skips_task_table(self):
+        """サマリー取得がタスクテーブルを走査しないことを確認"""
+        plans = self.explain_view_queries("/api/todo/summary/")
+        for plan in plans:
+            assert "on todo_task " not in plan, plan
+
+    def test_completed_count_uses_index(self):
+        """完了タスクの件数取得がインデックスを使用することを確認"""
+        queryset = Task.objects.filter(status=2)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            sql, params = queryset.values("id").query.sql_with_params()
+            cursor.execute(f"EXPLAIN SELECT COUNT(*) FROM ({sql}) AS t", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        self.assert_index_scans([plan])
+
+    def test_filtered_list_uses_index(self):
+        """状況・優先度での絞り込みが複合インデックスを使用することを確認"""
+        queryset = Task.objects.filter(status=0, priority=2).order_by("due_date")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        assert "todo_task_status_prio_due_idx" in plan, plan
+
+    def test_incomplete_list_uses_partial_index(self):
+        """未完了タスクの期限順取得が部分インデックスを使用することを確認"""
+        # 完了タスクが大半を占める状態では部分インデックスの方が小さくなる
+        Task.objects.bulk_create(
+            [
+                Task(
+                    title="Done",
+                    status=2,
+                    due_date=self.tz.localize(datetime(2024, 6, 1)),
+                )
+                for _ in range(500)
+            ]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE todo_task")
+        queryset = Task.objects.exclude(status=2).order_by("due_date", "id")[:3]
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        assert "todo_task_incomplete_due_idx" in plan, plan
+
+    def test_search_uses_trigram_index(self):
+        """部分一致検索の件数取得がトライグラムのGINインデックスを使用することを確認"""
+        # 1ページ分の取得は一致する行が多いと期限順のインデックスを走査して LIMIT で打ち切るため、
+        # 一致する行を全て読む件数取得の実行計画で確認する
+        plans = self.explain_view_queries("/api/todo/?search=Task")
+        search_plans = [plan for plan in plans if "~~" in plan]
+        assert any(
+            "todo_task_title_trgm_idx" in plan
+            and "todo_task_description_trgm_idx" in plan
+            for plan in search_plans
+        ), search_plans
+
+    def test_priority_ordering_uses_index(self):
+        """優先度順の一覧取得がインデックスを使用することを確認"""
+        plans = self.explain_view_queries("/api/todo/?ordering=-priority,due_date")
+        assert any("todo_task_priority_due_idx" in plan for plan in plans)
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import psycopg2
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.jobs import (
+    JOB_HANDLERS,
+    Worker,
+    claim_jobs,
+    enqueue,
+    heartbeat,
+    requeue_stale_jobs,
+    run_job,
+)
+from todo.models import Job, Task, TaskStatusCounter
+
+
+@pytest.mark.django_db
+class TestJobs:
+    """バックグラウンドのジョブに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        Job.objects.all().delete()
+
+    def test_enqueue_api(self):
+        """ジョブを登録して状況を取得し、待機中のジョブを取り消せることを確認"""
+        response = self.client.post(
+            "/api/todo/jobs/",
+            {"kind": "archive_tasks", "params": {"days": 60}},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == Job.QUEUED
+        url = f"/api/todo/jobs/{response.data['id']}/"
+        assert response["Location"] == f"http://testserver{url}"
+
+        response = self.client.get(url)
+        assert response.data["params"] == {"days": 60}
+        response = self.client.get("/api/todo/jobs/?status=queued")
+        assert response.data["count"] == 1
+
+        response = self.client.delete(url)
+        assert response.data["status"] == Job.CANCELED
+        response = self.client.delete(url)
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    @override_settings(TODO_COUNT_STRATEGY="cached")
+    def test_list_count(self):
+        """タスクの件数取得方式に関係なく、登録したジョブを一覧の件数に含めることを確認"""
+        cache.clear()
+        assert self.client.get("/api/todo/jobs/?status=queued").data["count"] == 0
+        job = enqueue("rebuild_task_counters")
+        response = self.client.get("/api/todo/jobs/?status=queued")
+        assert response.data["count"] == 1
+        assert [row["id"] for row in response.data["results"]] == [job.pk]
+
+    def test_invalid_job(self):
+        """対応していない種類、処理の引数と一致しない params は400になることを確認"""
+        for data in (
+            {"kind": "unknown"},
+            {"kind": "archive_tasks", "params": {"month": 1}},
+            {"kind": "archive_tasks", "params": [1]},
+        ):
+            response = self.client.post("/api/todo/jobs/", data, format="json")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, data
+        assert not Job.objects.exists()
+
+    def test_run_job(self):
+        """取得したジョブを実行し、結果を保存することを確認"""
+        Task.objects.create(title="Task", status=1)
+        job = enqueue("rebuild_task_counters")
+        [claimed] = claim_jobs("worker", 10)
+        assert claimed.pk == job.pk
+        assert claim_jobs("worker", 10) == []
+
+        assert run_job(claimed) == Job.SUCCEEDED
+        job.refresh_from_db()
+        assert (job.status, job.attempts, job.locked_by) == (
+            Job.SUCCEEDED,
+            1,
+            "worker",
+        )
+        assert job.result["totals"]["1"] == 1
+        assert TaskStatusCounter.objects.totals()[1] == 1
+
+    @override_settings(TODO_JOBS_MAX_ATTEMPTS=2, TODO_JOBS_RETRY_SECONDS=0)
+    def test_retry(self):
+        """失敗したジョブを最大実行回数まで再実行し、その後は失敗にすることを確認"""
+
+        def fail():
+            raise RuntimeError("失敗")
+
+        JOB_HANDLERS["test_fail"] = fail
+        try:
+            job = enqueue("test_fail")
+            for expected in (Job.QUEUED, Job.FAILED):
+                [claimed] = claim_jobs("worker", 1)
+                assert run_job(claimed) == expected
+        finally:
+            del JOB_HANDLERS["test_fail"]
+        job.refresh_from_db()
+        assert job.attempts == 2
+        assert "RuntimeError: 失敗" in job.error
+
+    @override_settings(TODO_JOBS_TIMEOUT_SECONDS=60)
+    def test_requeue_stale(self):
+        """応答が途絶えたジョブだけを戻し、元の取得による結果は反映しないことを確認"""
+        job = enqueue("rebuild_task_counters")
+        start = timezone.now()
+        [first] = claim_jobs("worker-1", 1, now=start)
+
+        # 開始から時間が経っても、応答を更新している間は戻さない
+        later = start + timedelta(seconds=3600)
+        assert heartbeat([first], now=later - timedelta(seconds=30)) == 1
+        assert requeue_stale_jobs(now=later) == 0
+
+        assert requeue_stale_jobs(now=later + timedelta(seconds=60)) == 1
+        [second] = claim_jobs("worker-2", 1, now=later + timedelta(seconds=60))
+        assert second.attempts == first.attempts + 1
+
+        # 停止したとみなされたワーカーが後から終了しても、取得し直したジョブを更新しない
+        assert heartbeat([first]) == 0
+        run_job(first)
+        job.refresh_from_db()
+        assert (job.status, job.locked_by) == (Job.RUNNING, "worker-2")
+        assert run_job(second) == Job.SUCCEEDED
+        job.refresh_from_db()
+        assert job.status == Job.SUCCEEDED
+
+    @pytest.mark.django_db(transaction=True)
+    def test_worker(self):
+        """ワーカーが他の接続でロックされたジョブを飛ばし、残りのジョブを実行することを確認"""
+        jobs = [enqueue("prune_task_deletions") for _ in range(4)]
+        other = psycopg2.connect(**connection.get_connection_params())
+        try:
+            with other.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id FROM todo_job WHERE id = %s FOR UPDATE", [jobs[0].pk]
+                )
+                assert Worker(concurrency=2, poll_seconds=0.1).run(once=True) == 3
+        finally:
+            other.close()
+        statuses = dict(Job.objects.using("default").values_list("pk", "status"))
+        assert statuses[jobs[0].pk] == Job.QUEUED
+        assert [statuses[job.pk] for job in jobs[1:]] == [Job.SUCCEEDED] * 3
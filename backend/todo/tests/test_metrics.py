@@ -0,0 +1,85 @@
+import re
+
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+from todo.metrics import METRICS, Histogram
+from todo.models import Task
+
+
+def parse_server_timing(header):
+    entries = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+    """リクエストの計測に対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        for metric in METRICS:
+            metric.clear()
+        self.tasks = [Task.objects.create(title=f"Task {i}") for i in range(3)]
+
+    def test_server_timing(self):
+        """SQLの実行回数・時間と処理段階ごとの時間を Server-Timing で返すことを確認"""
+        response = self.client.get("/api/todo/")
+        assert response.status_code == 200
+        timing = parse_server_timing(response["Server-Timing"])
+        assert set(timing) == {"db", "serialize", "render", "total"}
+        queries = int(timing["db"]["desc"].strip('"').split()[0])
+        assert queries > 0
+        assert float(timing["total"]["dur"]) >= float(timing["db"]["dur"])
+
+    def test_metrics_endpoint(self):
+        """URLの名前ごとのヒストグラムを /metrics で公開することを確認"""
+        self.client.get("/api/todo/")
+        self.client.get("/api/todo/")
+        self.client.get(f"/api/todo/{self.tasks[0].pk}/")
+        self.client.get("/api/async/todo/summary/")
+        self.client.get("/api/todo/unknown/")
+
+        response = self.client.get("/metrics")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.content.decode()
+        assert re.search(
+            r'^todo_request_duration_seconds_count\{route="task-list",method="GET"\} 2$',
+            body,
+            re.M,
+        )
+        assert 'route="task-detail"' in body
+        assert 'route="task-summary-async"' in body
+        assert 'route="metrics"' not in body
+        assert "unknown" not in body
+
+    @override_settings(TODO_METRICS=False)
+    def test_disabled(self):
+        """計測を無効にすると Server-Timing を付けず、記録もしないことを確認"""
+        response = self.client.get("/api/todo/")
+        assert "Server-Timing" not in response
+        assert "task-list" not in self.client.get("/metrics").content.decode()
+
+
+class TestHistogram:
+    """ヒストグラムに対するテストクラス"""
+
+    def test_collect(self):
+        """区切りごとの累積件数・合計・件数を出力することを確認"""
+        histogram = Histogram("test_seconds", "テスト", (0.1, 1), labelnames=("route",))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(("a",), value)
+        assert histogram.collect() == [
+            "# HELP test_seconds テスト",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{route="a",le="0.1"} 2',
+            'test_seconds_bucket{route="a",le="1.0"} 3',
+            'test_seconds_bucket{route="a",le="+Inf"} 4',
+            'test_seconds_sum{route="a"} 2.65',
+            'test_seconds_count{route="a"} 4',
+        ]
@@ -0,0 +1,134 @@
+from datetime import datetime
+from urllib.parse import urlparse
+
+import pytest
+import pytz
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from todo.models import Task
+from todo.views import ListView
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """キーセット方式のページネーションに対するテストクラス"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.tz = pytz.timezone("Asia/Tokyo")
+
+    def setup_method(self):
+        self.factory = APIRequestFactory()
+        self.view = ListView.as_view()
+        self.url = "/api/todo/"
+        Task.objects.all().delete()
+        # 期限の重複と期限なしのタスクを含める
+        due_dates = [1, 3, 3, None, 2, None, 3, 1, None, 5]
+        for i, day in enumerate(due_dates):
+            Task.objects.create(
+                title=f"Task {i}",
+                due_date=self.tz.localize(datetime(2024, 7, day)) if day else None,
+            )
+        self.expected_ids = [
+            task.id
+            for task in sorted(
+                Task.objects.all(),
+                key=lambda t: (t.due_date is None, t.due_date or 0, t.id),
+            )
+        ]
+
+    def get(self, url):
+        parsed = urlparse(url)
+        path = parsed.path + ("?" + parsed.query if parsed.query else "")
+        response = self.view(self.factory.get(path))
+        assert response.status_code == status.HTTP_200_OK
+        return response
+
+    def test_first_page(self):
+        """先頭ページが期限順に取得でき、件数を含まないことを確認"""
+        response = self.get(self.url + "?pagination=keyset")
+        ids = [task["id"] for task in response.data["results"]]
+        assert ids == self.expected_ids[:3]
+        assert response.data["page_size"] == 3
+        assert "count" not in response.data
+        assert response.data["links"]["previous"] is None
+        assert "cursor=" in response.data["links"]["next"]
+
+    def test_walk_forward_and_backward(self):
+        """nextとpreviousのリンクを辿って全件を重複なく取得できることを確認"""
+        response = self.get(self.url + "?pagination=keyset")
+        pages = [[task["id"] for task in response.data["results"]]]
+        while response.data["links"]["next"]:
+            response = self.get(response.data["links"]["next"])
+            pages.append([task["id"] for task in response.data["results"]])
+        assert sum(pages, []) == self.expected_ids
+
+        backward = [pages[-1]]
+        while response.data["links"]["previous"]:
+            response = self.get(response.data["links"]["previous"])
+            backward.insert(0, [task["id"] for task in response.data["results"]])
+        assert backward == pages
+
+    def test_page_size(self):
+        """page_sizeを指定できることを確認"""
+        response = self.get(self.url + "?pagination=keyset&page_size=4")
+        next_response = self.get(response.data["links"]["next"])
+        ids = [task["id"] for task in next_response.data["results"]]
+        assert ids == self.expected_ids[4:8]
+
+    def test_no_count_query(self):
+        """キーセット方式ではCOUNTとOFFSETが発行されないことを確認"""
+        response = self.get(self.url + "?pagination=keyset&page_size=2")
+        with CaptureQueriesContext(connection) as queries:
+            self.get(response.data["links"]["next"])
+        for query in queries.captured_queries:
+            assert "COUNT(" not in query["sql"].upper()
+            assert "OFFSET" not in query["sql"].upper()
+
+    def test_invalid_cursor(self):
+        """不正なカーソルは404になることを確認"""
+        response = self.view(self.factory.get(self.url + "?cursor=invalid"))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestPageSize:
+    """ページサイズの上限と前後のページのヒントに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        Task.objects.bulk_create(Task(title=f"Task {i}") for i in range(10))
+        self.expected_ids = list(
+            Task.objects.order_by("due_date", "id").values_list("id", flat=True)
+        )
+
+    @override_settings(TODO_MAX_PAGE_SIZE=4)
+    def test_max_page_size(self):
+        """上限を超えるページサイズは上限に切り詰めることを確認"""
+        for url in (
+            "/api/todo/?page_size=1000000",
+            "/api/todo/?pagination=keyset&page_size=1000000",
+            "/api/async/todo/?page_size=1000000",
+        ):
+            response = self.client.get(url)
+            data = response.json()
+            assert data["page_size"] == 4, url
+            assert [task["id"] for task in data["results"]] == self.expected_ids[:4]
+
+    def test_link_header(self):
+        """前後のページのURLを Link ヘッダーで返すことを確認"""
+        response = self.client.get("/api/todo/?page=2")
+        assert response["Link"] == (
+            '<http://testserver/api/todo/?page=3>; rel="next", '
+            '<http://testserver/api/todo/>; rel="prev"'
+        )
+        response = self.client.get("/api/async/todo/?page=2")
+        assert response["Link"].startswith(
+            '<http://testserver/api/async/todo/?page=3>; rel="next"'
+        )
+        response = self.client.get("/api/todo/?page_size=10")
+        assert not response.has_header("Link")
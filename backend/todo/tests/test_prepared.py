@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection, connections
+from django.test import override_settings
+from rest_framework.test import APIClient
+from todo.models import Task
+from todo.prepared import PreparedStatements, prepared_statements
+
+
+def prepared_statement_names():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM pg_prepared_statements")
+        return {row[0] for row in cursor.fetchall()}
+
+
+@pytest.mark.django_db
+class TestPreparedStatements:
+    """プリペアドステートメントに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        self.tasks = [Task.objects.create(title=f"Task {i}") for i in range(5)]
+
+    @pytest.mark.parametrize(
+        "url", ["/api/todo/?page=2", "/api/todo/{pk}/", "/api/todo/summary/"]
+    )
+    def test_same_response(self, url):
+        """プリペアドステートメントを使用しても同じレスポンスになることを確認"""
+        url = url.format(pk=self.tasks[0].pk)
+        expected = self.client.get(url).json()
+        with override_settings(TODO_PREPARED_STATEMENTS=True):
+            first = self.client.get(url).json()
+            second = self.client.get(url).json()
+        assert first == second == expected
+        assert any(name.startswith("todo_") for name in prepared_statement_names())
+
+    @override_settings(TODO_PREPARED_STATEMENTS=True)
+    def test_reuse_statement(self):
+        """同じSQLは同じステートメントを再利用し、パラメータだけを変えて実行することを確認"""
+        with prepared_statements():
+            Task.objects.get(pk=self.tasks[0].pk)
+            before = prepared_statement_names()
+            task = Task.objects.get(pk=self.tasks[1].pk)
+        assert task == self.tasks[1]
+        assert prepared_statement_names() == before
+
+    @override_settings(TODO_PREPARED_STATEMENTS=True)
+    def test_all_read_aliases(self):
+        """プライマリと読み取りレプリカのどちらで実行するSELECT文にも適用することを確認"""
+        with prepared_statements():
+            for alias in ("default", "replica"):
+                wrappers = connections[alias].execute_wrappers
+                assert any(isinstance(w, PreparedStatements) for w in wrappers), alias
+        wrappers = connections["replica"].execute_wrappers
+        assert not any(isinstance(w, PreparedStatements) for w in wrappers)
+
+    def test_deallocate_oldest(self):
+        """上限を超えたステートメントを古い順に解放することを確認"""
+        with connection.execute_wrapper(PreparedStatements(max_statements=2)):
+            for i in range(4):
+                list(Task.objects.filter(pk=self.tasks[0].pk).values("id")[i:])
+        names = [
+            name for name in prepared_statement_names() if name.startswith("todo_")
+        ]
+        assert len(names) == 2
+
+    @override_settings(TODO_PREPARED_STATEMENTS=True)
+    def test_server_side_cursor(self):
+        """サーバーサイドカーソル (エクスポートの分割取得) も取得できることを確認"""
+        with prepared_statements():
+            tasks = list(Task.objects.order_by("id").iterator(chunk_size=2))
+        assert tasks == self.tasks
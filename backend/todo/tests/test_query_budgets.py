@@ -0,0 +1,24 @@
+import pytest
+from benchmarks.budgets import QUERY_BUDGETS, request_endpoint
+from rest_framework.test import APIClient
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    """エンドポイントごとのSQL実行回数の上限に対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        Task.objects.bulk_create(
+            [Task(title=f"report {i}", status=i % 3, priority=i % 3) for i in range(20)]
+        )
+        self.pk = Task.objects.order_by("id").values_list("id", flat=True)[0]
+
+    @pytest.mark.parametrize("name", QUERY_BUDGETS)
+    def test_query_budget(self, name):
+        """SQLの実行回数が上限を超えないことを確認"""
+        response, queries = request_endpoint(self.client, name, self.pk)
+        assert response.status_code < 300
+        assert queries <= QUERY_BUDGETS[name][3]
@@ -0,0 +1,144 @@
+import gzip
+from datetime import date, datetime, time, timedelta, timezone
+
+import brotli
+import pytest
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from todo.compression import negotiate_encoding
+from todo.models import Task
+from todo.renderers import ORJSONRenderer
+
+
+@pytest.mark.django_db
+class TestRenderer:
+    """orjson によるJSONへの変換に対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        for i in range(3):
+            Task.objects.create(title=f"タスク {i}\u2028", description="説明", status=i)
+
+    def test_same_as_json_renderer(self):
+        """一覧・内訳・エラーのレスポンスが JSONRenderer と同じ出力になることを確認"""
+        for path in (
+            "/api/todo/?page_size=100",
+            "/api/todo/summary/?breakdown=true",
+            "/api/todo/?page=999",
+        ):
+            response = self.client.get(path)
+            assert response.content == JSONRenderer().render(response.data), path
+        assert b"\\u2028" in self.client.get("/api/todo/").content
+
+    def test_datetime(self):
+        """シリアライザーを通さない日時も JSONRenderer と同じ形式で出力することを確認"""
+        data = {
+            "utc": datetime(2026, 10, 18, 9, 30, 15, 123456, tzinfo=timezone.utc),
+            "jst": datetime(
+                2026, 10, 18, 18, 30, 15, 999999, tzinfo=timezone(timedelta(hours=9))
+            ),
+            "offset": datetime(
+                2026, 10, 18, 9, 30, tzinfo=timezone(timedelta(seconds=30))
+            ),
+            "naive": datetime(2026, 10, 18, 9, 30),
+            "date": date(2026, 10, 18),
+            "time": time(9, 30, 15, 500000),
+        }
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent(self):
+        """インデントを指定した場合は JSONRenderer で変換することを確認"""
+        data = {"title": "タスク"}
+        content = ORJSONRenderer().render(data, "application/json; indent=2")
+        assert content == b'{\n  "title": "\xe3\x82\xbf\xe3\x82\xb9\xe3\x82\xaf"\n}'
+
+
+@pytest.mark.django_db
+class TestCompression:
+    """レスポンスの圧縮に対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        Task.objects.all().delete()
+        Task.objects.bulk_create(
+            Task(title=f"Task {i}", description="x" * 100) for i in range(50)
+        )
+
+    def test_negotiate_encoding(self):
+        """Accept-Encoding の q 値に応じて符号化方式を選択することを確認"""
+        assert negotiate_encoding("gzip, deflate, br") == "br"
+        assert negotiate_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+        assert negotiate_encoding("br;q=0, *") == "gzip"
+        assert negotiate_encoding("identity") is None
+        assert negotiate_encoding("") is None
+
+    def test_compress(self):
+        """しきい値以上のレスポンスを受け入れる方式で圧縮することを確認"""
+        plain = self.client.get("/api/todo/?page_size=50")
+        assert not plain.has_header("Content-Encoding")
+        assert plain["Vary"].endswith("Accept-Encoding")
+
+        response = self.client.get("/api/todo/?page_size=50", HTTP_ACCEPT_ENCODING="br")
+        assert response["Content-Encoding"] == "br"
+        assert int(response["Content-Length"]) == len(response.content)
+        assert brotli.decompress(response.content) == plain.content
+
+        response = self.client.get(
+            "/api/todo/?page_size=50", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        assert response["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.content) == plain.content
+
+    def test_etag(self):
+        """圧縮したレスポンスは符号化方式ごとに異なる ETag になり、条件付きリクエストに使用できることを確認"""
+        task = Task.objects.create(title="圧縮", description="x" * 2000)
+        url = f"/api/todo/{task.pk}/"
+        etag = self.client.get(url)["ETag"]
+        br = self.client.get(url, HTTP_ACCEPT_ENCODING="br")["ETag"]
+        gz = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+        assert br == etag[:-1] + '-br"'
+        assert gz == etag[:-1] + '-gzip"'
+
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=br
+        )
+        assert response.status_code == 304
+        assert response["ETag"] == br
+
+        response = self.client.patch(
+            url, {"status": 1}, format="json", HTTP_IF_MATCH=gz
+        )
+        assert response.status_code == 200
+        response = self.client.patch(
+            url, {"status": 2}, format="json", HTTP_IF_MATCH=gz
+        )
+        assert response.status_code == 412
+
+    @override_settings(TODO_COMPRESS_MIN_SIZE=10**6)
+    def test_min_size(self):
+        """しきい値未満のレスポンスは圧縮しないことを確認"""
+        response = self.client.get("/api/todo/?page_size=50", HTTP_ACCEPT_ENCODING="br")
+        assert not response.has_header("Content-Encoding")
+
+    def test_html_not_compressed(self):
+        """CSRF トークンを含むブラウザブルAPIのHTMLは圧縮しないことを確認"""
+        response = self.client.get(
+            "/api/todo/?page_size=50",
+            HTTP_ACCEPT="text/html",
+            HTTP_ACCEPT_ENCODING="br, gzip",
+        )
+        assert response["Content-Type"].startswith("text/html")
+        assert not response.has_header("Content-Encoding")
+
+    def test_streaming(self):
+        """ストリーミングのレスポンスをチャンクごとに圧縮することを確認"""
+        plain = self.client.get("/api/todo/export/?format=csv")
+        response = self.client.get(
+            "/api/todo/export/?format=csv", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        assert response["Content-Encoding"] == "gzip"
+        assert not response.has_header("Content-Length")
+        content = b"".join(response.streaming_content)
+        assert gzip.decompress(content) == b"".join(plain.streaming_content)
@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.cache import get_response_cache_stats
+from todo.models import Task
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    """一覧・サマリーのレスポンスキャッシュに対するテストクラス"""
+
+    def setup_method(self):
+        self.settings = override_settings(TODO_RESPONSE_CACHE_TIMEOUT=60)
+        self.settings.enable()
+        cache.clear()
+        self.client = APIClient()
+        Task.objects.all().delete()
+        self.task = Task.objects.create(title="Task 1")
+
+    def teardown_method(self):
+        self.settings.disable()
+
+    def test_hit_without_queries(self):
+        """2回目以降はデータベースにアクセスせずに同じレスポンスを返すことを確認"""
+        first = self.client.get("/api/todo/")
+        assert first["X-Cache"] == "MISS"
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get("/api/todo/")
+        assert second["X-Cache"] == "HIT"
+        assert len(queries) == 0
+        assert second.content == first.content
+        assert second["ETag"] == first["ETag"]
+        assert get_response_cache_stats() == {"hits": 1, "misses": 1}
+
+    def test_async_views(self):
+        """非同期ビューの一覧・サマリーも同期版と同じくキャッシュすることを確認"""
+        for url in ("/api/async/todo/", "/api/async/todo/summary/"):
+            first = self.client.get(url)
+            assert first["X-Cache"] == "MISS", url
+            with CaptureQueriesContext(connection) as queries:
+                second = self.client.get(url)
+            assert second["X-Cache"] == "HIT", url
+            assert len(queries) == 0
+            assert second.content == first.content
+            assert second["ETag"] == first["ETag"]
+
+        self.client.post("/api/todo/", {"title": "Task 2"}, format="json")
+        response = self.client.get("/api/async/todo/")
+        assert response["X-Cache"] == "MISS"
+        assert response.json()["count"] == 2
+
+    def test_hit_not_modified(self):
+        """キャッシュにヒットした場合も If-None-Match に304を返すことを確認"""
+        etag = self.client.get("/api/todo/summary/")["ETag"]
+        response = self.client.get("/api/todo/summary/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["X-Cache"] == "HIT"
+
+    def test_invalidated_by_writes(self):
+        """登録・更新・削除・一括操作でキャッシュが無効化されることを確認"""
+        self.client.get("/api/todo/")
+        self.client.post("/api/todo/", {"title": "Task 2"}, format="json")
+        response = self.client.get("/api/todo/")
+        assert response["X-Cache"] == "MISS"
+        assert response.data["count"] == 2
+
+        self.client.patch(f"/api/todo/{self.task.pk}/", {"status": 2}, format="json")
+        response = self.client.get("/api/todo/summary/")
+        assert response.data["completed_tasks"] == 1
+
+        self.client.post("/api/todo/bulk/", [{"title": "Task 3"}], format="json")
+        response = self.client.get("/api/todo/summary/")
+        assert response["X-Cache"] == "MISS"
+        assert response.data["total_tasks"] == 3
+
+    def test_separate_keys(self):
+        """クエリパラメータごとに別々にキャッシュすることを確認"""
+        self.client.get("/api/todo/")
+        response = self.client.get("/api/todo/?fields=title")
+        assert response["X-Cache"] == "MISS"
+        assert list(response.json()["results"][0]) == ["title"]
+
+    @override_settings(TODO_RESPONSE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        """有効期間が0の場合はキャッシュしないことを確認"""
+        self.client.get("/api/todo/")
+        response = self.client.get("/api/todo/")
+        assert "X-Cache" not in response
@@ -0,0 +1,93 @@
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from todo.models import Task
+from todo.routers import pin_primary
+
+
+@pytest.fixture(scope="module", autouse=True)
+def replica_database(django_db_blocker):
+    """
+    レプリカの代わりのデータベースを作成してマイグレーションを適用する
+    レプリカには複製されないため、プライマリへの書き込みはレプリカから読み取れない
+    """
+    name = settings.DATABASES[settings.TODO_READ_REPLICA]["NAME"]
+    with django_db_blocker.unblock():
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", [name])
+            if cursor.fetchone() is None:
+                cursor.execute(f'CREATE DATABASE "{name}"')
+        call_command("migrate", database=settings.TODO_READ_REPLICA, verbosity=0)
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+class TestReplicaRouter:
+    """読み取りレプリカへの振り分けに対するテストクラス"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        # 他のテストでキャッシュしたレスポンス・件数を使用しない
+        cache.clear()
+        self.task = Task.objects.create(title="プライマリ")
+
+    def test_routing(self):
+        """書き込みはプライマリ、読み取りはレプリカで実行することを確認"""
+        assert Task.objects.using("default").filter(pk=self.task.pk).exists()
+        assert not Task.objects.filter(pk=self.task.pk).exists()
+        assert self.client.get("/api/todo/").data["count"] == 0
+        response = self.client.get(f"/api/todo/{self.task.pk}/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_primary_in_transaction(self):
+        """トランザクション内と pin_primary() の読み取りはプライマリで実行することを確認"""
+        with transaction.atomic():
+            assert Task.objects.filter(pk=self.task.pk).exists()
+        with pin_primary():
+            assert Task.objects.filter(pk=self.task.pk).exists()
+
+    def test_read_your_writes(self):
+        """書き込んだクライアントは直後の読み取りもプライマリで実行することを確認"""
+        response = self.client.patch(
+            f"/api/todo/{self.task.pk}/", {"status": 1}, format="json"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert settings.TODO_REPLICA_PIN_COOKIE in response.cookies
+
+        response = self.client.get(f"/api/todo/{self.task.pk}/")
+        assert response.data["status"] == 1
+        assert self.client.get("/api/todo/").data["count"] == 1
+
+        # Cookie を送らないクライアントは同じアドレスでも固定しない
+        response = APIClient().get(f"/api/todo/{self.task.pk}/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @override_settings(TODO_RESPONSE_CACHE_TIMEOUT=60)
+    def test_response_cache_skips_replica(self):
+        """レプリカから読み取った古いレスポンスを後の読み取りに返さないことを確認"""
+        self.client.post("/api/todo/", {"title": "追加"}, format="json")
+
+        # レプリカの読み取り (遅延で書き込みが見えない) はキャッシュしない
+        response = APIClient().get("/api/todo/")
+        assert response.data["count"] == 0
+        assert response["X-Cache"] == "MISS"
+
+        # 固定されたクライアントはプライマリから読み取り、その結果をキャッシュする
+        response = self.client.get("/api/todo/")
+        assert response.data["count"] == 2
+        assert response["X-Cache"] == "MISS"
+
+        response = APIClient().get("/api/todo/")
+        assert response["X-Cache"] == "HIT"
+        assert response.json()["count"] == 2
+
+    @override_settings(TODO_COUNT_STRATEGY="cached")
+    def test_cached_count_skips_replica(self):
+        """レプリカで数えた古い件数を後の読み取りに返さないことを確認"""
+        self.client.post("/api/todo/", {"title": "追加"}, format="json")
+        assert APIClient().get("/api/todo/").data["count"] == 0
+        assert self.client.get("/api/todo/").data["count"] == 2
@@ -1,10 +1,13 @@
 from datetime import datetime
+from datetime import timezone as dt_timezone
 
 import pytest
 import pytz
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
 
 from todo.models import Task
-from todo.serializers import TaskSerializer
+from todo.serializers import TaskReadSerializer, TaskSerializer
 
 
 @pytest.mark.django_db
@@ -47,3 +50,44 @@ class TestTaskSerializer:
         serializer = TaskSerializer(data=invalid_data)
         assert not serializer.is_valid()
         assert "title" in serializer.errors
+
+
+@pytest.mark.django_db
+class TestTaskReadSerializer:
+    """読み取り専用の高速版シリアライザに対するテストクラス"""
+
+    def setup_method(self):
+        Task.objects.all().delete()
+        tz = pytz.timezone("Asia/Tokyo")
+        Task.objects.create(
+            title="マイクロ秒あり",
+            description="詳細",
+            status=1,
+            priority=2,
+            due_date=tz.localize(datetime(2024, 7, 1, 12, 30, 15, 123456)),
+        )
+        Task.objects.create(title="期限なし", description=None, due_date=None)
+        Task.objects.create(
+            title='"記号" \\ <>',
+            description="改行\nあり",
+            due_date=datetime(2024, 12, 31, 15, 0, 0, tzinfo=dt_timezone.utc),
+        )
+
+    def render_both(self):
+        queryset = Task.objects.order_by("id")
+        reader = TaskReadSerializer()
+        fast = reader.to_representation(list(reader.select(queryset)))
+        slow = TaskSerializer(queryset, many=True).data
+        return JSONRenderer().render(fast), JSONRenderer().render(slow)
+
+    def test_identical_json(self):
+        """TaskSerializerと同じJSONを出力することを確認"""
+        fast, slow = self.render_both()
+        assert fast == slow
+
+    def test_identical_json_utc(self):
+        """タイムゾーンがUTCの場合もTaskSerializerと同じJSONを出力することを確認"""
+        with timezone.override("UTC"):
+            fast, slow = self.render_both()
+        assert fast == slow
+        assert b"Z" in fast
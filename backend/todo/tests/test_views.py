@@ -1,12 +1,15 @@
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import django
 import pytest
 import pytz
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient, APIRequestFactory
-from todo.models import Task
+from todo.models import Task, TaskStatusCounter
 from todo.views import DetailView, ListView, task_summary
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.backend.settings")
@@ -243,6 +246,52 @@ class TestAPIDetailViewTests:
         # レスポンスデータが期待されるデータと一致することを確認
         assert response.data == expected_data
 
+    def test_todo_patch_status(self):
+        """状況だけの部分更新を UPDATE ... RETURNING の1文で行えることの確認"""
+        data = {"status": 2}
+        request = self.factory.patch(self.url, data, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.view(request, pk=self.task.pk)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) == 1
+        assert queries[0]["sql"].startswith("UPDATE")
+
+        self.task.refresh_from_db()
+        assert self.task.status == 2
+        assert response.data["status"] == 2
+        assert response.data["title"] == "Task 1"
+        assert response.data["updated_at"] == (
+            self.task.updated_at.astimezone(self.tz).isoformat()
+        )
+        totals = TaskStatusCounter.objects.totals()
+        assert {key: count for key, count in totals.items() if count} == {2: 1}
+
+        # 値は通常の更新と同じく検証される
+        request = self.factory.patch(self.url, {"status": 9}, format="json")
+        response = self.view(request, pk=self.task.pk)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_todo_patch_status_conflict(self):
+        """状況だけの部分更新で If-Match が古い場合は412、タスクがない場合は404になることの確認"""
+        etag = self.view(self.factory.get(self.url), pk=self.task.pk)["ETag"]
+        request = self.factory.patch(
+            self.url, {"priority": 2}, format="json", HTTP_IF_MATCH=etag
+        )
+        response = self.view(request, pk=self.task.pk)
+        assert response.status_code == status.HTTP_200_OK
+
+        request = self.factory.patch(
+            self.url, {"priority": 1}, format="json", HTTP_IF_MATCH=etag
+        )
+        response = self.view(request, pk=self.task.pk)
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        self.task.refresh_from_db()
+        assert self.task.priority == 2
+
+        request = self.factory.patch(self.url, {"priority": 1}, format="json")
+        response = self.view(request, pk=self.task.pk + 1)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     def test_todo_delete(self):
         """対象データを削除できることの確認"""
         request = self.factory.delete(self.url)
@@ -291,3 +340,36 @@ class TestAPI_Task_SummaryTests:
         # レスポンスデータを確認
         expected_data = {"total_tasks": 2, "completed_tasks": 1}
         assert response.data == expected_data
+
+    def test_task_summary_breakdown(self):
+        """内訳付きのサマリーを1回のクエリで取得できることを確認"""
+        now = timezone.now()
+        Task.objects.create(
+            title="期限切れ", status=0, priority=2, due_date=now - timedelta(days=1)
+        )
+        Task.objects.create(
+            title="期限間近", status=1, priority=1, due_date=now + timedelta(hours=3)
+        )
+        Task.objects.create(
+            title="完了", status=2, priority=2, due_date=now - timedelta(days=1)
+        )
+        Task.objects.create(title="期限なし", status=0, priority=0, due_date=None)
+
+        client = APIClient()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/todo/summary/?breakdown=true")
+        assert response.status_code == 200
+        assert len(queries) == 1
+
+        assert response.data["total_tasks"] == 4
+        assert response.data["completed_tasks"] == 1
+        assert response.data["status_counts"] == {0: 2, 1: 1, 2: 1}
+        assert response.data["priority_counts"] == {0: 1, 1: 1, 2: 2}
+        assert response.data["status_priority_counts"] == {
+            0: {0: 1, 1: 0, 2: 1},
+            1: {0: 0, 1: 1, 2: 0},
+            2: {0: 0, 1: 0, 2: 1},
+        }
+        # 完了タスクは期限切れに含めない
+        assert response.data["overdue_tasks"] == 1
+        assert response.data["due_soon_tasks"] == 1
@@ -1,9 +1,20 @@
 from django.urls import path
 
-from . import views
+from . import async_views, changes, events, export, jobs, views
 
 urlpatterns = [
     path("todo/", views.ListView.as_view(), name="task-list"),
     path("todo/<int:pk>/", views.DetailView.as_view(), name="task-detail"),
     path("todo/summary/", views.task_summary, name="task-summary"),
+    path("todo/bulk/", views.BulkView.as_view(), name="task-bulk"),
+    path("todo/export/", export.task_export, name="task-export"),
+    path("todo/import/", views.ImportView.as_view(), name="task-import"),
+    path("todo/changes/", changes.task_changes, name="task-changes"),
+    path("todo/events/", events.task_events, name="task-events"),
+    path("todo/jobs/", jobs.JobListView.as_view(), name="job-list"),
+    path("todo/jobs/<int:pk>/", jobs.JobDetailView.as_view(), name="job-detail"),
+    # 読み取り専用の非同期版 (ASGIサーバーで提供する)
+    path("async/todo/", async_views.task_list, name="task-list-async"),
+    path("async/todo/<int:pk>/", async_views.task_detail, name="task-detail-async"),
+    path("async/todo/summary/", async_views.task_summary, name="task-summary-async"),
 ]
@@ -1,76 +1,631 @@
-from rest_framework import generics
+import csv
+import io
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.http import Http404
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from rest_framework import generics, status
 from rest_framework.decorators import api_view
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from todo.models import Task
-from todo.serializers import TaskSerializer
+from todo.cache import cache_by_data_version, invalidate_task_data
+from todo.conditional import (
+    collection_etag,
+    evaluate_preconditions,
+    get_data_state,
+    parse_if_match,
+    set_validators,
+    summary_etag,
+    task_etag,
+)
+from todo.filters import (
+    TaskFilterBackend,
+    TaskOrderingFilter,
+    includes_archived,
+    is_time_dependent,
+    task_queryset,
+)
+from todo.importer import IMPORT_FORMATS, TaskImporter, open_text
+from todo.models import ArchivedTask, Task, TaskWithArchived
+from todo.pagination import CustomPagination, KeysetPagination
+from todo.prepared import use_prepared_statements
+from todo.serializers import TaskReadSerializer, TaskSerializer
+from todo.summary import status_summary, task_breakdown
 
 
-class CustomPagination(PageNumberPagination):
+class SparseFieldsMixin:
     """
-    CustomPaginationクラス
-    ページネーションをカスタマイズし、1ページあたりのタスク数を3に設定
+    GETリクエストで取得・出力するタスクの項目を絞り込むMixin
+    ?fields=id,title のように出力する項目、または ?omit=description のように除く項目を指定する
+    指定した項目だけをデータベースから取得し、シリアライズする
     """
 
-    page_size = 3
-    page_size_query_param = "page_size"
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+    # 出力しなくてもデータベースから取得する項目
+    sparse_required_fields = ()
 
-    def get_paginated_response(self, data):
+    def get_sparse_fields(self):
         """
-        ページネーションのレスポンスをカスタマイズ
-
-        Args:
-            data (list): シリアライズされたタスクデータのリスト
+        リクエストで指定された出力項目を取得
 
         Returns:
-            Response: ページネーションされたレスポンスデータ
+            list: 出力する項目、絞り込みがない場合はNone
+
+        Raises:
+            ValidationError: 存在しない項目が指定された場合
         """
-        return Response(
-            {
-                "links": {
-                    "next": self.get_next_link(),
-                    "previous": self.get_previous_link(),
-                },
-                "count": self.page.paginator.count,
-                "page_size": self.page_size,
-                "results": data,
-            }
-        )
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
 
+        self._sparse_fields = None
+        params = self.request.query_params
+        if self.request.method not in ("GET", "HEAD") or not (
+            params.get(self.fields_query_param) or params.get(self.omit_query_param)
+        ):
+            return None
 
-class ListView(generics.ListCreateAPIView):
+        available, _ = TaskReadSerializer.get_field_names()
+        selected = list(available)
+        for param in (self.fields_query_param, self.omit_query_param):
+            value = params.get(param)
+            if not value:
+                continue
+            names = [name.strip() for name in value.split(",") if name.strip()]
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError(
+                    {param: [f"不明な項目です: {', '.join(unknown)}"]}
+                )
+            if param == self.fields_query_param:
+                selected = [name for name in selected if name in names]
+            else:
+                selected = [name for name in selected if name not in names]
+        if not selected:
+            raise ValidationError(
+                {self.fields_query_param: ["出力する項目がありません"]}
+            )
+
+        if selected != available:
+            self._sparse_fields = selected
+        return self._sparse_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            queryset = queryset.only(*fields, *self.sparse_required_fields)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
+
+
+class ListView(SparseFieldsMixin, generics.ListCreateAPIView):
     """
     タスクリストの表示と新規作成を行うAPI
     GETリクエストでタスクのリストを取得
     POSTリクエストで新しいタスクを作成
     タスクは期限日付が古い順に並べ替えられ
+    ?pagination=keyset を指定するとキーセット方式でページングする
+    ?fields= / ?omit= で出力する項目を絞り込める
+    ?status= / ?priority= / ?due_after= / ?due_before= / ?has_due= / ?overdue= / ?search= で
+    タスクを絞り込み、?ordering= で並び替えられる
+    ?include_archived=true を指定するとアーカイブ済みのタスクも含める
     """
 
-    queryset = Task.objects.all().order_by("due_date")
+    queryset = Task.objects.all().order_by("due_date", "id")
     serializer_class = TaskSerializer
     pagination_class = CustomPagination
+    filter_backends = [TaskFilterBackend, TaskOrderingFilter]
+
+    @property
+    def paginator(self):
+        """
+        リクエストに応じてページネーションクラスを選択
+
+        Returns:
+            BasePagination: ページネーションのインスタンス
+        """
+        if not hasattr(self, "_paginator"):
+            if KeysetPagination.is_requested(self.request):
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        if self.request.method in ("GET", "HEAD"):
+            self.queryset = task_queryset(self.request.query_params)
+        return super().get_queryset()
+
+    @method_decorator(cache_by_data_version)
+    @method_decorator(use_prepared_statements)
+    def get(self, request, *args, **kwargs):
+        """
+        タスクリストを取得
+        データが変更されていなければ、シリアライズせずに304を返す
+        レスポンスキャッシュが有効な場合、キャッシュにあればデータベースにアクセスせずに返す
+        現在時刻によって結果が変わる絞り込みと、アーカイブ済みのタスクを含む一覧ではETagを付けない
+
+        Returns:
+            Response: ページネーションされたタスクリスト
+        """
+        params = request.query_params
+        if is_time_dependent(params) or includes_archived(params):
+            return super().get(request, *args, **kwargs)
+        etag = collection_etag(request, get_data_state())
+        response = evaluate_preconditions(request, etag=etag)
+        if response is not None:
+            return response
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_validators(response, etag)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        タスクリストを取得
+        TaskReadSerializer を使用し、モデルのインスタンスを作らずに values() の結果を変換する
+
+        Returns:
+            Response: ページネーションされたタスクリスト
+        """
+        if not TaskReadSerializer.is_supported():
+            return super().list(request, *args, **kwargs)
+
+        reader = TaskReadSerializer(self.get_sparse_fields())
+        queryset = reader.select(
+            self.filter_queryset(self.get_queryset()),
+            required=getattr(self.paginator, "key_fields", ()),
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(reader.to_representation(list(page)))
+        return Response(reader.to_representation(list(queryset)))
 
 
-class DetailView(generics.RetrieveUpdateDestroyAPIView):
+class ArchivedTaskConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "アーカイブ済みのタスクは更新できません"
+    default_code = "archived"
+
+
+class DetailView(SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     特定のタスクの取得、更新、削除を行うAPI
-    GETリクエストでタスクの詳細を取得
-    PUT/PATCHリクエストでタスクを更新
+    GETリクエストでタスクの詳細を取得 (?fields= / ?omit= で項目を絞り込める)
+    PUT/PATCHリクエストでタスクを更新 (状況・優先度だけのPATCHは1文で更新する)
     DELETEリクエストでタスクを削除
+    更新日時からETag/Last-Modifiedを作成し、GETでは If-None-Match / If-Modified-Since、
+    PUT/PATCH/DELETEでは If-Match / If-Unmodified-Since による条件付きリクエストに対応する
+    アーカイブ済みのタスクも同じidで取得・削除できる (更新は409)
     """
 
     queryset = Task.objects.all()
+    archived_queryset = ArchivedTask.objects.all()
     serializer_class = TaskSerializer
+    sparse_required_fields = ("updated_at",)
+    precondition_headers = (
+        "HTTP_IF_MATCH",
+        "HTTP_IF_NONE_MATCH",
+        "HTTP_IF_UNMODIFIED_SINCE",
+    )
+    # PATCHでこれらの項目だけを変更する場合は、タスクを取得せずに fast_update() で更新する
+    fast_update_fields = ("status", "priority")
+
+    def get_object(self):
+        """
+        タスクを取得し、タスクテーブルにない場合はアーカイブから取得する
+
+        Returns:
+            Task | ArchivedTask: タスク
+
+        Raises:
+            Http404: どちらにも存在しない場合
+            ArchivedTaskConflict: アーカイブ済みのタスクを更新しようとした場合
+        """
+        try:
+            return super().get_object()
+        except Http404:
+            queryset = self.archived_queryset
+            fields = self.get_sparse_fields()
+            if fields is not None:
+                queryset = queryset.only(*fields, *self.sparse_required_fields)
+            instance = queryset.filter(pk=self.kwargs[self.lookup_field]).first()
+            if instance is None:
+                raise
+        if self.request.method in ("PUT", "PATCH"):
+            raise ArchivedTaskConflict()
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    @method_decorator(use_prepared_statements)
+    def retrieve(self, request, *args, **kwargs):
+        """
+        タスクの詳細を取得
+        タスクが変更されていなければ、シリアライズせずに304を返す
+
+        Returns:
+            Response: タスクの詳細
+        """
+        instance = self.get_object()
+        etag = task_etag(instance.pk, instance.updated_at)
+        response = evaluate_preconditions(request, etag, instance.updated_at)
+        if response is not None:
+            return response
+        response = Response(self.get_serializer(instance).data)
+        set_validators(response, etag, instance.updated_at)
+        return response
+
+    def check_preconditions(self, request):
+        """
+        更新・削除の前提条件を確認
+        確認から更新までの間に他の更新が入らないよう、対象の行をロックする
+        トランザクション内で呼び出すこと
+
+        Args:
+            request (Request): リクエスト
+
+        Returns:
+            HttpResponse: 前提条件を満たさない場合は412のレスポンス、満たす場合はNone
+        """
+        if not any(header in request.META for header in self.precondition_headers):
+            return None
+        updated_at = (
+            self.get_queryset()
+            .select_for_update()
+            .filter(pk=self.kwargs[self.lookup_field])
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            # 存在しないタスクは後続の処理で404になる
+            return None
+        etag = task_etag(self.kwargs[self.lookup_field], updated_at)
+        return evaluate_preconditions(request, etag, updated_at)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(Task)):
+            response = self.check_preconditions(request)
+            if response is not None:
+                return response
+            response = super().update(request, *args, **kwargs)
+        set_validators(
+            response,
+            task_etag(self.saved_instance.pk, self.saved_instance.updated_at),
+            self.saved_instance.updated_at,
+        )
+        return response
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.saved_instance = serializer.instance
+
+    def partial_update(self, request, *args, **kwargs):
+        if self.can_fast_update(request):
+            return self.fast_update(request)
+        return super().partial_update(request, *args, **kwargs)
+
+    def can_fast_update(self, request):
+        """
+        PATCHを fast_update() で処理できるか判定
+
+        Args:
+            request (Request): リクエスト
+
+        Returns:
+            bool: fast_update_fields の項目だけを変更し、前提条件が If-Match のタスクのETagだけの場合はTrue
+        """
+        data = request.data
+        if not isinstance(data, dict) or not data:
+            return False
+        if not set(data) <= set(self.fast_update_fields):
+            return False
+        if "HTTP_IF_NONE_MATCH" in request.META:
+            return False
+        if "HTTP_IF_UNMODIFIED_SINCE" in request.META:
+            return False
+        if "HTTP_IF_MATCH" not in request.META:
+            return True
+        return parse_if_match(request, self.kwargs[self.lookup_field]) is not None
+
+    def fast_update(self, request):
+        """
+        タスクを取得せずに UPDATE ... RETURNING の1文で更新する
+        取得・モデル全体の検証・全項目の UPDATE を行う通常の更新と異なり、1回の往復で済む
+        If-Match を指定した場合はETagの更新日時を条件に加え、他の更新との競合は更新0件として検出する
+        更新できなかった場合だけタスクを取得し、404・409・412を判定する
+
+        Args:
+            request (Request): リクエスト
+
+        Returns:
+            Response: 更新後のタスク、または412のレスポンス
+        """
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        pk = self.kwargs[self.lookup_field]
+        expected = parse_if_match(request, pk)
+        values = {**serializer.validated_data, "updated_at": timezone.now()}
+
+        using = router.db_for_write(Task)
+        connection = connections[using]
+        meta = Task._meta
+        fields = meta.concrete_fields
+        assignments = ", ".join(
+            f"{meta.get_field(name).column} = %s" for name in values
+        )
+        params = [
+            meta.get_field(name).get_db_prep_save(value, connection)
+            for name, value in values.items()
+        ]
+        sql = f"UPDATE {meta.db_table} SET {assignments} WHERE id = %s"
+        params.append(pk)
+        if expected is not None:
+            sql += " AND updated_at = %s"
+            params.append(expected)
+        sql += " RETURNING " + ", ".join(field.column for field in fields)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        if row is None:
+            # タスクがない (404)、アーカイブ済み (409)、更新日時が一致しない (412) のどれかを判定する
+            updated_at = (
+                Task.objects.using(using)
+                .filter(pk=pk)
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+            if updated_at is None:
+                self.get_object()
+            response = evaluate_preconditions(
+                request, task_etag(pk, updated_at), updated_at
+            )
+            if response is not None:
+                return response
+            return super().partial_update(request)
+
+        invalidate_task_data(using)
+        instance = Task.from_db(using, [field.attname for field in fields], row)
+        response = Response(self.get_serializer(instance).data)
+        set_validators(
+            response, task_etag(instance.pk, instance.updated_at), instance.updated_at
+        )
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(Task)):
+            response = self.check_preconditions(request)
+            if response is not None:
+                return response
+            return super().destroy(request, *args, **kwargs)
+
+
+class BulkView(generics.GenericAPIView):
+    """
+    タスクの一括登録・更新・削除を行うAPI
+    POSTリクエストでタスクの配列を一括登録
+    PUT/PATCHリクエストでidを含むタスクの配列を一括更新
+    DELETEリクエストで {"ids": [...]} に指定したタスクを一括削除
+    いずれも1トランザクションで実行し、不正な要素が1件でもあれば何も書き込まずに要素ごとのエラーを返す
+    ?batch_size= で1回のSQLで書き込む件数を指定できる
+    """
+
+    queryset = Task.objects.all()
+    serializer_class = TaskSerializer
+
+    def get_batch_size(self):
+        """
+        リクエストから1回のSQLで書き込む件数を取得
+
+        Returns:
+            int: バッチサイズ
+        """
+        try:
+            batch_size = int(self.request.query_params["batch_size"])
+        except (KeyError, ValueError):
+            return settings.TODO_BULK_BATCH_SIZE
+        return min(max(batch_size, 1), settings.TODO_BULK_MAX_ITEMS)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["batch_size"] = self.get_batch_size()
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("many", True)
+        kwargs.setdefault("max_length", settings.TODO_BULK_MAX_ITEMS)
+        return super().get_serializer(*args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        using = router.db_for_write(Task)
+        with transaction.atomic(using=using):
+            serializer.save()
+            invalidate_task_data(using)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def put(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        ids = []
+        if isinstance(request.data, list):
+            for item in request.data:
+                try:
+                    ids.append(int(item["id"]))
+                except (TypeError, KeyError, ValueError):
+                    pass
+
+        using = router.db_for_write(Task)
+        with transaction.atomic(using=using):
+            tasks = self.get_queryset().select_for_update().in_bulk(ids)
+            serializer = self.get_serializer(tasks, data=request.data, partial=partial)
+            if not serializer.is_valid():
+                return Response(
+                    {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+                )
+            serializer.save()
+            invalidate_task_data(using)
+        return Response(serializer.data)
+
+    def patch(self, request, *args, **kwargs):
+        kwargs["partial"] = True
+        return self.put(request, *args, **kwargs)
+
+    def delete(self, request, *args, **kwargs):
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in ids
+        ):
+            raise ValidationError({"ids": ["IDの配列を指定してください"]})
+        if len(ids) > settings.TODO_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {"ids": [f"{settings.TODO_BULK_MAX_ITEMS}件以下で指定してください"]}
+            )
+
+        # 削除シグナルを1件ずつ送らないよう、DELETE ... RETURNING でまとめて削除する
+        batch_size = self.get_batch_size()
+        using = router.db_for_write(Task)
+        deleted = set()
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                for start in range(0, len(ids), batch_size):
+                    cursor.execute(
+                        f"DELETE FROM {Task._meta.db_table} WHERE id = ANY(%s) RETURNING id",
+                        [ids[start : start + batch_size]],
+                    )
+                    deleted.update(row[0] for row in cursor.fetchall())
+            if deleted:
+                invalidate_task_data(using)
+        return Response(
+            {
+                "deleted": sorted(deleted),
+                "not_found": [pk for pk in ids if pk not in deleted],
+            }
+        )
+
+
+class ImportView(generics.GenericAPIView):
+    """
+    CSV/NDJSONのタスクを COPY で一括登録するAPI
+    POSTリクエストで multipart/form-data の file、またはリクエスト本文
+    (Content-Type: text/csv / application/x-ndjson) を読み進めながら取り込む
+    multipart の場合、形式は format 項目、省略時はファイルの拡張子から判定する
+    不正な行は登録せず、行番号とエラーを返す
+    """
+
+    queryset = Task.objects.all()
+    parser_classes = [MultiPartParser]
+    media_type_formats = {
+        "text/csv": "csv",
+        "application/x-ndjson": "ndjson",
+        "application/jsonl": "ndjson",
+    }
+
+    def get_source(self, request):
+        """
+        リクエストから取り込むデータと形式を取得
+
+        Args:
+            request (Request): リクエスト
+
+        Returns:
+            tuple: (バイナリストリーム, 形式)
+
+        Raises:
+            ValidationError: データまたは形式が不正な場合
+        """
+        media_type = request.content_type.split(";")[0].strip().lower()
+        if media_type != "multipart/form-data":
+            import_format = self.media_type_formats.get(media_type)
+            if import_format is None:
+                raise ValidationError(
+                    {"format": [f"対応していない形式です: {media_type}"]}
+                )
+            # 本文が空の場合、DRF の stream はNoneになる
+            return request.stream or io.BytesIO(), import_format
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["ファイルを指定してください"]})
+        import_format = request.data.get("format")
+        if not import_format:
+            extension = upload.name.rsplit(".", 1)[-1].lower()
+            import_format = "ndjson" if extension == "jsonl" else extension
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError(
+                {"format": [f"対応していない形式です: {import_format}"]}
+            )
+        return upload.file, import_format
+
+    def post(self, request, *args, **kwargs):
+        stream, import_format = self.get_source(request)
+        importer = TaskImporter(using=router.db_for_write(Task))
+        try:
+            result = importer.run(IMPORT_FORMATS[import_format](open_text(stream)))
+        except UnicodeDecodeError:
+            raise ValidationError({"file": ["UTF-8のテキストを指定してください"]})
+        except csv.Error as exc:
+            raise ValidationError({"file": [f"CSVの形式が不正です: {exc}"]})
+        if result["imported"]:
+            response_status = status.HTTP_201_CREATED
+        elif result["rejected"]:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(result, status=response_status)
 
 
 @api_view(["GET"])
+@use_prepared_statements
 def task_summary(request):
     """
     タスクのサマリー情報を取得するAPIビュー
+    件数はトリガーで維持している状況ごとのカウンターから取得する
+    ?breakdown=true を指定すると、状況×優先度別の件数と期限切れ・期限間近の件数を
+    タスクテーブルの1回の条件付き集計で取得する
+    内訳は期限切れの判定が時刻で変わるため、条件付きリクエストとレスポンスキャッシュの対象外
+    ?include_archived=true を指定するとアーカイブ済みのタスクも件数に含める
 
     Returns:
         Response: タスクのサマリー情報。
     """
-    total_tasks = Task.objects.count()
-    completed_tasks = Task.objects.filter(status=2).count()
-    return Response({"total_tasks": total_tasks, "completed_tasks": completed_tasks})
+    archived = includes_archived(request.query_params)
+    if request.query_params.get("breakdown") in ("1", "true"):
+        queryset = TaskWithArchived.objects.all() if archived else None
+        return Response(task_breakdown(queryset))
+    return _status_summary(request, archived)
+
+
+@cache_by_data_version
+def _status_summary(request, archived=False):
+    """
+    カウンターから合計件数と完了件数を取得
+    件数が変わっていなければ If-None-Match に304を返す
+
+    Args:
+        request (Request): リクエスト
+        archived (bool): アーカイブ済みのタスク (全て完了) の件数を含める場合はTrue
+
+    Returns:
+        Response: 合計件数と完了件数
+    """
+    summary = status_summary(archived)
+    etag = summary_etag(request, summary)
+    response = evaluate_preconditions(request, etag=etag)
+    if response is not None:
+        return response
+    response = Response(summary)
+    set_validators(response, etag)
+    return response
@@ -1,7 +1,11 @@
 import axios from "axios";
 import { Task } from "../types/Task";
 
-const API_BASE_URL = "http://127.0.0.1:8000/api/todo/";
+// 開発サーバー (localhost:3000) と同じサイトにし、書き込み後の読み取りを
+// プライマリに固定する Cookie (SameSite=Lax) を送る
+const API_BASE_URL = "http://localhost:8000/api/todo/";
+
+axios.defaults.withCredentials = true;
 
 export const getTasks = async (
   page: number = 1